@@ -91,6 +91,10 @@ def model_analyzer(
         log.info("The block %s is now running its analyze() method", block.__class__.__name__)
         runtime_analyzer = block.analyze(runtime_analyzer, **kwargs)
 
+    # validation predictions are no longer needed
+    if hasattr(predictor, 'clear_prediction_cache'):
+        predictor.clear_prediction_cache()
+
     # ------------------------- #
     # Populate ModelAnalysis object
     # ------------------------- #
@@ -1,5 +1,5 @@
 import inspect
-from copy import deepcopy
+from copy import copy, deepcopy
 from typing import Dict, Tuple, Optional
 from types import SimpleNamespace
 
@@ -9,12 +9,12 @@ from sklearn.preprocessing import OneHotEncoder
 
 from type_infer.dtype import dtype
 from lightwood.api.types import PredictionArguments
-from lightwood.helpers.ts import add_tn_num_conf_bounds, add_tn_cat_conf_bounds, get_ts_groups
+from lightwood.helpers.ts import add_tn_num_conf_bounds, add_tn_cat_conf_bounds, get_ts_groups, \
+    get_ts_group_positions
 
-from lightwood.data import EncodedDs
 from lightwood.analysis.base import BaseAnalysisBlock
 from lightwood.analysis.nc.norm import Normalizer
-from lightwood.analysis.nc.icp import IcpRegressor, IcpClassifier, IcpTSRegressor
+from lightwood.analysis.nc.icp import BaseIcp, IcpRegressor, IcpClassifier, IcpTSRegressor
 from lightwood.analysis.nc.base import CachedRegressorAdapter, CachedClassifierAdapter, CachedTSAdapter
 from lightwood.analysis.nc.nc import BoostedAbsErrorErrFunc, RegressorNc, ClassifierNc, MarginErrFunc, TSNc, \
     TSAbsErrorErrFunc
@@ -22,6 +22,21 @@ from lightwood.analysis.nc.util import clean_df, set_conf_range, get_numeric_con
     get_categorical_conf, get_anomalies, get_ts_conf_range
 
 
+def _detached_copy(icp: BaseIcp) -> BaseIcp:
+    """
+    Shallow copy of `icp` with its own nonconformity function, model adapter and normalizer, so that the prediction caches set on the copy (e.g. for each group in turn) never replace those of `icp`.
+    """  # noqa
+    icp_copy = copy(icp)
+    icp_copy.nc_function = copy(icp.nc_function)
+    icp_copy.nc_function.model = copy(icp.nc_function.model)
+    normalizer = getattr(icp.nc_function, 'normalizer', None)
+    if normalizer is not None:
+        icp_copy.nc_function.normalizer = copy(normalizer)
+        if hasattr(normalizer, 'base_model'):
+            icp_copy.nc_function.normalizer.base_model = icp_copy.nc_function.model
+    return icp_copy
+
+
 class ICP(BaseAnalysisBlock):
     """ Confidence estimation block, uses inductive conformal predictors (ICPs) for model agnosticity """
 
@@ -102,7 +117,6 @@ class ICP(BaseAnalysisBlock):
                 icp = icp_class(nc, cal_size=self.validation_size)
 
             output['icp']['__default'] = icp
-            icp_df = deepcopy(ns.data)
 
             # setup prediction cache to avoid additional .predict() calls
             try:
@@ -130,28 +144,9 @@ class ICP(BaseAnalysisBlock):
             if not ns.is_classification:
                 output['df_target_stddev'] = {'__default': ns.stats_info.df_target_stddev}
 
-            # fit additional ICPs in time series tasks with grouped columns
-            if ns.tss.is_timeseries and ns.tss.group_by:
-                # generate a multiindex
-                midx = pd.MultiIndex.from_frame(icp_df[[*ns.tss.group_by, f'__mdb_original_{ns.tss.order_by}']])
-                icp_df.index = midx
-                result_df.index = midx
-
-                # create an ICP for each possible group
-                group_info = ns.data[ns.tss.group_by].to_dict('list')
-                all_group_combinations = get_ts_groups(ns.data, ns.tss)
-                all_group_combinations.remove('__default')
-                output['icp']['__mdb_groups'] = all_group_combinations
-                output['icp']['__mdb_group_keys'] = [x for x in group_info.keys()]
-
-                for combination in all_group_combinations:
-                    output['icp'][tuple(combination)] = deepcopy(icp)
-
             # calibrate ICP
             icp_df = deepcopy(ns.data)
             icp_df, y = clean_df(icp_df, ns, output.get('label_encoders', None))
-            if ns.tss.is_timeseries and ns.tss.group_by:
-                icp_df.index = midx
             output['icp']['__default'].index = icp_df.columns
             output['icp']['__default'].calibrate(icp_df.values, y)
 
@@ -159,81 +154,74 @@ class ICP(BaseAnalysisBlock):
             conf, ranges = set_conf_range(
                 icp_df, icp, ns.dtype_dict[ns.target],
                 output, positive_domain=ns.stats_info.positive_domain, significance=self.fixed_significance)
-            if not ns.is_classification:
-                result_df = pd.DataFrame(index=icp_df.index, columns=['confidence', 'lower', 'upper'], dtype=float)
-                result_df.loc[icp_df.index, 'lower'] = ranges[:, 0]
-                result_df.loc[icp_df.index, 'upper'] = ranges[:, 1]
-            else:
-                result_df = pd.DataFrame(index=icp_df.index, columns=['confidence'], dtype=float)
 
-            result_df.loc[icp_df.index, 'confidence'] = conf
+            # columns: confidence, and then lower and upper bounds for numerical tasks
+            result = np.zeros((len(icp_df), 1 if ns.is_classification else 3))
+            result[:, 0] = conf
+            if not ns.is_classification:
+                result[:, 1:] = ranges
 
-            # calibrate additional grouped ICPs
+            # calibrate additional ICPs in time series tasks with grouped columns
             if ns.tss.is_timeseries and ns.tss.group_by:
                 icps = output['icp']
-                group_keys = icps['__mdb_group_keys']
+                all_group_combinations = get_ts_groups(ns.data, ns.tss)
+                all_group_combinations.remove('__default')
+                icps['__mdb_groups'] = all_group_combinations
+                icps['__mdb_group_keys'] = list(ns.tss.group_by)
+
+                # rows of each group, indexed once
+                group_positions = get_ts_group_positions(ns.data, ns.tss.group_by)
 
-                # add all predictions to DF
-                icps_df = deepcopy(ns.data)
-                midx = pd.MultiIndex.from_frame(icps_df[[*ns.tss.group_by, f'__mdb_original_{ns.tss.order_by}']])
-                icps_df.index = midx
                 if ns.is_multi_ts or pred_is_list:
-                    icps_df[f'__predicted_{ns.target}'] = [np.array(p) for p in ns.normal_predictions['prediction']]
+                    all_preds = pd.Series([np.array(p) for p in ns.normal_predictions['prediction']]).values
                 else:
-                    icps_df[f'__predicted_{ns.target}'] = np.array(ns.normal_predictions['prediction'])
+                    all_preds = np.array(ns.normal_predictions['prediction'])
 
-                for group in icps['__mdb_groups']:
-                    icp_df = icps_df
-
-                    # filter irrelevant rows for each group combination
-                    icp_df['__mdb_norm_index'] = np.arange(len(icp_df))
-                    for key, val in zip(group_keys, group):
-                        icp_df = icp_df[icp_df[key] == val]
+                # predictions of the normalizer for the whole validation dataset, computed above
+                normalizer = icp.nc_function.normalizer
+                all_norm_scores = normalizer.prediction_cache if normalizer is not None else None
+                all_targets = ns.data[ns.target].values
+                icp_values = icp_df.values
 
-                    if icps[tuple(group)].nc_function.normalizer is not None:
-                        group_normalizer = icps[tuple(group)].nc_function.normalizer
-                        norm_input_df = ns.encoded_val_data.data_frame.iloc[icp_df.pop('__mdb_norm_index')]
-                        norm_input = EncodedDs(ns.encoded_val_data.encoders, norm_input_df, ns.target)
-                        norm_cache = group_normalizer(norm_input, args=PredictionArguments())
-                        icp_df[f'__norm_{ns.target}'] = norm_cache
+                # each group is calibrated on a copy of the base ICP, and only its calibration is kept
+                group_icp = _detached_copy(icp)
+                for group in icps['__mdb_groups']:
+                    idxs = group_positions.get(tuple(group), None)
+                    if idxs is None:
+                        continue
 
                     # save relevant predictions in the caches, then calibrate the ICP
-                    pred_cache = icp_df.pop(f'__predicted_{ns.target}').values
+                    pred_cache = all_preds[idxs]
                     if ns.is_multi_ts and ns.is_classification:
-                        # output['label_encoders'].transform(preds.reshape(-1, 1))
                         pred_cache = output['label_encoders'].transform([[p[0] for p in pred_cache]])
                     elif ns.is_multi_ts:
                         pred_cache = np.array([np.array(p) for p in pred_cache])
 
-                    icps[tuple(group)].nc_function.model.prediction_cache = pred_cache
-                    icp_df, y = clean_df(icp_df, ns, output.get('label_encoders', None))
-                    if icps[tuple(group)].nc_function.normalizer is not None:
-                        icps[tuple(group)].nc_function.normalizer.prediction_cache = icp_df.pop(
-                            f'__norm_{ns.target}').values
+                    group_icp.nc_function.model.prediction_cache = pred_cache
+                    if normalizer is not None:
+                        group_icp.nc_function.normalizer.prediction_cache = all_norm_scores[idxs]
 
-                    icps[tuple(group)].index = icp_df.columns  # important at inference time
-                    icps[tuple(group)].calibrate(icp_df.values, y)
+                    group_icp.calibrate(icp_values[idxs], y[idxs])
+                    icps[tuple(group)] = group_icp.get_calibration()
 
                     # save training std() for bounds width selection
                     if not ns.is_classification:
-                        icp_train_df = ns.data
-                        for key, val in zip(group_keys, group):
-                            icp_train_df = icp_train_df[icp_train_df[key] == val]
-                        y_train = icp_train_df[ns.target].values
-                        output['df_target_stddev'][tuple(group)] = y_train.std()
+                        output['df_target_stddev'][tuple(group)] = all_targets[idxs].std()
 
                     # get bounds for relevant rows in validation dataset
                     conf, group_ranges = set_conf_range(
-                        icp_df, icps[tuple(group)],
+                        icp_df.iloc[idxs], group_icp,
                         ns.dtype_dict[ns.target],
                         output, group=tuple(group),
                         positive_domain=ns.stats_info.positive_domain, significance=self.fixed_significance)
+
                     # save group bounds
+                    result[idxs, 0] = conf
                     if not ns.is_classification:
-                        result_df.loc[icp_df.index, 'lower'] = group_ranges[:, 0]
-                        result_df.loc[icp_df.index, 'upper'] = group_ranges[:, 1]
+                        result[idxs, 1:] = group_ranges
 
-                    result_df.loc[icp_df.index, 'confidence'] = conf
+            columns = ['confidence'] if ns.is_classification else ['confidence', 'lower', 'upper']
+            result_df = pd.DataFrame(result, columns=columns)
 
             # consolidate all groups here
             output['icp']['__mdb_active'] = True
@@ -373,38 +361,41 @@ class ICP(BaseAnalysisBlock):
                 if ns.analysis['icp'].get('__mdb_groups', False):
                     icps = ns.analysis['icp']
                     group_keys = icps['__mdb_group_keys']
+                    group_icp = _detached_copy(base_icp)
 
-                    for group in icps['__mdb_groups']:
-                        icp = icps[tuple(group)]
+                    # only groups present in the data are visited, with their rows indexed once
+                    for group, idxs in get_ts_group_positions(icp_X, group_keys).items():
+                        calibration = icps.get(group, None)
+                        if isinstance(calibration, BaseIcp):
+                            # predictors trained with older versions store a whole ICP per group
+                            calibration = calibration.get_calibration()
 
                         # check ICP has calibration scores
-                        if icp.cal_scores[0].shape[0] > 0:
-
-                            # filter rows by group
-                            X = deepcopy(icp_X)
-                            for key, val in zip(group_keys, group):
-                                X = X[X[key] == val]
+                        if calibration is not None and calibration['cal_scores'][0].shape[0] > 0:
+                            group_icp.set_calibration(calibration)
+                            X = icp_X.iloc[idxs]
 
                             if X.size > 0:
                                 # set ICP caches
                                 if is_multi_ts and is_numerical:
                                     target_cols = [ns.target_name] + [f'{ns.target_name}_timestep_{i}'
                                                                       for i in range(1, ns.tss.horizon)]
-                                    icp.nc_function.model.prediction_cache = X[target_cols].values
+                                    group_icp.nc_function.model.prediction_cache = X[target_cols].values
                                     [X.pop(col) for col in target_cols]
                                 elif is_multi_ts and is_categorical:
                                     ohe_enc = ns.analysis['label_encoders']
                                     preds = X.pop(ns.target_name).values
                                     pred_cache = ohe_enc.transform(np.array([p[0] for p in preds]).reshape(-1, 1))
-                                    icp.nc_function.model.prediction_cache = pred_cache
+                                    group_icp.nc_function.model.prediction_cache = pred_cache
                                 else:
-                                    icp.nc_function.model.prediction_cache = X.pop(ns.target_name).values
-                                if icp.nc_function.normalizer:
-                                    icp.nc_function.normalizer.prediction_cache = X.pop('__mdb_selfaware_scores').values
+                                    group_icp.nc_function.model.prediction_cache = X.pop(ns.target_name).values
+                                if group_icp.nc_function.normalizer:
+                                    group_icp.nc_function.normalizer.prediction_cache = \
+                                        X.pop('__mdb_selfaware_scores').values
 
                                 # predict and get confidence level given width or error rate constraints
                                 if is_multi_ts and is_numerical:
-                                    all_confs = icp.predict(X.values)
+                                    all_confs = group_icp.predict(X.values)
                                     fixed_conf = ns.pred_args.fixed_confidence
                                     significances, confs = get_ts_conf_range(
                                         all_confs,
@@ -416,7 +407,7 @@ class ICP(BaseAnalysisBlock):
                                     result = self._ts_assign_confs(result, X, confs, significances, ns.tss)
 
                                 elif is_numerical:
-                                    all_confs = icp.predict(X.values)
+                                    all_confs = group_icp.predict(X.values)
                                     fixed_conf = ns.pred_args.fixed_confidence
                                     significances, confs = get_numeric_conf_range(
                                         all_confs,
@@ -439,7 +430,7 @@ class ICP(BaseAnalysisBlock):
                                         result.loc[insert_index, 'significance'] = significances[conf_index]
 
                                 else:
-                                    all_ranges = np.array([icp.predict(X.values)])
+                                    all_ranges = np.array([group_icp.predict(X.values)])
                                     all_confs = np.swapaxes(np.swapaxes(all_ranges, 0, 2), 0, 1)
                                     significances = get_categorical_conf(all_confs)
                                     result.loc[X.index, 'significance'] = significances.flatten()
@@ -17,6 +17,7 @@ from types import FunctionType
 class BaseIcp(BaseEstimator):
     """Base class for inductive conformal predictors.
     """
+    _calibration_attrs = ('categories', 'cal_scores')
 
     def __init__(self, nc_function: FunctionType, condition: Union[bool, FunctionType] = None, cal_size: int = None):
         self.cal_x, self.cal_y = None, None
@@ -105,6 +106,25 @@ class BaseIcp(BaseEstimator):
         if self.cal_size:
             self.cal_scores = self._reduce_scores()
 
+    def get_calibration(self) -> dict:
+        """Get the state set by the last call to ``calibrate()``.
+
+        Returns
+        -------
+        calibration : dict
+            The sorted calibration scores for each condition (and, for
+            classifiers, the known labels). Unlike a copy of the whole
+            predictor, this is cheap to keep for many subsets of the data,
+            and can be restored with ``set_calibration()``.
+        """
+        return {attr: getattr(self, attr) for attr in self._calibration_attrs}
+
+    def set_calibration(self, calibration: dict) -> None:
+        """Restore a state returned by ``get_calibration()``.
+        """
+        for attr, value in calibration.items():
+            setattr(self, attr, value)
+
     def _reduce_scores(self):
         return {k: cs[::int(len(cs) / self.cal_size) + 1] for k, cs in self.cal_scores.items()}
 
@@ -161,6 +181,8 @@ class IcpClassifier(BaseIcp, ClassifierMixin):
         842-851.
     """
 
+    _calibration_attrs = BaseIcp._calibration_attrs + ('classes', )
+
     def __init__(self, nc_function: FunctionType, condition: Union[bool, FunctionType] = None, cal_size: int = None,
                  smoothing: bool = True) -> None:
         super(IcpClassifier, self).__init__(nc_function, condition, cal_size)
@@ -197,29 +219,44 @@ class IcpClassifier(BaseIcp, ClassifierMixin):
             p is a boolean array denoting which labels are included in the
             prediction sets.
         """
-        # TODO: if x == self.last_x ...
         n_test_objects = x.shape[0]
-        p = np.zeros((n_test_objects, self.classes.size))
+        n_classes = self.classes.size
+        p = np.zeros((n_test_objects, n_classes))
+
+        # one random draw per (class, row) pair, in the same order as a class-major double loop
+        noise = np.random.uniform(0, 1, (n_classes, n_test_objects)).T if self.smoothing else None
 
+        if self.conditional:
+            condition_map = np.array([[self.condition((x[j, :], c)) for c in self.classes]
+                                      for j in range(n_test_objects)]).reshape(n_test_objects, n_classes)
+        else:
+            condition_map = np.zeros((n_test_objects, n_classes), dtype=int)
+
+        # TODO: nc_function.calc_nc should take X * {y1, y2, ... ,yn}
+        test_nc_scores = np.zeros((n_test_objects, n_classes))
         for i, c in enumerate(self.classes):
             test_class = np.zeros(x.shape[0], dtype=self.classes.dtype)
             test_class.fill(c)
+            test_nc_scores[:, i] = self.nc_function.score(x, test_class)
 
-            # TODO: maybe calculate p-values using cython or similar
-            # TODO: interpolated p-values
-
-            # TODO: nc_function.calc_nc should take X * {y1, y2, ... ,yn}
-            test_nc_scores = self.nc_function.score(x, test_class)
-            for j, nc in enumerate(test_nc_scores):
-                cal_scores = self.cal_scores[self.condition((x[j, :], c))][::-1]
-                n_cal = cal_scores.size
-                n_eq = sum(np.where(cal_scores == nc, 1, 0))
-                n_gt = sum(np.where(cal_scores > nc, 1, 0))
-
-                if self.smoothing:
-                    p[j, i] = (n_gt + n_eq * np.random.uniform(0, 1, 1)) / (n_cal + 1)
-                else:
-                    p[j, i] = (n_gt + n_eq) / (n_cal + 1)
+        for condition in np.unique(condition_map):
+            idx = condition_map == condition
+            nc = test_nc_scores[idx]
+            cal_scores = np.asarray(self.cal_scores[condition])
+            n_cal = cal_scores.size
+
+            # NaN scores are never equal to nor greater than anything, so they only count towards `n_cal`
+            cal_scores = np.sort(cal_scores[~np.isnan(cal_scores)])
+            n_le = np.searchsorted(cal_scores, nc, side='right')
+            n_gt = cal_scores.size - n_le
+            n_eq = n_le - np.searchsorted(cal_scores, nc, side='left')
+            n_gt[np.isnan(nc)] = 0
+            n_eq[np.isnan(nc)] = 0
+
+            if self.smoothing:
+                p[idx] = (n_gt + n_eq * noise[idx]) / (n_cal + 1)
+            else:
+                p[idx] = (n_gt + n_eq) / (n_cal + 1)
 
         if significance is not None:
             return p > significance
@@ -307,7 +344,7 @@ class IcpRegressor(BaseIcp, RegressorMixin):
             Significance level (maximum allowed error rate) of predictions.
             Should be a float between 0 and 1. If ``None``, then intervals for
             all significance levels (0.01, 0.02, ..., 0.99) are output in a
-            3d-matrix.
+            3d-matrix. An array of significance levels may also be passed.
 
         Returns
         -------
@@ -329,6 +366,12 @@ class IcpRegressor(BaseIcp, RegressorMixin):
         else:
             prediction = np.zeros((x.shape[0], 2))
 
+        if not self.conditional:
+            # a single set of calibration scores, so all rows (and significance levels) are predicted in one call
+            if x.shape[0] > 0:
+                prediction[:] = self.nc_function.predict(x, self.cal_scores[0], significance)
+            return prediction
+
         condition_map = np.array([self.condition((x[i, :], None))
                                   for i in range(x.shape[0])])
 
@@ -81,13 +81,14 @@ class RegressionErrFunc(object):
         nc : numpy array of shape [n_calibration_samples]
             Nonconformity scores obtained for conformal predictor.
 
-        significance : float
-            Significance level (0, 1).
+        significance : float or numpy array of shape [n_significance]
+            Significance level (0, 1), or several of them. The scores only
+            need to be sorted once to get the boundaries for all levels.
 
         Returns
         -------
-        interval : numpy array of shape [n_samples, 2]
-            Minimum and maximum interval boundaries for each prediction.
+        interval : numpy array of shape [2, 1] or [2, n_significance]
+            Minimum and maximum interval boundaries for each significance level.
         """ # noqa
         pass
 
@@ -205,9 +206,9 @@ class AbsErrorErrFunc(RegressionErrFunc):
 
     def apply_inverse(self, nc, significance):
         nc = np.sort(nc)[::-1]
-        border = int(np.floor(significance * (nc.size + 1))) - 1
+        border = np.floor(np.multiply(significance, nc.size + 1)).astype(int) - 1
         # TODO: should probably warn against too few calibration examples
-        border = min(max(border, 0), nc.size - 1)
+        border = np.clip(border, 0, nc.size - 1)
         return np.vstack([nc[border], nc[border]])
 
 
@@ -224,12 +225,12 @@ class BoostedAbsErrorErrFunc(RegressionErrFunc):
 
     def apply_inverse(self, nc, significance):
         nc = np.sort(nc)[::-1]
-        border = int(np.floor(significance * (nc.size + 1))) - 1
+        border = np.floor(np.multiply(significance, nc.size + 1)).astype(int) - 1
         if 1 < nc.size < 100:
             x = np.arange(nc.shape[0])
             interp = interp1d(x, nc)
             nc = interp(np.linspace(0, nc.size - 1, 100))
-        border = min(max(border, 0), nc.size - 1)
+        border = np.clip(border, 0, nc.size - 1)
         return np.vstack([nc[border], nc[border]])
 
 
@@ -256,11 +257,11 @@ class SignErrorErrFunc(RegressionErrFunc):
 
     def apply_inverse(self, nc, significance):
         nc = np.sort(nc)[::-1]
-        upper = int(np.floor((significance / 2) * (nc.size + 1)))
-        lower = int(np.floor((1 - significance / 2) * (nc.size + 1)))
+        upper = np.floor(np.multiply(np.divide(significance, 2), nc.size + 1)).astype(int)
+        lower = np.floor(np.multiply(1 - np.divide(significance, 2), nc.size + 1)).astype(int)
         # TODO: should probably warn against too few calibration examples
-        upper = min(max(upper, 0), nc.size - 1)
-        lower = max(min(lower, nc.size - 1), 0)
+        upper = np.clip(upper, 0, nc.size - 1)
+        lower = np.clip(lower, 0, nc.size - 1)
         return np.vstack([-nc[lower], nc[upper]])
 
 
@@ -529,14 +530,15 @@ class RegressorNc(BaseModelNc):
             Significance level (maximum allowed error rate) of predictions.
             Should be a float between 0 and 1. If ``None``, then intervals for
             all significance levels (0.01, 0.02, ..., 0.99) are output in a
-            3d-matrix.
+            3d-matrix. An array of significance levels may also be passed.
 
         Returns
         -------
         p : numpy array of shape [n_samples, 2] or [n_samples, 2, 99]
             If significance is ``None``, then p contains the interval (minimum
             and maximum boundaries) for each test pattern, and each significance
-            level (0.01, 0.02, ..., 0.99). If significance is a float between
+            level (0.01, 0.02, ..., 0.99), or each requested level if an array
+            is passed. If significance is a float between
             0 and 1, then p contains the prediction intervals (minimum and
             maximum	boundaries) for the set of test patterns at the chosen
             significance level.
@@ -551,7 +553,10 @@ class RegressorNc(BaseModelNc):
             except Exception:
                 pass
 
-        if significance:
+        if significance is None:
+            significance = np.arange(0.01, 1.0, 0.01)
+
+        if np.size(significance) == 1:
             err_dist = self.err_func.apply_inverse(nc, significance)
             err_dist = np.hstack([err_dist] * n_test)
             err_dist *= norm
@@ -562,16 +567,14 @@ class RegressorNc(BaseModelNc):
 
             return intervals
         else:
-            significance = np.arange(0.01, 1.0, 0.01)
-            intervals = np.zeros((x.shape[0], 2, significance.size))
-
-            for i, s in enumerate(significance):
-                err_dist = self.err_func.apply_inverse(nc, s)
-                err_dist = np.hstack([err_dist] * n_test)
-                err_dist *= norm
-
-                intervals[:, 0, i] = prediction - err_dist[0, :]
-                intervals[:, 1, i] = prediction + err_dist[0, :]
+            # interval widths for all significance levels at once, shape (n_test, n_significance)
+            err_dist = self.err_func.apply_inverse(nc, np.asarray(significance))
+            err_dist = np.asarray(norm).reshape(-1, 1) * err_dist[0, :]
+            prediction = np.asarray(prediction).reshape(-1, 1)
+
+            intervals = np.zeros((x.shape[0], 2, err_dist.shape[1]))
+            intervals[:, 0, :] = prediction - err_dist
+            intervals[:, 1, :] = prediction + err_dist
 
             return intervals
 
@@ -72,17 +72,19 @@ def set_conf_range(
             conf = int(100 * (1 - significance))
             return significance, all_ranges[:, :, conf]
         else:
+            # mean spread for each significance level, so that selecting one for a tolerance is a lookup
+            spreads = np.ascontiguousarray((all_ranges[:, 1, :] - all_ranges[:, 0, :]).T).mean(axis=1)
             for tol in [std_tol, std_tol + 1, std_tol + 2]:
-                for significance in range(99):
+                tolerance = analysis_info['df_target_stddev'][group] * tol
+                within_tolerance = np.flatnonzero(spreads <= tolerance)
+
+                if within_tolerance.size > 0:
+                    significance = within_tolerance[0]
                     ranges = all_ranges[:, :, significance]
-                    spread = np.mean(ranges[:, 1] - ranges[:, 0])
-                    tolerance = analysis_info['df_target_stddev'][group] * tol
-
-                    if spread <= tolerance:
-                        confidence = (99 - significance) / 100
-                        if positive_domain:
-                            ranges[ranges < 0] = 0
-                        return confidence, ranges
+                    confidence = (99 - significance) / 100
+                    if positive_domain:
+                        ranges[ranges < 0] = 0
+                    return confidence, ranges
             else:
                 ranges = all_ranges[:, :, 0]
                 if positive_domain:
@@ -125,29 +127,20 @@ def get_numeric_conf_range(
     """  # noqa
 
     if fixed_conf is None:
-        significances = []
-        conf_ranges = []
         std_dev = df_target_stddev[group]
         tolerance = std_dev * std_tol
 
-        for sample_idx in range(all_confs.shape[0]):
-            sample = all_confs[sample_idx, :, :]
-            for idx in range(sample.shape[1]):
-                significance = (99 - idx) / 100
-                diff = sample[1, idx] - sample[0, idx]
-                if diff <= tolerance:
-                    conf_range = list(sample[:, idx])
-                    significances.append(significance)
-                    conf_ranges.append(conf_range)
-                    break
-            else:
-                significances.append(0.9991)  # default: confident that value falls inside big bounds
-                bounds = sample[:, 0]
-                sigma = (bounds[1] - bounds[0]) / 4
-                conf_range = [bounds[0] - sigma, bounds[1] + sigma]
-                conf_ranges.append(conf_range)
-
-        conf_ranges = np.array(conf_ranges)
+        # for each sample, the first significance level with narrow enough bounds
+        within_tolerance = (all_confs[:, 1, :] - all_confs[:, 0, :]) <= tolerance
+        idxs = np.argmax(within_tolerance, axis=1)
+        found = within_tolerance[np.arange(all_confs.shape[0]), idxs]
+        conf_ranges = all_confs[np.arange(all_confs.shape[0]), :, idxs]
+
+        # default: confident that value falls inside big bounds
+        significances = np.where(found, (99 - idxs) / 100, 0.9991)
+        bounds = all_confs[~found, :, 0]
+        sigma = (bounds[:, 1] - bounds[:, 0]) / 4
+        conf_ranges[~found] = np.stack([bounds[:, 0] - sigma, bounds[:, 1] + sigma], axis=1)
     else:
         # fixed error rate
         conf = max(0.01, min(1.0, fixed_conf))
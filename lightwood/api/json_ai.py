@@ -997,7 +997,10 @@ for col_name, encoder in self.encoders.items():
     feature_body = f"""
 log.info('Featurizing the data')
 
-feature_data = {{ key: EncodedDs(self.encoders, data, self.target) for key, data in split_data.items() if key != "stratified_on"}}
+# on-disk cache is only used for training splits, inference data is rarely featurized twice
+cache_dir = self.problem_definition.encoded_cache_dir if self.mode != 'predict' else None
+feature_data = {{ key: EncodedDs(self.encoders, data, self.target, cache_dir=cache_dir)
+                 for key, data in split_data.items() if key != "stratified_on"}}
 
 return feature_data
 
@@ -1020,7 +1023,8 @@ encoded_train_data = enc_data['train']
 encoded_dev_data = enc_data['dev']
 encoded_test_data = enc_data['test']
 filtered_df = filter_ds(encoded_test_data, self.problem_definition.timeseries_settings)
-encoded_test_data = EncodedDs(encoded_test_data.encoders, filtered_df, encoded_test_data.target)
+encoded_test_data = EncodedDs(encoded_test_data.encoders, filtered_df, encoded_test_data.target,
+                              cache_dir=encoded_test_data.cache_dir)
 
 log.info('Training the mixers')
 
@@ -1032,19 +1036,36 @@ self.mixers = [{', '.join([call(x) for x in json_ai.model["args"]["submodels"]])
 
 # Train mixers
 trained_mixers = []
-for mixer in self.mixers:
-    try:
+if self.problem_definition.parallel_mixers and len(self.mixers) > 1:
+    fit_args = []
+    for mixer in self.mixers:
         if mixer.trains_once:
-            self.fit_mixer(mixer,
-                           ConcatedEncodedDs([encoded_train_data, encoded_dev_data]),
-                           encoded_test_data)
+            fit_args.append((mixer, ConcatedEncodedDs([encoded_train_data, encoded_dev_data]), encoded_test_data))
+        else:
+            fit_args.append((mixer, encoded_train_data, encoded_dev_data))
+
+    fitted = parallel_fit_mixers(fit_args, get_nr_procs(encoded_train_data.data_frame), self.runtime_log)
+    for mixer, (fitted_mixer, error) in zip(self.mixers, fitted):
+        if error is None:
+            trained_mixers.append(fitted_mixer)
         else:
-            self.fit_mixer(mixer, encoded_train_data, encoded_dev_data)
-        trained_mixers.append(mixer)
-    except Exception as e:
-        log.warning(f'Exception: {{e}} when training mixer: {{mixer}}')
-        if {json_ai.problem_definition.strict_mode} and mixer.stable:
-            raise e
+            log.warning(f'Exception: {{error}} when training mixer: {{mixer}}')
+            if {json_ai.problem_definition.strict_mode} and mixer.stable:
+                raise Exception(error)
+else:
+    for mixer in self.mixers:
+        try:
+            if mixer.trains_once:
+                self.fit_mixer(mixer,
+                               ConcatedEncodedDs([encoded_train_data, encoded_dev_data]),
+                               encoded_test_data)
+            else:
+                self.fit_mixer(mixer, encoded_train_data, encoded_dev_data)
+            trained_mixers.append(mixer)
+        except Exception as e:
+            log.warning(f'Exception: {{e}} when training mixer: {{mixer}}')
+            if {json_ai.problem_definition.strict_mode} and mixer.stable:
+                raise e
 
 # Update mixers to trained versions
 if not trained_mixers:
@@ -1112,8 +1133,8 @@ if adjust_args is None or not adjust_args.get('learn_call'):
     train_data = self.preprocess(train_data)
     dev_data = self.preprocess(dev_data)
 
-dev_data = EncodedDs(self.encoders, dev_data, self.target)
-train_data = EncodedDs(self.encoders, train_data, self.target)
+dev_data = EncodedDs(self.encoders, dev_data, self.target, cache_dir=self.problem_definition.encoded_cache_dir)
+train_data = EncodedDs(self.encoders, train_data, self.target, cache_dir=self.problem_definition.encoded_cache_dir)
 
 # --------------- #
 # Update/Adjust Mixers
@@ -1122,6 +1143,10 @@ log.info('Updating the mixers')
 
 for mixer in self.mixers:
         mixer.partial_fit(train_data, dev_data, adjust_args)
+
+# predictions cached before the update are stale
+if hasattr(self.ensemble, 'clear_prediction_cache'):
+    self.ensemble.clear_prediction_cache()
 """  # noqa
 
     adjust_body = align(adjust_body, 2)
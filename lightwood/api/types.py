@@ -171,6 +171,11 @@ class ProblemDefinition:
             incoming data over time, the user may train the model further using the entire dataset.
     :param strict_mode: crash if an `unstable` block (mixer, encoder, etc.) fails to run.
     :param seed_nr: custom seed to use when generating a predictor from this problem definition.
+    :param encoded_cache_dir: optional scratch directory where encoded feature matrices are stored as memory-mapped \
+        files instead of being kept in RAM. Re-featurizing the same data with the same encoders will reuse them. \
+        Files are not deleted by Lightwood, remove the directory once it is no longer needed.
+    :param parallel_mixers: train the mixers concurrently, each in its own process, splitting the available cores \
+        between them. The encoded data is shared between processes, not copied.
     """
 
     target: str
@@ -190,6 +195,8 @@ class ProblemDefinition:
     fit_on_all: bool
     strict_mode: bool
     seed_nr: int
+    encoded_cache_dir: Optional[str]
+    parallel_mixers: bool
 
     @staticmethod
     def from_dict(obj: Dict):
@@ -222,6 +229,8 @@ class ProblemDefinition:
         use_default_analysis = obj.get('use_default_analysis', True)
         strict_mode = obj.get('strict_mode', True)
         seed_nr = obj.get('seed_nr', 1)
+        encoded_cache_dir = obj.get('encoded_cache_dir', None)
+        parallel_mixers = obj.get('parallel_mixers', False)
         problem_definition = ProblemDefinition(
             target=target,
             pct_invalid=pct_invalid,
@@ -239,7 +248,9 @@ class ProblemDefinition:
             use_default_analysis=use_default_analysis,
             fit_on_all=fit_on_all,
             strict_mode=strict_mode,
-            seed_nr=seed_nr
+            seed_nr=seed_nr,
+            encoded_cache_dir=encoded_cache_dir,
+            parallel_mixers=parallel_mixers
         )
 
         return problem_definition
@@ -442,6 +453,8 @@ class PredictionArguments:
         detector.
     :param time_format: For time series predictors. If set to `infer`, predicted `order_by` timestamps will be formatted back to the original dataset's `order_by` format. Any other string value will be used as a formatting string, unless empty (''), which disables the feature (this is the default behavior).
     :param force_ts_infer: For time series predictors. If set to `true`, an additional row will be produced per each group in the input DF, corresponding to an out-of-sample forecast w.r.t. to the input timestamps.
+    :param concurrent_mixers: if set, ensembles call their mixers concurrently in a thread pool instead of one after the other, so that latency is bound by the slowest mixer rather than by their sum. Supported by BestOf, MeanEnsemble, ModeEnsemble and WeightedMeanEnsemble.
+    :param mixer_timeout: with `concurrent_mixers`, amount of seconds each mixer has to produce its predictions. Mixers that take longer are left out and the ensemble falls back to the remaining ones (for BestOf, the next best mixer). By default there is no timeout.
     """  # noqa
 
     predict_proba: bool = True
@@ -453,6 +466,8 @@ class PredictionArguments:
     simple_ts_bounds: bool = False
     time_format: str = ''
     force_ts_infer: bool = False
+    concurrent_mixers: bool = False
+    mixer_timeout: Optional[float] = None
 
     @staticmethod
     def from_dict(obj: Dict):
@@ -474,6 +489,8 @@ class PredictionArguments:
         simple_ts_bounds = obj.get('simple_ts_bounds', PredictionArguments.simple_ts_bounds)
         time_format = obj.get('time_format', PredictionArguments.time_format)
         force_ts_infer = obj.get('force_ts_infer', PredictionArguments.force_ts_infer)
+        concurrent_mixers = obj.get('concurrent_mixers', PredictionArguments.concurrent_mixers)
+        mixer_timeout = obj.get('mixer_timeout', PredictionArguments.mixer_timeout)
 
         pred_args = PredictionArguments(
             predict_proba=predict_proba,
@@ -485,6 +502,8 @@ class PredictionArguments:
             simple_ts_bounds=simple_ts_bounds,
             time_format=time_format,
             force_ts_infer=force_ts_infer,
+            concurrent_mixers=concurrent_mixers,
+            mixer_timeout=mixer_timeout,
         )
 
         return pred_args
@@ -1,28 +1,81 @@
+import os
 import inspect
-from typing import List, Tuple
+import hashlib
+from typing import List, Tuple, Optional, Union
+import dill
 import torch
 import numpy as np
 import pandas as pd
+import scipy.sparse
 from torch.utils.data import Dataset
 from lightwood.encoder.base import BaseEncoder
+from lightwood.helpers.log import log
+from lightwood.helpers.parallelism import instance_lock
+from lightwood.helpers.embedding_cache import model_fingerprint
+
+# encoders with at least this many output dimensions are worth representing as sparse matrices
+SPARSE_MIN_OUTPUT_SIZE = 100
+
+
+def _dense_to_csr(matrix: torch.Tensor) -> scipy.sparse.csr_matrix:
+    """
+    Wraps a dense encoded matrix as CSR, storing every entry (zeros included) so that consumers which treat unstored entries as missing values (e.g. XGBoost) see exactly the same features as in the dense representation.
+    """  # noqa
+    matrix = matrix.cpu().numpy()
+    n_rows, n_cols = matrix.shape
+    indices = np.tile(np.arange(n_cols, dtype=np.int64), n_rows)
+    indptr = np.arange(n_rows + 1, dtype=np.int64) * n_cols
+    return scipy.sparse.csr_matrix((matrix.reshape(-1), indices, indptr), shape=(n_rows, n_cols))
+
+
+def _encoder_fingerprint(encoder: BaseEncoder) -> str:
+    """
+    Identifies the prepared state of an encoder without pickling it as a whole: torch modules are hashed by their weights (see `model_fingerprint()`), arrays and tensors by their raw bytes, and any other attribute by its pickled value. Attributes that can't be pickled (e.g. open connections) are only identified by their type.
+    """  # noqa
+    h = hashlib.sha256()
+    h.update(f'{type(encoder).__module__}.{type(encoder).__qualname__}'.encode())
+    for attr, value in sorted(vars(encoder).items()):
+        h.update(attr.encode())
+        if isinstance(value, torch.nn.Module):
+            h.update(model_fingerprint(value).encode())
+        elif isinstance(value, torch.Tensor):
+            h.update(value.detach().cpu().contiguous().numpy().tobytes())
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            try:
+                h.update(dill.dumps(value))
+            except Exception:
+                h.update(type(value).__qualname__.encode())
+    return h.hexdigest()
 
 
 class EncodedDs(Dataset):
-    def __init__(self, encoders: List[BaseEncoder], data_frame: pd.DataFrame, target: str) -> None:
+    def __init__(self, encoders: List[BaseEncoder], data_frame: pd.DataFrame, target: str,
+                 cache_dir: Optional[str] = None) -> None:
         """
         Create a Lightwood datasource from a data frame and some encoders. This class inherits from `torch.utils.data.Dataset`.
         
         Note: normal behavior is to cache encoded representations to avoid duplicated computations. If you want an option to disable, this please open an issue.
-         
+
+        Encoding is columnar: the first time encoded data is requested, each column is encoded with a single batched `encode()` call and stored in a contiguous float32 feature matrix (`X_cache`, with column offsets in `encoder_spans`), plus a separate target matrix (`Y_cache`). Row and column getters are then slices of these matrices. Encoders that set `supports_batch_encoding = False`, or whose batched output does not have one row per input row, are encoded one row at a time instead.
+
+        Encoders that implement `encode_sparse()` (e.g. `OneHotEncoder`) can also be retrieved as `scipy.sparse` CSR matrices by passing `sparse=True` to the data getters, which never materializes the dense feature matrix. This is meant for wide, high-cardinality columns, see `prefers_sparse()`.
+
         :param encoders: list of Lightwood encoders used to encode the data per each column.
         :param data_frame: original dataframe.
         :param target: name of the target column to predict.
+        :param cache_dir: optional scratch directory. If specified, encoded matrices are stored there as `.npy` files (keyed by a hash of the encoders and the data frame) and read back as memory maps, so they need not fit in RAM and can be reused by any other `EncodedDs` built from the same data and encoders. Files are kept after the datasource is gone, call `clear_cache(remove_files=True)` to delete the ones that belong to it, or remove the directory once it is no longer needed.
         """  # noqa
         self.data_frame = data_frame
         self.encoders = encoders
         self.target = target
+        self.cache_dir = cache_dir
         self.cache_encoded = True
-        self.cache = [None] * len(self.data_frame)
+        self.X_cache = None
+        self.Y_cache = None
+        self.sparse_cache = {}
+        self._cache_paths = {}
         self.encoder_spans = {}
         self.input_length = 0
 
@@ -52,39 +105,193 @@ class EncodedDs(Dataset):
         :return: tuple (X, y) with encoded data.
         
         """  # noqa
-        if self.cache_encoded:
-            if self.cache[idx] is not None:
-                return self.cache[idx]
+        if not self.cache_encoded:
+            return self._encode_row(idx)
+
+        X = self._get_X()[idx]
+        Y = self._get_Y()
+        Y = Y[idx] if Y is not None else torch.FloatTensor()
+        return X, Y
+
+    def _get_column_data(self, col: str, idx: Optional[int] = None) -> Tuple[list, dict]:
+        """
+        Fetches the raw data (and dependency data, if the encoder needs it) that is passed to the encoder of a column.
+
+        :param col: name of the column.
+        :param idx: if specified, only the data for this row is returned.
+        :return: tuple with the data to encode and the keyword arguments for the `encode()` call.
+        """  # noqa
+        encoder = self.encoders[col]
+        rows = slice(None) if idx is None else slice(idx, idx + 1)
+
+        kwargs = {}
+        if 'dependency_data' in inspect.signature(encoder.encode).parameters:
+            deps = [dep for dep in (encoder.dependencies or []) if dep in self.data_frame.columns]
+            kwargs['dependency_data'] = {dep: self.data_frame[dep].iloc[rows].tolist() for dep in deps}
+
+        if hasattr(encoder, 'data_window'):
+            cols = [self.target] + [f'{self.target}_timestep_{i}' for i in range(1, encoder.data_window)]
+            data = self.data_frame[cols].iloc[rows].values.tolist()
+        else:
+            data = self.data_frame[col].iloc[rows].tolist()
 
+        return data, kwargs
+
+    def _check_encoded(self, encoded_data: torch.Tensor, col: str) -> None:
+        if not isinstance(encoded_data, torch.Tensor):
+            raise Exception(f'The encoder: {self.encoders[col]} for column: {col} does not return a Tensor !')
+        if torch.isnan(encoded_data).any() or torch.isinf(encoded_data).any():
+            raise Exception(f'Encoded tensor: {encoded_data} contains nan or inf values, this tensor is \
+                              the encoding of column {col} using {self.encoders[col].__class__}')
+
+    def _encode_row(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Per-row encoding path, used when caching is disabled.
+        """
         X = torch.FloatTensor()
         Y = torch.FloatTensor()
         for col in self.data_frame:
             if self.encoders.get(col, None):
-                kwargs = {}
-                if 'dependency_data' in inspect.signature(self.encoders[col].encode).parameters:
-                    kwargs['dependency_data'] = {dep: [self.data_frame.iloc[idx][dep]]
-                                                 for dep in self.encoders[col].dependencies}
-                if hasattr(self.encoders[col], 'data_window'):
-                    cols = [self.target] + [f'{self.target}_timestep_{i}'
-                                            for i in range(1, self.encoders[col].data_window)]
-                    data = [self.data_frame[cols].iloc[idx].tolist()]
-                else:
-                    cols = [col]
-                    data = self.data_frame[cols].iloc[idx].tolist()
-
+                data, kwargs = self._get_column_data(col, idx)
                 encoded_tensor = self.encoders[col].encode(data, **kwargs)[0]
-                if torch.isnan(encoded_tensor).any() or torch.isinf(encoded_tensor).any():
-                    raise Exception(f'Encoded tensor: {encoded_tensor} contains nan or inf values, this tensor is \
-                                      the encoding of column {col} using {self.encoders[col].__class__}')
+                self._check_encoded(encoded_tensor, col)
                 if col != self.target:
                     X = torch.cat([X, encoded_tensor])
                 else:
                     Y = encoded_tensor
+        return X, Y
+
+    def _encode_column(self, col: str) -> torch.Tensor:
+        """
+        Encodes a whole column into a float32 matrix with one row per row in the data frame.
 
-        if self.cache_encoded:
-            self.cache[idx] = (X, Y)
+        A single batched `encode()` call is used, unless the encoder does not support it (or its output does not line up with the input rows), in which case rows are encoded one by one.
+        """  # noqa
+        encoder = self.encoders[col]
+        n_rows = len(self)
+        encoded_data = None
 
-        return X, Y
+        if n_rows == 0:
+            return torch.zeros((0, encoder.output_size), dtype=torch.float32)
+
+        if encoder.supports_batch_encoding:
+            data, kwargs = self._get_column_data(col)
+            try:
+                encoded_data = encoder.encode(data, **kwargs)
+                if isinstance(encoded_data, torch.Tensor) and encoded_data.shape[0] == n_rows:
+                    encoded_data = encoded_data.reshape(n_rows, -1)
+                else:
+                    encoded_data = None
+            except Exception as e:
+                # errors that are not specific to batching are raised again by the per-row path below
+                log.warning(f'Batched encoding failed for column {col} ({type(e).__name__}: {e}), falling back to per-row encoding')  # noqa
+                encoded_data = None
+
+        if encoded_data is None:
+            rows = []
+            for idx in range(n_rows):
+                data, kwargs = self._get_column_data(col, idx)
+                encoded_row = encoder.encode(data, **kwargs)[0]
+                self._check_encoded(encoded_row, col)
+                rows.append(encoded_row.reshape(-1))
+            encoded_data = torch.vstack(rows)
+
+        self._check_encoded(encoded_data, col)
+        return encoded_data.float()
+
+    def _get_cache_path(self, columns: List[str], suffix: str) -> str:
+        """
+        Path of the on-disk cache file for the encoded representation of `columns`. The file name is a hash of the data frame and of the state of the encoders for those columns (see `_encoder_fingerprint()`), computed once per datasource and reset by `clear_cache()`.
+        """  # noqa
+        if suffix in self._cache_paths:
+            return self._cache_paths[suffix]
+
+        h = hashlib.sha256()
+        h.update(str(list(self.data_frame.columns)).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(self.data_frame, index=True).values.tobytes())
+        except TypeError:
+            # unhashable cell values, e.g. lists in time series columns
+            h.update(pd.util.hash_pandas_object(self.data_frame.astype(str), index=True).values.tobytes())
+        for col in columns:
+            h.update(col.encode())
+            h.update(_encoder_fingerprint(self.encoders[col]).encode())
+
+        path = os.path.join(self.cache_dir, f'{h.hexdigest()}_{suffix}.npy')
+        self._cache_paths[suffix] = path
+        return path
+
+    def _load_cached(self, path: str) -> torch.Tensor:
+        log.debug(f'Loading encoded data from cache file {path}')
+        # copy-on-write map, so that in-place changes made by consumers never reach the cached file
+        return torch.from_numpy(np.load(path, mmap_mode='c'))
+
+    def _get_X(self) -> torch.Tensor:
+        """
+        Returns the (cached) encoded feature matrix, building it column by column if needed.
+
+        If `cache_dir` is set, the matrix is written straight into a memory-mapped `.npy` file (or read from it, if it already exists) instead of being held in memory.
+        """  # noqa
+        if self.X_cache is not None:
+            return self.X_cache
+
+        # mixers predicting concurrently on this datasource (see `PredictionArguments.concurrent_mixers`) encode it once
+        with instance_lock(self):
+            # re-checked under the lock, the cache may have been filled by another thread meanwhile
+            if self.X_cache is not None:
+                return self.X_cache
+
+            if self.cache_dir is None or len(self) == 0 or self.input_length == 0:
+                X = torch.empty((len(self), self.input_length), dtype=torch.float32)
+                for col, (start, end) in self.encoder_spans.items():
+                    X[:, start:end] = self._encode_column(col)
+            else:
+                path = self._get_cache_path(list(self.encoder_spans.keys()), 'X')
+                if not os.path.exists(path):
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp_path = f'{path}.{os.getpid()}.tmp'
+                    X = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                                  shape=(len(self), self.input_length))
+                    for col, (start, end) in self.encoder_spans.items():
+                        X[:, start:end] = self._encode_column(col).cpu().numpy()
+                    X.flush()
+                    del X
+                    os.replace(tmp_path, path)
+                X = self._load_cached(path)
+
+            if self.cache_encoded:
+                self.X_cache = X
+            return X
+
+    def _get_Y(self) -> Optional[torch.Tensor]:
+        """
+        Returns the (cached) encoded target matrix, or `None` if the target is not present in the data frame.
+        """
+        if self.Y_cache is not None:
+            return self.Y_cache
+
+        with instance_lock(self):
+            # re-checked under the lock, the cache may have been filled by another thread meanwhile
+            if self.Y_cache is not None:
+                return self.Y_cache
+            if self.target not in self.data_frame.columns or not self.encoders.get(self.target, False):
+                return None
+
+            if self.cache_dir is None or len(self) == 0:
+                Y = self._encode_column(self.target)
+            else:
+                path = self._get_cache_path([self.target], 'Y')
+                if not os.path.exists(path):
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp_path = f'{path}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'wb') as fp:
+                        np.save(fp, self._encode_column(self.target).cpu().numpy())
+                    os.replace(tmp_path, path)
+                Y = self._load_cached(path)
+
+            if self.cache_encoded:
+                self.Y_cache = Y
+            return Y
 
     def get_column_original_data(self, column_name: str) -> pd.Series:
         """
@@ -95,45 +302,108 @@ class EncodedDs(Dataset):
         """
         return self.data_frame[column_name]
 
-    def get_encoded_column_data(self, column_name: str) -> torch.Tensor:
+    def get_encoded_column_data(self, column_name: str, sparse: bool = False
+                                ) -> Union[torch.Tensor, scipy.sparse.csr_matrix]:
         """
         Gets the encoded data for any given column of the `EncodedDs`.
 
         :param column_name: name of the column.
-        :return: A `torch.Tensor` with the encoded data of the `column_name` column.
+        :param sparse: if True, the data is returned as a `scipy.sparse.csr_matrix`.
+        :return: A `torch.Tensor` (or CSR matrix) with the encoded data of the `column_name` column.
         """
-        kwargs = {}
-        if 'dependency_data' in inspect.signature(self.encoders[column_name].encode).parameters:
-            deps = [dep for dep in self.encoders[column_name].dependencies if dep in self.data_frame.columns]
-            kwargs['dependency_data'] = {dep: self.data_frame[dep].tolist() for dep in deps}
-        encoded_data = self.encoders[column_name].encode(self.data_frame[column_name], **kwargs)
-        if torch.isnan(encoded_data).any() or torch.isinf(encoded_data).any():
-            raise Exception(f'Encoded tensor: {encoded_data} contains nan or inf values')
+        if sparse:
+            return self._get_sparse_column(column_name)
 
-        if not isinstance(encoded_data, torch.Tensor):
-            raise Exception(
-                f'The encoder: {self.encoders[column_name]} for column: {column_name} does not return a Tensor !')
-        return encoded_data
+        if column_name in self.encoder_spans:
+            start, end = self.encoder_spans[column_name]
+            return self._get_X()[:, start:end]
+        elif column_name == self.target and self._get_Y() is not None:
+            return self._get_Y()
+        else:
+            return self._encode_column(column_name)
+
+    def _get_sparse_column(self, column_name: str) -> scipy.sparse.csr_matrix:
+        """
+        Sparse counterpart of `get_encoded_column_data()`. Columns whose encoder implements `encode_sparse()` are encoded straight into CSR format (and cached separately from the dense matrices), all other columns are encoded as usual and wrapped.
+        """  # noqa
+        if column_name in self.sparse_cache:
+            return self.sparse_cache[column_name]
+
+        with instance_lock(self):
+            # re-checked under the lock, the cache may have been filled by another thread meanwhile
+            if column_name in self.sparse_cache:
+                return self.sparse_cache[column_name]
 
-    def get_encoded_data(self, include_target=True) -> torch.Tensor:
+            encoder = self.encoders[column_name]
+            if hasattr(encoder, 'encode_sparse'):
+                data, _ = self._get_column_data(column_name)
+                encoded_data = encoder.encode_sparse(data).astype(np.float32)
+                if self.cache_encoded:
+                    self.sparse_cache[column_name] = encoded_data
+                return encoded_data
+
+            if column_name in self.encoder_spans and self.X_cache is None:
+                # avoid building the full dense feature matrix just to slice it
+                return _dense_to_csr(self._encode_column(column_name))
+            return _dense_to_csr(self.get_encoded_column_data(column_name))
+
+    def get_encoded_data(self, include_target: bool = True, sparse: bool = False
+                         ) -> Union[torch.Tensor, scipy.sparse.csr_matrix]:
         """
         Gets all encoded data.
 
         :param include_target: whether to include the target column in the output or not.
-        :return: A `torch.Tensor` with the encoded dataframe.
+        :param sparse: if True, the data is returned as a `scipy.sparse.csr_matrix`.
+        :return: A `torch.Tensor` (or CSR matrix) with the encoded dataframe.
         """
+        Y = self._get_Y() if include_target else None
+        if sparse:
+            columns = [col for col in self.data_frame.columns
+                       if col in self.encoder_spans or (col == self.target and Y is not None)]
+            if not columns:
+                return scipy.sparse.csr_matrix((len(self), 0), dtype=np.float32)
+            return scipy.sparse.hstack([self.get_encoded_column_data(col, sparse=True) for col in columns],
+                                       format='csr')
+
+        if Y is None:
+            return self._get_X()
+
         encoded_dfs = []
         for col in self.data_frame.columns:
-            if (include_target or col != self.target) and self.encoders.get(col, False):
+            if col == self.target:
+                encoded_dfs.append(Y)
+            elif col in self.encoder_spans:
                 encoded_dfs.append(self.get_encoded_column_data(col))
 
         return torch.cat(encoded_dfs, 1)
 
-    def clear_cache(self):
+    def prefers_sparse(self, columns: Optional[List[str]] = None) -> bool:
         """
-        Clears the `EncodedDs` cache.
+        Whether a sparse representation is worthwhile for the given columns, i.e. whether any of them is encoded by an encoder that supports `encode_sparse()` and has a wide output (at least `SPARSE_MIN_OUTPUT_SIZE` dimensions).
+
+        :param columns: columns to check, all input columns by default.
+        """  # noqa
+        columns = list(self.encoder_spans.keys()) if columns is None else columns
+        for col in columns:
+            encoder = self.encoders.get(col, None)
+            if hasattr(encoder, 'encode_sparse') and encoder.output_size >= SPARSE_MIN_OUTPUT_SIZE:
+                return True
+        return False
+
+    def clear_cache(self, remove_files: bool = False):
         """
-        self.cache = [None] * len(self.data_frame)
+        Clears the `EncodedDs` cache.
+
+        :param remove_files: if True, the files this datasource stored in `cache_dir` are deleted too. Other datasources built from the same data and encoders can no longer reuse them.
+        """  # noqa
+        self.X_cache = None
+        self.Y_cache = None
+        self.sparse_cache = {}
+        if remove_files:
+            for path in self._cache_paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+        self._cache_paths = {}
 
 
 class ConcatedEncodedDs(EncodedDs):
@@ -175,16 +445,29 @@ class ConcatedEncodedDs(EncodedDs):
         encoded_df_arr = [x.get_column_original_data(column_name) for x in self.encoded_ds_arr]
         return pd.concat(encoded_df_arr)
 
-    def get_encoded_column_data(self, column_name: str) -> torch.Tensor:
+    def get_encoded_column_data(self, column_name: str, sparse: bool = False
+                                ) -> Union[torch.Tensor, scipy.sparse.csr_matrix]:
         """
         See `lightwood.data.encoded_ds.EncodedDs.get_encoded_column_data()`.
         """
-        encoded_df_arr = [x.get_encoded_column_data(column_name) for x in self.encoded_ds_arr]
+        encoded_df_arr = [x.get_encoded_column_data(column_name, sparse=sparse) for x in self.encoded_ds_arr]
+        if sparse:
+            return scipy.sparse.vstack(encoded_df_arr, format='csr')
+        return torch.cat(encoded_df_arr, 0)
+
+    def get_encoded_data(self, include_target: bool = True, sparse: bool = False
+                         ) -> Union[torch.Tensor, scipy.sparse.csr_matrix]:
+        """
+        See `lightwood.data.encoded_ds.EncodedDs.get_encoded_data()`.
+        """
+        encoded_df_arr = [x.get_encoded_data(include_target, sparse=sparse) for x in self.encoded_ds_arr]
+        if sparse:
+            return scipy.sparse.vstack(encoded_df_arr, format='csr')
         return torch.cat(encoded_df_arr, 0)
 
-    def clear_cache(self):
+    def clear_cache(self, remove_files: bool = False):
         """
         See `lightwood.data.encoded_ds.EncodedDs.clear_cache()`.
         """
         for ds in self.encoded_ds_arr:
-            ds.clear_cache()
+            ds.clear_cache(remove_files)
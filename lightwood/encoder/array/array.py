@@ -121,7 +121,8 @@ class CatArrayEncoder(ArrayEncoder):
 
     def decode(self, data: torch.Tensor) -> List[Iterable]:
         data = torch.round(data)  # improves accuracy as by default ordinal encoder will truncate
-        decoded = self._normalizer.decode(data.reshape(-1, 1).tolist()).reshape(1, -1)
+        n_rows = data.shape[0] if len(data.shape) > 1 else 1
+        decoded = self._normalizer.decode(data.reshape(-1, 1).tolist()).reshape(n_rows, -1)
         return decoded
 
 
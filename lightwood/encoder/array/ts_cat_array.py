@@ -8,6 +8,8 @@ from lightwood.encoder.categorical import OneHotEncoder
 
 
 class TsCatArrayEncoder(BaseEncoder):
+    supports_batch_encoding: bool = False  # dependency data is resolved per row
+
     def __init__(self, timesteps: int, is_target: bool = False, grouped_by=None):
         """
         This encoder handles arrays of categorical time series data by wrapping the OHE encoder with behavior specific to time series tasks.
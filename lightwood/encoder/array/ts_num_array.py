@@ -1,6 +1,7 @@
 from typing import List, Dict, Iterable, Optional
 
 import torch
+import numpy as np
 import torch.nn.functional as F
 
 from lightwood.encoder import BaseEncoder
@@ -8,6 +9,8 @@ from lightwood.encoder.numeric import TsNumericEncoder
 
 
 class TsArrayNumericEncoder(BaseEncoder):
+    supports_batch_encoding: bool = False  # dependency data is resolved per row
+
     def __init__(self, timesteps: int, is_target: bool = False, positive_domain: bool = False, grouped_by=None):
         """
         This encoder handles arrays of numerical time series data by wrapping the numerical encoder with behavior specific to time series tasks.
@@ -93,15 +96,15 @@ class TsArrayNumericEncoder(BaseEncoder):
         if not self.is_prepared:
             raise Exception('You need to call "prepare" before calling "encode" or "decode".')
 
-        encoded_values = encoded_values.reshape(encoded_values.shape[0],
-                                                self.data_window,
-                                                self.sub_encoder.output_size)
-
-        ret = []
-        for tensor in torch.split(encoded_values, 1, dim=0):
-            ret.append(self.decode_one(tensor, dependency_data=dependency_data))
+        # all timesteps of all rows are decoded in a single call, repeating each row's dependency data once per step
+        n_rows = encoded_values.shape[0]
+        encoded_values = encoded_values.reshape(n_rows * self.data_window, self.sub_encoder.output_size)
+        if dependency_data:
+            dependency_data = {dep: np.repeat(np.asarray(values, dtype=object)[:n_rows], self.data_window)
+                               for dep, values in dependency_data.items()}
 
-        return ret
+        decoded = self.sub_encoder.decode(encoded_values, dependency_data=dependency_data)
+        return [decoded[i:i + self.data_window] for i in range(0, len(decoded), self.data_window)]
 
     def decode_one(self, encoded_value, dependency_data={}) -> List:
         """
@@ -1,30 +1,74 @@
+import os
+import hashlib
 import librosa
 import torch
 import warnings
+import numpy as np
+import multiprocessing as mp
 from lightwood.encoder.base import BaseEncoder
 from lightwood.helpers.io import read_from_path_or_url
 from lightwood.helpers.log import log
-from typing import Iterable
+from typing import Iterable, Optional
+
+
+def _compute_mfcc(path: str) -> Optional[np.ndarray]:
+    """
+    Loads an audio file and computes its (flattened) MFCCs. Returns `None` if the file can't be read.
+
+    Defined at module level so that it can be sent to worker processes.
+    """
+    try:
+        y, _ = read_from_path_or_url(path, librosa.load)
+    except Exception as e:
+        log.error(f'Unable to read audio file {path}, error: {e}')
+        return None
+
+    # If the durations of the audio samples are highly variable, the
+    # same coefficients will refer to time buckets of different lenghts.
+    # This means that a model will find difficult to use temporal
+    # information
+    NUM_TIME_BUCKETS = 100  # audio file will be split into 100 sequential time intervals before computing the Fourier transform needed for the MFCCs. A value of `100` will split a 1s audio file in 10ms intervals, which are enough for speech recognition. It will also split a 3 minutes song in 1.8s intervals, which are still small enough to capture enough detail for genre recognition  # noqa
+    N_MFCC_COEFFICIENTS = 20
+
+    num_samples = y.shape[0]
+
+    # truncate towards 1
+    hop_length = int(num_samples / NUM_TIME_BUCKETS + 1)
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=DeprecationWarning)
+        mfcc_coefficients = librosa.feature.mfcc(
+            y,
+            n_mfcc=N_MFCC_COEFFICIENTS,
+            hop_length=hop_length
+        ).reshape(-1)
+
+    return mfcc_coefficients
 
 
 class MFCCEncoder(BaseEncoder):
     is_trainable_encoder: bool = False
 
-    def __init__(self, is_target: bool = False):
+    def __init__(self, is_target: bool = False, num_workers: int = 1, cache_dir: Optional[str] = None):
         """
-    
+
         Uses `librosa` to compute the Mel-frequency spectral coefficients (MFCCs) of data within an audio file. They are a common feature used in speech and audio processing. Example: https://centaur.reading.ac.uk/88046/3/ESR_for_home_AI.pdf
 
         Input data to this mixer MUST BE the location of the audio files.
-    
+
         The output feature for any given audio file is a 2D array, flattened into a 1D one to comply with the expected format in lightwood mixers.
-    
-        This encoder currently does not support a `decode()` call; models with an audio output will not work. 
-    
+
+        This encoder currently does not support a `decode()` call; models with an audio output will not work.
+
         :param is_target: whether this encoder's column is the target. Is always false, as decoded audio is not available.
+        :param num_workers: amount of processes used to decode audio files and compute their MFCCs. Decoding (resampling in particular) is CPU bound, so this scales with the amount of available cores.
+        :param cache_dir: optional directory where computed MFCCs are stored, keyed by file path, modification time and size, so that re-training or predicting on the same local files skips decoding them. URLs are never cached.
         """  # noqa
         assert not is_target
         super().__init__(is_target)
+        self.num_workers = num_workers
+        self.cache_dir = cache_dir
+        self._prepared_example = None
 
     def prepare(self, priming_data: Iterable[str]):
         """
@@ -34,47 +78,85 @@ class MFCCEncoder(BaseEncoder):
         """  # noqa
         self.is_prepared = True
         priming_data = list(priming_data)
-        ele = self.encode([str(priming_data[0])])[0]
+        path = str(priming_data[0])
+        ele = self._compute([path])[0]
         self.output_size = len(ele)
 
+        # remembered so that the first file is not decoded a second time when the training data is encoded
+        key = self._get_file_key(path)
+        self._store_cached(key, ele)
+        self._prepared_example = (path, key, ele)
+
+    def _get_file_key(self, path: str) -> Optional[str]:
+        """
+        Identifies the contents of a local file by its path, modification time and size. Returns `None` for URLs and missing files.
+        """  # noqa
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return hashlib.sha256(f'{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}'.encode()).hexdigest()
+
+    def _load_cached(self, key: Optional[str]) -> Optional[np.ndarray]:
+        if self.cache_dir is None or key is None:
+            return None
+        try:
+            return np.load(os.path.join(self.cache_dir, f'{key}.npy'))
+        except (OSError, ValueError):
+            return None
+
+    def _store_cached(self, key: Optional[str], mfcc: np.ndarray) -> None:
+        if self.cache_dir is None or key is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f'{key}.npy')
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as fp:
+            np.save(fp, mfcc)
+        os.replace(tmp_path, path)
+
+    def _compute(self, paths: list) -> list:
+        """
+        Computes the MFCCs for a list of files, in a process pool if `num_workers` > 1.
+        """
+        if self.num_workers > 1 and len(paths) > 1:
+            with mp.Pool(processes=min(self.num_workers, len(paths))) as pool:
+                return pool.map(_compute_mfcc, paths)
+        return [_compute_mfcc(path) for path in paths]
+
     def encode(self, column_data: Iterable[str]) -> torch.Tensor:
         """
         Encode a list of audio files via mfccs.
 
+        Each distinct file is decoded once, and files found in the cache (see `cache_dir`) are not decoded at all.
+
         :param column_data: list of strings that point to paths or URLs of the audio files that will be encoded.
-        """
-        encoded_audio_arr = []
+        """  # noqa
+        column_data = list(column_data)
+        encoded = {}  # path -> mfccs
+        keys = {}
         for path in column_data:
-            try:
-                y, _ = read_from_path_or_url(path, librosa.load)
-            except Exception as e:
-                log.error(f'Unable to read audio file {path}, error: {e}')
-                encoded_audio_arr.append([0] * self.output_size)
+            if path in encoded or path in keys:
                 continue
+            key = self._get_file_key(path) if isinstance(path, str) else None
+            if self._prepared_example is not None and self._prepared_example[:2] == (path, key):
+                encoded[path] = self._prepared_example[2]
+                continue
+            cached = self._load_cached(key)
+            if cached is not None:
+                encoded[path] = cached
+            else:
+                keys[path] = key
 
-            # If the durations of the audio samples are highly variable, the
-            # same coefficients will refer to time buckets of different lenghts.
-            # This means that a model will find difficult to use temporal
-            # information
-            NUM_TIME_BUCKETS = 100  # audio file will be split into 100 sequential time intervals before computing the Fourier transform needed for the MFCCs. A value of `100` will split a 1s audio file in 10ms intervals, which are enough for speech recognition. It will also split a 3 minutes song in 1.8s intervals, which are still small enough to capture enough detail for genre recognition  # noqa
-            N_MFCC_COEFFICIENTS = 20
-
-            num_samples = y.shape[0]
-
-            # truncate towards 1
-            hop_length = int(num_samples / NUM_TIME_BUCKETS + 1)
-
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=DeprecationWarning)
-                mfcc_coefficients = librosa.feature.mfcc(
-                    y,
-                    n_mfcc=N_MFCC_COEFFICIENTS,
-                    hop_length=hop_length
-                ).reshape(-1)
-
-            encoded_audio_arr.append(mfcc_coefficients)
+        to_compute = list(keys.keys())
+        for path, mfcc in zip(to_compute, self._compute(to_compute)):
+            encoded[path] = mfcc
+            if mfcc is not None:
+                self._store_cached(keys[path], mfcc)
 
-        return torch.Tensor(encoded_audio_arr)
+        encoded_audio_arr = [encoded[path] if encoded[path] is not None else np.zeros(self.output_size)
+                             for path in column_data]
+        return torch.Tensor(np.array(encoded_audio_arr))
 
     def decode(self, _):
         raise Exception('This encoder is not bi-directional')
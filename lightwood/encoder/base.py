@@ -18,6 +18,7 @@ class BaseEncoder:
     :param  is_target: Whether the data to encode is the target, as per the problem definition.
     :param is_timeseries_encoder: Whether encoder represents sequential/time-series data. Lightwood must provide specific treatment for this kind of encoder
     :param is_trainable_encoder: Whether the encoder must return learned representations. Lightwood checks whether this flag is present in order to pass data to the feature representation via the ``prepare`` statement. 
+    :param supports_batch_encoding: Whether `encode()` can process a whole column in a single call. If `False`, `EncodedDs` will fall back to encoding one row at a time.
     
     Class Attributes:
     - is_prepared: Internal flag to signal that the `prepare()` method has been successfully executed.
@@ -31,6 +32,7 @@ class BaseEncoder:
 
     is_timeseries_encoder: bool = False
     is_trainable_encoder: bool = False
+    supports_batch_encoding: bool = True
 
     def __init__(self, is_target=False) -> None:
         self.is_target = is_target
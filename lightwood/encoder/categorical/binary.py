@@ -3,10 +3,11 @@ from typing import Dict, List, Iterable, Tuple
 
 import torch
 import numpy as np
+import torch.nn.functional as F
 from scipy.special import softmax
 
 from lightwood.encoder.base import BaseEncoder
-from lightwood.helpers.constants import _UNCOMMON_WORD
+from lightwood.encoder.categorical.utils import to_array, decode_argmax
 
 
 class BinaryEncoder(BaseEncoder):
@@ -102,15 +103,11 @@ class BinaryEncoder(BaseEncoder):
                 'You need to call "prepare" before calling "encode" or "decode".'
             )
 
-        ret = torch.zeros(size=(len(column_data), 2))
-
-        for idx, word in enumerate(column_data):
-            index = self.map.get(word, None)
-
-            if index is not None:
-                ret[idx, index] = 1
-
-        return torch.Tensor(ret)
+        indexes = torch.from_numpy(np.fromiter((self.map.get(word, -1) for word in column_data),
+                                               dtype=np.int64, count=len(column_data)))
+        # unknown categories go to an extra (dropped) dimension, leaving [0, 0]
+        indexes[indexes < 0] = 2
+        return F.one_hot(indexes, num_classes=3)[:, :2].float()
 
     def decode(self, encoded_data: torch.Tensor):
         """
@@ -123,16 +120,8 @@ class BinaryEncoder(BaseEncoder):
 
         :returns: Decoded values for each data point
         """  # noqa
-        encoded_data_list = encoded_data.tolist()
-        ret = []
-
-        for vector in encoded_data_list:
-            if not np.any(vector):  # Vector of all 0s -> unknown category
-                ret.append(_UNCOMMON_WORD)
-            else:
-                ret.append(self.rev_map[np.argmax(vector)])
-
-        return ret
+        encoded_data = to_array(encoded_data)
+        return decode_argmax(encoded_data, self.rev_map)
 
     def decode_probabilities(self, encoded_data: torch.Tensor) -> Tuple[List[str], List[List[float]], Dict[int, str]]:
         """
@@ -142,25 +131,16 @@ class BinaryEncoder(BaseEncoder):
 
         :returns: Decoded values for each data point, Probability vector for each category, and the reverse map of dimension to category name
         """  # noqa
-        encoded_data_list = encoded_data.tolist()
-        ret = []
-        probs = []
-
-        for vector in encoded_data_list:
-            if not np.any(vector):  # Vector of all 0s -> unknown category
-                ret.append(_UNCOMMON_WORD)
-            else:
-                ret.append(self.rev_map[np.argmax(vector)])
-
-            probs.append(self._norm_vec(vector))
-
+        encoded_data = to_array(encoded_data)
+        ret = decode_argmax(encoded_data, self.rev_map)
+        probs = list(self._norm_vec(encoded_data)) if len(encoded_data) > 0 else []
         return ret, probs, self.rev_map
 
     @staticmethod
-    def _norm_vec(vec: List[float]):
+    def _norm_vec(vec: np.ndarray):
         """
-        Given a vector, normalizes so that the sum of elements is 1, using softmax.
+        Given a (batch of) vector(s), normalizes so that the sum of elements is 1, using softmax.
 
         :param vec: Assigned weights for each category
         """  # noqa
-        return softmax(vec)
+        return softmax(vec, axis=-1)
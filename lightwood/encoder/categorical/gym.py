@@ -1,9 +1,8 @@
-import copy
 import time
 import torch
 
 import numpy as np
-from lightwood.helpers.torch import LightwoodAutocast
+from lightwood.helpers.torch import LightwoodAutocast, StateDictSnapshot
 
 
 class Gym:
@@ -31,6 +30,7 @@ class Gym:
         lowest_test_error = None
         last_test_error = None
         test_error_delta_buff = []
+        best_model = StateDictSnapshot()
 
         keep_training = True
 
@@ -107,7 +107,7 @@ class Gym:
 
                 if lowest_test_error is None or test_error < lowest_test_error:
                     lowest_test_error = test_error
-                    self.best_model = copy.deepcopy(self.model).to('cpu')
+                    best_model.save(self.model)
 
                 if last_test_error is None:
                     test_error_delta_buff.append(0)
@@ -129,4 +129,6 @@ class Gym:
                 if callback is not None:
                     callback(test_error, real_buff, predicted_buff)
 
+        if not best_model.empty:
+            self.best_model = best_model.restore(self.model)
         return self.best_model, lowest_test_error, int(time.time() - started)
@@ -3,10 +3,13 @@ from typing import Dict, List, Iterable, Tuple
 
 import torch
 import numpy as np
+import scipy.sparse
+import torch.nn.functional as F
 from scipy.special import softmax
 
 from lightwood.helpers.log import log
 from lightwood.encoder.base import BaseEncoder
+from lightwood.encoder.categorical.utils import to_array, decode_argmax
 from lightwood.helpers.constants import _UNCOMMON_WORD
 
 
@@ -117,18 +120,44 @@ class OneHotEncoder(BaseEncoder):
                 'You need to call "prepare" before calling "encode" or "decode".'
             )
 
-        ret = torch.zeros(size=(len(column_data), self.output_size))
+        indexes = self._get_indexes(column_data)
+        if self.use_unknown:
+            indexes[indexes < 0] = 0
+            return F.one_hot(indexes, num_classes=self.output_size).float()
+        else:
+            # unknown categories go to an extra (dropped) dimension, leaving a vector of all 0s
+            indexes[indexes < 0] = self.output_size
+            return F.one_hot(indexes, num_classes=self.output_size + 1)[:, :-1].float()
 
-        for idx, word in enumerate(column_data):
-            index = self.map.get(word, None)
+    def encode_sparse(self, column_data: Iterable[str]) -> scipy.sparse.csr_matrix:
+        """
+        Same as `encode()`, but the output is a `scipy.sparse.csr_matrix` that only stores the "1" of each row, which is much cheaper for columns with many categories.
+
+        :param column_data: Pre-processed data to encode
+        :returns: Sparse encoded data of form :math:`N_{rows} x N_{categories}`
+        """ # noqa
+        if not self.is_prepared:
+            raise Exception(
+                'You need to call "prepare" before calling "encode" or "decode".'
+            )
 
-            if index is not None:
-                ret[idx, index] = 1
+        indexes = self._get_indexes(column_data).numpy()
+        if self.use_unknown:
+            indexes[indexes < 0] = 0
+            known = np.ones(len(indexes), dtype=bool)
+        else:
+            known = indexes >= 0
 
-            if self.use_unknown and index is None:
-                ret[idx, 0] = 1
+        indptr = np.concatenate([[0], np.cumsum(known)])
+        return scipy.sparse.csr_matrix((np.ones(known.sum(), dtype=np.float32), indexes[known], indptr),
+                                       shape=(len(indexes), self.output_size))
 
-        return torch.Tensor(ret)
+    def _get_indexes(self, column_data: Iterable[str]) -> torch.Tensor:
+        """
+        Maps each category to its index in a single pass, with -1 for unrecognized categories.
+        """
+        return torch.from_numpy(np.fromiter((self.map.get(word, -1) for word in column_data),
+                                            dtype=np.int64, count=len(column_data)))
 
     def decode(self, encoded_data: torch.Tensor):
         """
@@ -137,18 +166,9 @@ class OneHotEncoder(BaseEncoder):
         :param: encoded_data:
         :returns Returns the original category names for encoded data.
         """ # noqa
-        encoded_data_list = encoded_data.tolist()
-        ret = []
-
-        for vector in encoded_data_list:
-
-            all_zeros = not np.any(vector)
-            if not self.use_unknown and all_zeros:
-                ret.append(_UNCOMMON_WORD)
-            else:
-                ret.append(self.rev_map[np.argmax(vector)])
-
-        return ret
+        encoded_data = to_array(encoded_data)
+        unknown = ~np.any(encoded_data, axis=1) if not self.use_unknown else np.zeros(len(encoded_data), dtype=bool)
+        return decode_argmax(encoded_data, self.rev_map, unknown)
 
     def decode_probabilities(self, encoded_data: torch.Tensor) -> Tuple[List[str], List[List[float]], Dict[int, str]]:
         """
@@ -158,25 +178,16 @@ class OneHotEncoder(BaseEncoder):
 
         :returns Decoded values for each data point, Probability vector for each category, and the reverse map of dimension to category name
         """ # noqa
-        encoded_data_list = encoded_data.tolist()
-        ret = []
-        probs = []
-
-        for vector in encoded_data_list:
-            if not np.any(vector):  # Vector of all 0s -> unknown category
-                ret.append(_UNCOMMON_WORD)
-            else:
-                ret.append(self.rev_map[np.argmax(vector)])
-
-            probs.append(self._norm_vec(vector))
-
+        encoded_data = to_array(encoded_data)
+        ret = decode_argmax(encoded_data, self.rev_map)  # vector of all 0s -> unknown category
+        probs = list(self._norm_vec(encoded_data)) if len(encoded_data) > 0 else []
         return ret, probs, self.rev_map
 
     @staticmethod
-    def _norm_vec(vec: List[float]):
+    def _norm_vec(vec: np.ndarray):
         """
-        Given a vector, normalizes so that the sum of elements is 1, using softmax.
+        Given a (batch of) vector(s), normalizes so that the sum of elements is 1, using softmax.
 
         :param vec: Assigned weights for each category
         """
-        return softmax(vec)
+        return softmax(vec, axis=-1)
@@ -0,0 +1,36 @@
+from typing import Dict, List, Optional
+
+import torch
+import numpy as np
+
+from lightwood.helpers.constants import _UNCOMMON_WORD
+
+
+def to_array(encoded_data: torch.Tensor) -> np.ndarray:
+    """
+    Converts the output of a mixer (tensor, array or nested lists) into a 2D float64 array, one row per data point.
+    """
+    if isinstance(encoded_data, torch.Tensor):
+        encoded_data = encoded_data.detach().cpu().numpy()
+    return np.atleast_2d(np.asarray(encoded_data, dtype=np.float64))
+
+
+def decode_argmax(encoded_data: np.ndarray, rev_map: Dict[int, str], unknown: Optional[np.ndarray] = None
+                  ) -> List[str]:
+    """
+    Batched argmax decoding of categorical encodings.
+
+    :param encoded_data: 2D array, see `to_array()`.
+    :param rev_map: map of dimension to category name.
+    :param unknown: boolean mask of rows that are decoded as the unknown category. By default, vectors of all 0s.
+
+    :returns: decoded category of each row.
+    """  # noqa
+    if len(encoded_data) == 0:
+        return []
+    indexes = np.argmax(encoded_data, axis=1)
+    indexes[~np.any(encoded_data, axis=1) if unknown is None else unknown] = -1
+    uniq_indexes, inverse = np.unique(indexes, return_inverse=True)
+    labels = np.empty(len(uniq_indexes), dtype=object)
+    labels[:] = [rev_map[i] if i >= 0 else _UNCOMMON_WORD for i in uniq_indexes.tolist()]
+    return labels[inverse].tolist()
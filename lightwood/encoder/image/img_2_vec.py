@@ -1,8 +1,10 @@
-from typing import List, Tuple, Iterable
+from typing import List, Tuple, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
 import torch
 from lightwood.encoder.image.helpers.img_to_vec import Img2Vec
 from lightwood.encoder.base import BaseEncoder
 from lightwood.helpers.log import log
+from lightwood.helpers.embedding_cache import get_embedding_cache, model_fingerprint
 
 try:
     import torchvision.transforms as transforms
@@ -32,6 +34,10 @@ class Img2VecEncoder(BaseEncoder):
         mean: List[float] = [0.485, 0.456, 0.406],
         std: List[float] = [0.229, 0.224, 0.225],
         device: str = '',
+        cache_embeddings: bool = False,
+        embedding_cache_path: Optional[str] = None,
+        batch_size: int = 32,
+        num_workers: Optional[int] = None,
     ):
         """
         :param stop_after: time budget, in seconds. 
@@ -40,6 +46,10 @@ class Img2VecEncoder(BaseEncoder):
         :param mean: Mean of pixel values
         :param std: Standard deviation of pixel values
         :param device: Name of the device that get_device_from_name will attempt to use
+        :param cache_embeddings: If True, images that were already encoded (by path or url) are not run through the network again, see `lightwood.helpers.embedding_cache`
+        :param embedding_cache_path: Optional SQLite file to persist cached embeddings in; implies `cache_embeddings`
+        :param batch_size: Amount of images that are run through the network at once
+        :param num_workers: Amount of threads that load and transform images; defaults to the `ThreadPoolExecutor` default
         """  # noqa
         assert not is_target
         super().__init__(is_target)
@@ -60,6 +70,13 @@ class Img2VecEncoder(BaseEncoder):
         self.stop_after = stop_after
 
         self.device_name = device
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+
+        self._embedding_cache = None
+        self._model_fingerprint = None
+        if cache_embeddings or embedding_cache_path is not None:
+            self._embedding_cache = get_embedding_cache(embedding_cache_path)
 
         # pil_logger = logging.getLogger('PIL')  # noqa
         # pil_logger.setLevel(logging.ERROR)  # noqa
@@ -100,17 +117,38 @@ class Img2VecEncoder(BaseEncoder):
         if not self.is_prepared:
             raise Exception('You need to call "prepare" before calling "encode" or "decode".')
 
-        img_tensors = [self._img_to_tensor(
-            Image.open(img_path)
-        ) for img_path in images]
-        vec_arr = []
+        if self._embedding_cache is not None and len(images) > 0:
+            if self._model_fingerprint is None:
+                self._model_fingerprint = model_fingerprint(self.model, self.scale, self.mean, self.std)
+            return self._embedding_cache.encode(self._model_fingerprint, list(images), self._encode_images)
+
+        return self._encode_images(images)
+
+    def _load_image(self, img_path: str) -> torch.Tensor:
+        return self._img_to_tensor(Image.open(img_path))
+
+    def _encode_images(self, images: List[str]) -> torch.Tensor:
+        """
+        Images are loaded and transformed by a thread pool (PIL releases the GIL for most of this work), one batch ahead of the batch that is being run through the network.
+        """  # noqa
+        images = list(images)
+        if len(images) == 0:
+            return torch.zeros((0, self.output_size))
+        batches = [images[i:i + self.batch_size] for i in range(0, len(images), self.batch_size)]
 
+        vec_arr = []
         self.model.eval()
-        with torch.no_grad():
-            for img_tensor in img_tensors:
-                vec = self.model(img_tensor.unsqueeze(0), batch=False)
-                vec_arr.append(vec)
-        return torch.stack(vec_arr).to('cpu')
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            pending = executor.map(self._load_image, batches[0])
+            for idx in range(len(batches)):
+                img_tensors = list(pending)
+                if idx + 1 < len(batches):
+                    pending = executor.map(self._load_image, batches[idx + 1])
+
+                with torch.inference_mode():
+                    vec_arr.append(self.model(torch.stack(img_tensors), batch=True).to('cpu'))
+
+        return torch.cat(vec_arr)
 
     def decode(self, encoded_values_tensor: torch.Tensor):
         """ Currently not supported """
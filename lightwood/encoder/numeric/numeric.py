@@ -9,6 +9,13 @@ from lightwood.helpers.general import is_none
 from type_infer.dtype import dtype
 
 
+def _safe_exp(x: float) -> float:
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return math.inf
+
+
 class NumericEncoder(BaseEncoder):
     """
     The numeric encoder takes numbers (float or integer) and converts it into tensors of the form:
@@ -63,36 +70,42 @@ class NumericEncoder(BaseEncoder):
         if not self.is_prepared:
             raise Exception('You need to call "prepare" before calling "encode" or "decode".')
 
-        ret = []
-        for real in data:
-            try:
-                real = float(real)
-            except Exception:
-                real = None
-            if self.is_target:
-                # Will crash if ``real`` is not a float, this is fine, targets should always have a value
-                vector = [0] * 3
-                vector[0] = 1 if real < 0 and not self.positive_domain else 0
-                vector[1] = math.log(abs(real)) if abs(real) > 0 else -20
-                vector[2] = real / self._abs_mean
-
-            else:
-                vector = [0] * 4
+        real = self._to_float_array(data)
+        abs_real = np.abs(real)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_abs = np.where(abs_real > 0, np.log(np.where(abs_real > 0, abs_real, 1)), -20)
+            norm = real / self._abs_mean
+        sign = (real < 0) & (not self.positive_domain)
+
+        if self.is_target:
+            ret = np.stack([sign, log_abs, norm], axis=1)
+        else:
+            ret = np.zeros((len(real), 4), dtype=np.float64)
+            valid = np.isfinite(real)
+            ret[valid, 0] = 1
+            ret[valid, 1] = log_abs[valid]
+            ret[valid, 2] = sign[valid]
+            ret[valid, 3] = norm[valid]
+
+        return torch.from_numpy(ret.astype(np.float32))
+
+    @staticmethod
+    def _to_float_array(data: Iterable) -> np.ndarray:
+        """
+        Coerces input data into a float64 array, with NaN wherever a value can't be cast to ``float``.
+        """
+        if isinstance(data, torch.Tensor):
+            return data.detach().cpu().numpy().astype(np.float64).reshape(-1)
+        try:
+            return np.asarray(data, dtype=np.float64).reshape(-1)
+        except (TypeError, ValueError):
+            real = np.empty(len(data), dtype=np.float64)
+            for i, value in enumerate(data):
                 try:
-                    if is_none(real):
-                        vector[0] = 0
-                    else:
-                        vector[0] = 1
-                        vector[1] = math.log(abs(real)) if abs(real) > 0 else -20
-                        vector[2] = 1 if real < 0 and not self.positive_domain else 0
-                        vector[3] = real / self._abs_mean
-                except Exception as e:
-                    vector = [0] * 4
-                    log.error(f'Can\'t encode input value: {real}, exception: {e}')
-
-            ret.append(vector)
-
-        return torch.Tensor(ret)
+                    real[i] = float(value)
+                except Exception:
+                    real[i] = np.nan
+            return real
 
     def decode(self, encoded_values: Union[List[Number], torch.Tensor], decode_log: bool = None) -> list:
         """
@@ -107,45 +120,50 @@ class NumericEncoder(BaseEncoder):
         if decode_log is None:
             decode_log = self.decode_log
 
-        ret = []
         if isinstance(encoded_values, torch.Tensor):
-            encoded_values = encoded_values.tolist()
-
-        for vector in encoded_values:
-            if self.is_target:
-                if np.isnan(
-                        vector[0]) or vector[0] == float('inf') or np.isnan(
-                        vector[1]) or vector[1] == float('inf') or np.isnan(
-                        vector[2]) or vector[2] == float('inf'):
+            encoded_values = encoded_values.detach().cpu().numpy()
+        encoded_values = np.asarray(encoded_values, dtype=np.float64)
+        if encoded_values.size == 0:
+            return []
+        encoded_values = encoded_values.reshape(len(encoded_values), -1)
+
+        if self.is_target:
+            vectors = encoded_values[:, :3]
+            weird = (np.isnan(vectors) | (vectors == float('inf'))).any(axis=1)
+            if weird.any():
+                for vector in encoded_values[weird].tolist():
                     log.error(f'Got weird target value to decode: {vector}')
-                    real_value = pow(10, 63)
-                else:
-                    if decode_log:
-                        sign = -1 if vector[0] > 0.5 else 1
-                        try:
-                            real_value = math.exp(vector[1]) * sign
-                        except OverflowError:
-                            real_value = pow(10, 63) * sign
-                    else:
-                        real_value = vector[2] * self._abs_mean
-
-                    if self.positive_domain:
-                        real_value = abs(real_value)
-
-                    if self._type == 'int':
-                        real_value = int(real_value)
 
+            if decode_log:
+                sign = np.where(encoded_values[:, 0] > 0.5, -1, 1)
+                # math.exp rather than np.exp, to keep decoded values bit-identical to the scalar implementation
+                real_values = np.array([_safe_exp(x) for x in encoded_values[:, 1].tolist()]) * sign
+                overflow = ~np.isfinite(real_values) & ~weird
             else:
-                if vector[0] < 0.5:
-                    ret.append(None)
-                    continue
+                sign = None
+                real_values = encoded_values[:, 2] * self._abs_mean
+                overflow = np.zeros(len(real_values), dtype=bool)
 
-                real_value = vector[3] * self._abs_mean
+            if self.positive_domain:
+                real_values = np.abs(real_values)
 
-                if self._type == 'int':
-                    real_value = round(real_value)
+            if self._type == 'int':
+                ret = [int(x) if not (w or o) else x for x, w, o in zip(real_values.tolist(), weird, overflow)]
+            else:
+                ret = real_values.tolist()
+
+            # out-of-range values are reported with a sentinel, as python ints (i.e. no float rounding)
+            for idx in np.flatnonzero(overflow):
+                ret[idx] = abs(pow(10, 63)) if self.positive_domain else pow(10, 63) * int(sign[idx])
+            for idx in np.flatnonzero(weird):
+                ret[idx] = pow(10, 63)
+
+        else:
+            real_values = encoded_values[:, 3] * self._abs_mean
+            is_null = (encoded_values[:, 0] < 0.5).tolist()
+            if self._type == 'int':
+                ret = [None if null else round(x) for x, null in zip(real_values.tolist(), is_null)]
+            else:
+                ret = [None if null else x for x, null in zip(real_values.tolist(), is_null)]
 
-            if isinstance(real_value, torch.Tensor):
-                real_value = real_value.item()
-            ret.append(real_value)
         return ret
@@ -2,6 +2,7 @@
 """
 import time
 import torch
+import numpy as np
 from torch.utils.data import DataLoader
 import os
 import pandas as pd
@@ -19,7 +20,8 @@ from transformers import (
     get_linear_schedule_with_warmup,
 )
 from lightwood.helpers.general import is_none
-from typing import Iterable
+from lightwood.helpers.embedding_cache import get_embedding_cache, model_fingerprint
+from typing import Iterable, List, Optional
 
 
 class PretrainedLangEncoder(BaseEncoder):
@@ -43,6 +45,9 @@ class PretrainedLangEncoder(BaseEncoder):
         output_type: str = None,
         embed_mode: bool = True,
         device: str = '',
+        inference_batch_size: int = 64,
+        cache_embeddings: bool = False,
+        embedding_cache_path: Optional[str] = None,
     ):
         """
         :param is_target: Whether this encoder represents the target. NOT functional for text generation yet.
@@ -54,6 +59,9 @@ class PretrainedLangEncoder(BaseEncoder):
         :param output_type: Data dtype of the target; if categorical/binary, the option to return logits is possible.
         :param embed_mode: If True, assumes the output of the encode() step is the CLS embedding (this can be trained or not). If False, returns the logits of the tuned task.
         :param device: name of the device that get_device_from_name will attempt to use.
+        :param inference_batch_size: amount of texts that are run through the transformer at once in encode()
+        :param cache_embeddings: If True, encode() skips the transformer for texts it has already seen (see `lightwood.helpers.embedding_cache`).
+        :param embedding_cache_path: Optional SQLite file to persist cached embeddings in; implies `cache_embeddings`.
         """ # noqa
         super().__init__(is_target)
 
@@ -64,6 +72,11 @@ class PretrainedLangEncoder(BaseEncoder):
         self._frozen = frozen
         self._batch_size = batch_size
         self._epochs = epochs
+        self._inference_batch_size = inference_batch_size
+        self._embedding_cache = None
+        self._model_fingerprint = None
+        if cache_embeddings or embedding_cache_path is not None:
+            self._embedding_cache = get_embedding_cache(embedding_cache_path)
 
         # Model setup
         self._model = None
@@ -294,34 +307,56 @@ class PretrainedLangEncoder(BaseEncoder):
         # Set model to testing/eval mode.
         self._model.eval()
 
-        encoded_representation = []
+        # Omit NaNs
+        texts = ["" if is_none(text) else str(text) for text in column_data]
+        if len(texts) == 0:
+            return torch.zeros((0, self.output_size or 0))
 
-        with torch.no_grad():
-            # Set the weights; this is GPT-2
-            for text in column_data:
+        if self._embedding_cache is not None:
+            if self._model_fingerprint is None:
+                self._model_fingerprint = model_fingerprint(self._model, self._pretrained_model_name)
+            model_id = f'{self._model_fingerprint}_{self.embed_mode}'
+            return self._embedding_cache.encode(model_id, texts, self._encode_texts)
 
-                # Omit NaNs
-                if is_none(text):
-                    text = ""
+        return self._encode_texts(texts)
 
-                # Tokenize the text with the built-in tokenizer.
-                inp = self._tokenizer.encode(
-                    text, truncation=True, return_tensors="pt"
+    def _encode_texts(self, texts: List[str]) -> torch.Tensor:
+        """
+        Runs the transformer on a list of (non-null) texts, see `encode()`.
+        """
+        # Tokenize everything at once with the (fast) built-in tokenizer, padding is added per batch below
+        input_ids = self._tokenizer(texts, truncation=True)["input_ids"]
+
+        # Batches are made of texts with similar lengths, so that little compute is spent on padding tokens
+        order = np.argsort([len(ids) for ids in input_ids], kind="stable")
+
+        encoded_batches = []
+        with torch.inference_mode():
+            for start in range(0, len(order), self._inference_batch_size):
+                batch = self._tokenizer.pad(
+                    {"input_ids": [input_ids[idx] for idx in order[start:start + self._inference_batch_size]]},
+                    return_tensors="pt"
                 ).to(self.device)
 
                 if self.embed_mode:  # Embedding mode ON; return [CLS]
-                    output = self._model.base_model(inp).last_hidden_state[:, 0]
+                    output = self._model.base_model(
+                        batch["input_ids"], attention_mask=batch["attention_mask"]
+                    ).last_hidden_state[:, 0]
 
                     # If the model has a pre-classifier layer, use this embedding.
                     if hasattr(self._model, "pre_classifier"):
                         output = self._model.pre_classifier(output)
 
                 else:  # Embedding mode off; return classes
-                    output = self._model(inp).logits
+                    output = self._model(batch["input_ids"], attention_mask=batch["attention_mask"]).logits
 
-                encoded_representation.append(output.detach())
+                encoded_batches.append(output.to('cpu'))
 
-        return torch.stack(encoded_representation).squeeze(1).to('cpu')
+        # Restore the original row order (also yields a regular tensor, usable outside of inference mode)
+        encoded_representation = torch.cat(encoded_batches)
+        ret = torch.empty(encoded_representation.shape, dtype=encoded_representation.dtype)
+        ret[torch.from_numpy(order)] = encoded_representation
+        return ret
 
     def decode(self, encoded_values_tensor, max_length=100):
         """
@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import pandas as pd
 
+from lightwood.helpers.log import log
 from lightwood.mixer.base import BaseMixer
 from lightwood.data.encoded_ds import EncodedDs
 from lightwood.api.types import PredictionArguments, SubmodelData
+from lightwood.helpers.prediction_cache import PredictionCache
 
 
 class BaseEnsemble:
@@ -20,6 +23,7 @@ class BaseEnsemble:
     Class Attributes:
     - mixers: List of mixers the ensemble will use.
     - supports_proba: For classification tasks, whether the ensemble supports yielding per-class scores rather than only returning the predicted label. 
+    - prediction_cache: Predictions of each mixer on the validation data (`data`), so that scoring the mixers and analyzing the ensemble call each mixer only once on it. Dropped when the ensemble is pickled, and by `clear_prediction_cache()`.
 
     NOTE: this ensemble is not functional. Do not use it when generating custom JsonAI objects, as the learning process will fail.
     """  # noqa
@@ -29,6 +33,7 @@ class BaseEnsemble:
     supports_proba: bool
     prepared: bool
     submodel_data: List[SubmodelData]
+    prediction_cache: Optional[PredictionCache]
 
     def __init__(self, target, mixers: List[BaseMixer], data: EncodedDs, fit: Optional[bool] = True) -> None:
         self.data = data
@@ -36,6 +41,74 @@ class BaseEnsemble:
         self.best_index = 0
         self.supports_proba = False
         self.submodel_data = []
+        self.prediction_cache = PredictionCache(data)
+
+    def predict_mixer(self, mixer: BaseMixer, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
+        """
+        Calls a mixer, reusing its predictions if `ds` holds the validation data and they were already computed.
+        """  # noqa
+        prediction_cache = getattr(self, 'prediction_cache', None)
+        if prediction_cache is None:
+            return mixer(ds, args=args)
+        return prediction_cache.predict(mixer, ds, args)
+
+    def dispatch_mixers(self, mixers: List[BaseMixer], ds: EncodedDs, args: PredictionArguments
+                        ) -> List[Union[pd.DataFrame, Exception, None]]:
+        """
+        Calls every mixer in `mixers` on `ds`.
+
+        By default mixers are called one after the other. If `args.concurrent_mixers` is set, they are all dispatched at once to a thread pool (the heavy lifting in LightGBM, XGBoost, torch and sklearn releases the GIL), and any mixer that has not finished after `args.mixer_timeout` seconds is given up on. Its call keeps running in the background, so mixers must be re-entrant (see `BaseMixer.__call__`).
+
+        :return: for each mixer, its predictions, the exception it raised, or `None` if it timed out.
+        """  # noqa
+        if not args.concurrent_mixers or len(mixers) < 2:
+            results = []
+            for mixer in mixers:
+                try:
+                    results.append(self.predict_mixer(mixer, ds, args))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=len(mixers), thread_name_prefix='lightwood_mixer')
+        futures = [executor.submit(self.predict_mixer, mixer, ds, args) for mixer in mixers]
+        wait(futures, timeout=args.mixer_timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        for mixer, future in zip(mixers, futures):
+            if not future.done():
+                log.warning(f'Mixer {type(mixer).__name__} timed out after {args.mixer_timeout} seconds, leaving it out')  # noqa
+                results.append(None)
+            else:
+                results.append(future.exception() if future.exception() is not None else future.result())
+        return results
+
+    def get_mixer_predictions(self, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
+        """
+        Calls all mixers (see `dispatch_mixers()`) and gathers their `prediction` columns, named `__mdb_mixer_{mixer class}`. Errors are raised, mixers that timed out are left out.
+        """  # noqa
+        predictions_df = pd.DataFrame()
+        for mixer, result in zip(self.mixers, self.dispatch_mixers(self.mixers, ds, args)):
+            if isinstance(result, Exception):
+                raise result
+            if result is not None:
+                predictions_df[f'__mdb_mixer_{type(mixer).__name__}'] = result['prediction']
+
+        if predictions_df.shape[1] == 0:
+            raise Exception(f'No mixer produced predictions within the timeout ({args.mixer_timeout} seconds)')
+        return predictions_df
+
+    def clear_prediction_cache(self) -> None:
+        """
+        Drops the cached validation predictions. Must be called once the mixers change, as well as when they are no longer needed.
+        """  # noqa
+        self.prediction_cache = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['prediction_cache'] = None
+        return state
 
     def __call__(self, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
         raise NotImplementedError()
@@ -36,7 +36,7 @@ class BestOf(BaseEnsemble):
                 else:
                     score_dict = evaluate_accuracies(
                         data.data_frame,
-                        mixer(data, args)['prediction'],
+                        self.predict_mixer(mixer, data, args)['prediction'],
                         target,
                         accuracy_functions,
                         ts_analysis=ts_analysis
@@ -66,15 +66,23 @@ class BestOf(BaseEnsemble):
     def __call__(self, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
         assert self.prepared
         if args.all_mixers:
-            predictions = {}
-            for mixer in self.mixers:
-                predictions[f'__mdb_mixer_{type(mixer).__name__}'] = mixer(ds, args=args)['prediction']
-            return pd.DataFrame(predictions)
+            return self.get_mixer_predictions(ds, args)
+        elif args.concurrent_mixers:
+            # all mixers are called at once, so that a failing or slow best mixer can be replaced without waiting
+            mixers = [self.mixers[mixer_index] for mixer_index in self.indexes_by_accuracy]
+            for mixer, result in zip(mixers, self.dispatch_mixers(mixers, ds, args)):
+                if isinstance(result, pd.DataFrame):
+                    return result
+                if isinstance(result, Exception):
+                    if mixer.stable:
+                        raise result
+                    log.warning(f'Unstable mixer {type(mixer).__name__} failed with exception: {result}. Trying next best')  # noqa
+            raise Exception(f'No mixer produced predictions within the timeout ({args.mixer_timeout} seconds)')
         else:
             for mixer_index in self.indexes_by_accuracy:
                 mixer = self.mixers[mixer_index]
                 try:
-                    return mixer(ds, args=args)
+                    return self.predict_mixer(mixer, ds, args)
                 except Exception as e:
                     if mixer.stable:
                         raise(e)
@@ -23,9 +23,6 @@ class MeanEnsemble(BaseEnsemble):
                 f'This ensemble can only be used regression problems! Got target dtype {dtype_dict[target]} instead!')
 
     def __call__(self, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
-        predictions_df = pd.DataFrame()
-        for mixer in self.mixers:
-            predictions_df[f'__mdb_mixer_{type(mixer).__name__}'] = mixer(ds, args=args)['prediction']
-
+        predictions_df = self.get_mixer_predictions(ds, args)
         return pd.DataFrame(predictions_df.mean(axis='columns'), columns=['prediction'])
 
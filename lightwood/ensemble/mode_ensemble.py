@@ -38,7 +38,7 @@ class ModeEnsemble(BaseEnsemble):
             for _, mixer in enumerate(mixers):
                 score_dict = evaluate_accuracies(
                     data.data_frame,
-                    mixer(data, args)['prediction'],
+                    self.predict_mixer(mixer, data, args)['prediction'],
                     target,
                     accuracy_functions,
                     ts_analysis=ts_analysis
@@ -53,39 +53,49 @@ class ModeEnsemble(BaseEnsemble):
                 self.mixer_scores[f'__mdb_mixer_{type(mixer).__name__}'] = avg_score
             self.prepared = True
 
-    def _pick_mode_highest_score(self, prediction: pd.Series):
-        """If the predictions are unimodal, return the mode. If there are multiple modes, return the mode whose voting
-        mixers have the highest score."""
-        prediction_counts = prediction.value_counts()
-
-        # If there is a clear winner, i.e. only one prediction
-        if len(prediction_counts) == 1:
-            return prediction_counts.index[0]
-
-        counts = prediction_counts.values  # how many times all predictions have appeared
-        max_count = np.max(counts)  # how many times the most frequent predictions have apppeared
-
-        # most frequent predictions and how many times they appeared
-        modes = prediction_counts[prediction_counts == max_count]
-
-        modes_predictions = modes.index  # most frequent predictions
-
-        # For each mode, get the sum of the scores of the predictors who voted for it
-        modes_predictions_scores = {}
-        for mode_prediction in modes_predictions:
-            voting_mixers_name = prediction[prediction == mode_prediction].index.tolist()
-            modes_predictions_scores[mode_prediction] = np.sum(
-                [self.mixer_scores[mixer_name] for mixer_name in voting_mixers_name])
-
-        # Return the mode with the maximum sum of accuracies
-        return max(modes_predictions_scores, key=modes_predictions_scores.get)
+    @staticmethod
+    def _vote(predictions: np.ndarray, scores: np.ndarray, max_cells: int = 10 ** 7) -> np.ndarray:
+        """
+        Picks the mode of each row. If there are multiple modes, the one whose voting mixers have the highest summed score wins, and if those sums are tied as well, the one that the earliest mixer voted for.
+
+        Labels are integer-encoded once, and votes (and their scores) are counted with `np.bincount` over a (row, label) grid, processed in chunks of at most `max_cells` cells.
+
+        :param predictions: (rows, mixers) array with the label predicted by each mixer. Missing predictions do not vote.
+        :param scores: score of each mixer.
+        :return: the winning label of each row (`None` if no mixer produced a prediction).
+        """  # noqa
+        n_rows, n_mixers = predictions.shape
+        codes, labels = pd.factorize(predictions.ravel())
+        codes = codes.reshape(n_rows, n_mixers)
+        n_labels = max(len(labels), 1)
+        scores = np.asarray(scores, dtype=float)
+
+        winners = np.empty(n_rows, dtype=np.int64)
+        chunk_size = max(1, max_cells // n_labels)
+        for start in range(0, n_rows, chunk_size):
+            chunk = codes[start:start + chunk_size]
+            n_chunk = len(chunk)
+            valid = chunk >= 0
+            cells = (np.arange(n_chunk)[:, None] * n_labels + chunk)[valid]
+            counts = np.bincount(cells, minlength=n_chunk * n_labels)
+            score_sums = np.bincount(cells, weights=np.broadcast_to(scores, chunk.shape)[valid],
+                                     minlength=n_chunk * n_labels)
+
+            # votes and summed score of the label each mixer predicted
+            cells = np.arange(n_chunk)[:, None] * n_labels + np.maximum(chunk, 0)
+            mixer_counts = np.where(valid, counts[cells], -1)
+            mixer_scores = np.where(mixer_counts == mixer_counts.max(axis=1, keepdims=True), score_sums[cells], -np.inf)
+
+            # argmax returns the first (i.e. earliest) mixer among the tied ones
+            best_mixer = (mixer_scores == mixer_scores.max(axis=1, keepdims=True)).argmax(axis=1)
+            winners[start:start + n_chunk] = chunk[np.arange(n_chunk), best_mixer]
+
+        # rows without any vote have a code of -1, which picks the trailing `None`
+        return np.append(np.asarray(labels, dtype=object), None)[winners]
 
     def __call__(self, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
         assert self.prepared
-        predictions_df = pd.DataFrame()
-        for mixer in self.mixers:
-            predictions_df[f'__mdb_mixer_{type(mixer).__name__}'] = mixer(ds, args=args)['prediction']
-
-        mode_df = predictions_df.apply(func=self._pick_mode_highest_score, axis='columns')
-
-        return pd.DataFrame(mode_df, columns=['prediction'])
+        predictions_df = self.get_mixer_predictions(ds, args)
+        scores = [self.mixer_scores[mixer_name] for mixer_name in predictions_df.columns]
+        modes = self._vote(predictions_df.values, scores)
+        return pd.DataFrame({'prediction': modes}, index=predictions_df.index)
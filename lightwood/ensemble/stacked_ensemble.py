@@ -57,7 +57,7 @@ class StackedEnsemble(MeanEnsemble):
     def predict(self, ds: EncodedDs, args: PredictionArguments) -> List:
         outputs = []
         for mixer in self.mixers:
-            output = mixer(ds, args=args)['prediction'].tolist()
+            output = self.predict_mixer(mixer, ds, args)['prediction'].tolist()
             output = np.expand_dims(np.array(output), self.agg_dim)
             outputs.append(output)
         return outputs
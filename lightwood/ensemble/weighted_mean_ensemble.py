@@ -36,7 +36,7 @@ class WeightedMeanEnsemble(BaseEnsemble):
             for _, mixer in enumerate(mixers):
                 score_dict = evaluate_accuracies(
                     data.data_frame,
-                    mixer(data, args)['prediction'],
+                    self.predict_mixer(mixer, data, args)['prediction'],
                     target,
                     accuracy_functions,
                     ts_analysis=ts_analysis
@@ -57,13 +57,21 @@ class WeightedMeanEnsemble(BaseEnsemble):
 
     def __call__(self, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
         assert self.prepared
-        df = pd.DataFrame()
-        for mixer in self.mixers:
-            df[f'__mdb_mixer_{type(mixer).__name__}'] = mixer(ds, args=args)['prediction']
+        df = self.get_mixer_predictions(ds, args)
 
-        mixer_weights = args.mixer_weights if args.mixer_weights else self.weights
-        avg_predictions_df = df.apply(lambda x: np.average(x, weights=mixer_weights), axis='columns')
-        return pd.DataFrame(avg_predictions_df, columns=['prediction'])
+        mixer_weights = np.asarray(args.mixer_weights if args.mixer_weights else self.weights, dtype=float)
+        if mixer_weights.shape != (len(self.mixers),):
+            raise Exception(f'Expected weight vector to have {len(self.mixers)} entries, got {len(mixer_weights)} instead.')  # noqa
+        # only mixers that answered in time (see `concurrent_mixers`) take part in the average
+        mixer_names = [f'__mdb_mixer_{type(mixer).__name__}' for mixer in self.mixers]
+        mixer_weights = mixer_weights[[mixer_names.index(col) for col in df.columns]]
+        weight_sum = mixer_weights.sum()
+        if weight_sum == 0:
+            raise ZeroDivisionError("Weights sum to zero, can't be normalized")
+
+        # (rows, mixers) @ (mixers,): weighted average of every row at once
+        avg_predictions = df.values.astype(float) @ mixer_weights / weight_sum
+        return pd.DataFrame({'prediction': avg_predictions}, index=df.index)
 
     @staticmethod
     def accuracies_to_weights(x: np.array) -> np.array:
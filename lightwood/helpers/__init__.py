@@ -3,7 +3,7 @@ from lightwood.helpers.general import is_none
 from lightwood.helpers.ts import get_group_matches, get_ts_groups, get_inferred_timestamps, add_tn_num_conf_bounds, \
     add_tn_cat_conf_bounds
 from lightwood.helpers.io import read_from_path_or_url
-from lightwood.helpers.parallelism import get_nr_procs, mut_method_call, run_mut_method
+from lightwood.helpers.parallelism import get_nr_procs, mut_method_call, run_mut_method, parallel_fit_mixers
 from lightwood.helpers.numeric import filter_nan_and_none
 from lightwood.helpers.seed import seed
 from lightwood.helpers.torch import average_vectors, concat_vectors_and_pad, LightwoodAutocast
@@ -12,4 +12,4 @@ from lightwood.helpers.torch import average_vectors, concat_vectors_and_pad, Lig
 __all__ = ['is_cuda_compatible', 'get_devices', 'mut_method_call', 'run_mut_method',
            'get_group_matches', 'get_ts_groups', 'is_none', 'read_from_path_or_url', 'seed',
            'get_inferred_timestamps', 'add_tn_num_conf_bounds', 'add_tn_cat_conf_bounds', 'get_nr_procs',
-           'average_vectors', 'concat_vectors_and_pad', 'LightwoodAutocast', 'filter_nan_and_none' ]  # noqa
+           'parallel_fit_mixers', 'average_vectors', 'concat_vectors_and_pad', 'LightwoodAutocast', 'filter_nan_and_none' ]  # noqa
@@ -1,7 +1,14 @@
 import torch
 import os
+import json
+from types import ModuleType
 from random import randint
+from typing import Callable, Dict, Optional
 from torch.cuda import device_count, get_device_capability
+from lightwood.helpers.log import log
+
+
+_gpu_probes: Dict[str, bool] = {}
 
 
 def is_cuda_compatible():
@@ -50,3 +57,51 @@ def get_device_from_name(device_name=''):
     else:
         device, _ = get_devices()
     return device
+
+
+def _get_probe_cache_path() -> Optional[str]:
+    cache_dir = os.environ.get('LIGHTWOOD_CACHE_DIR', '')
+    return os.path.join(cache_dir, 'gpu_support.json') if cache_dir else None
+
+
+def cached_gpu_probe(module: ModuleType, probe: Callable[[], bool]) -> bool:
+    """
+    Memoizes the result of `probe`, a (slow) check of whether `module` can train on a GPU.
+
+    The result is remembered for the rest of the process, keyed by the installed build of `module` and the visible CUDA devices. If `LIGHTWOOD_CACHE_DIR` is set, it is also stored in `gpu_support.json` in that directory, so that it is reused by other processes on the same machine.
+
+    :param module: library that is probed, e.g. `lightgbm`.
+    :param probe: callable that returns whether `module` works on the GPU.
+    :return: the (possibly cached) result of `probe`.
+    """  # noqa
+    try:
+        build = int(os.path.getmtime(module.__file__))
+    except (OSError, TypeError):
+        build = 0
+    key = f'{module.__name__}|{getattr(module, "__version__", "")}|{build}|{torch.cuda.device_count()}'
+    if key in _gpu_probes:
+        return _gpu_probes[key]
+
+    path = _get_probe_cache_path()
+    cached = {}
+    if path is not None:
+        try:
+            with open(path, 'r') as fp:
+                cached = json.load(fp)
+        except (OSError, ValueError):
+            cached = {}
+
+    if key not in cached:
+        cached[key] = bool(probe())
+        if path is not None:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w') as fp:
+                    json.dump(cached, fp)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                log.debug(f'Could not store the GPU support probe in {path}: {e}')
+
+    _gpu_probes[key] = cached[key]
+    return _gpu_probes[key]
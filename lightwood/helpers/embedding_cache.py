@@ -0,0 +1,207 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import torch
+import numpy as np
+
+from lightwood.helpers.log import log
+
+
+DEFAULT_MAX_ITEMS = 50000
+DEFAULT_MAX_DISK_BYTES = 2 * 1024 ** 3
+
+_caches: Dict[Tuple[Optional[str], int, int], 'EmbeddingCache'] = {}
+_caches_lock = threading.Lock()
+
+
+def model_fingerprint(model: torch.nn.Module, *extra) -> str:
+    """
+    Identifies a model by hashing its weights (and any extra settings that change its output), so that embeddings produced by e.g. two different fine-tunings of the same pretrained network never share cache entries.
+
+    :param model: torch module that produces the embeddings.
+    :param extra: any other values that affect the output, e.g. input preprocessing settings.
+    :return: hex digest that identifies the model.
+    """  # noqa
+    h = hashlib.sha256()
+    for name, tensor in model.state_dict().items():
+        h.update(name.encode())
+        h.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    for value in extra:
+        h.update(repr(value).encode())
+    return h.hexdigest()
+
+
+def get_embedding_cache(path: Optional[str] = None, max_items: int = DEFAULT_MAX_ITEMS,
+                        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES) -> 'EmbeddingCache':
+    """
+    Returns the embedding cache for the given settings, creating it if needed. Encoders that ask for the same settings share a single cache (entries are namespaced by model, see `EmbeddingCache.get_key()`).
+
+    :param path: optional SQLite file where embeddings are persisted. If `None`, the cache lives in memory only.
+    :param max_items: amount of embeddings kept in the in-memory LRU front.
+    :param max_disk_bytes: size budget of the on-disk store; least recently used entries are evicted beyond it.
+    """  # noqa
+    key = (os.path.abspath(path) if path is not None else None, max_items, max_disk_bytes)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(path=key[0], max_items=max_items, max_disk_bytes=max_disk_bytes)
+        return _caches[key]
+
+
+class EmbeddingCache:
+    """
+    Content-addressed store of embeddings, meant for encoders that run expensive models (transformers, CNNs) on values that repeat across calls, e.g. the same product titles in production traffic or the same validation frame being re-encoded during analysis.
+
+    Entries are keyed by a hash of the model identity and the input value. Lookups hit an in-memory LRU first and, if a `path` is set, an SQLite store that survives across processes, with least-recently-used eviction once it grows beyond `max_disk_bytes`.
+
+    Pickling the cache only keeps its settings: unpickling (e.g. when loading a predictor) yields the shared cache with those settings in the current process, see `get_embedding_cache()`.
+    """  # noqa
+    def __init__(self, path: Optional[str] = None, max_items: int = DEFAULT_MAX_ITEMS,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        """
+        :param path: optional SQLite file where embeddings are persisted.
+        :param max_items: amount of embeddings kept in memory.
+        :param max_disk_bytes: size budget of the on-disk store.
+        """  # noqa
+        self.path = path
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        self._disk_bytes = None
+
+    def __reduce__(self):
+        return get_embedding_cache, (self.path, self.max_items, self.max_disk_bytes)
+
+    def __len__(self):
+        return len(self._memory)
+
+    @staticmethod
+    def get_key(model_id: str, value) -> str:
+        h = hashlib.sha256(model_id.encode())
+        h.update(b'\0')
+        h.update(type(value).__name__.encode())
+        h.update(b'\0')
+        h.update(str(value).encode())
+        return h.hexdigest()
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute('CREATE TABLE IF NOT EXISTS embeddings '
+                               '(key TEXT PRIMARY KEY, value BLOB, nbytes INTEGER, accessed REAL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)')
+            self._conn.commit()
+            self._disk_bytes = self._conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM embeddings').fetchone()[0]
+        return self._conn
+
+    def _remember(self, key: str, embedding: torch.Tensor) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, keys: List[str]) -> List[Optional[torch.Tensor]]:
+        """
+        Looks up a list of keys, returning `None` for the ones that are not cached.
+        """
+        with self._lock:
+            found = [self._memory.get(key, None) for key in keys]
+            for key, embedding in zip(keys, found):
+                if embedding is not None:
+                    self._memory.move_to_end(key)
+
+            missing = list({key for key, embedding in zip(keys, found) if embedding is None})
+            conn = self._get_conn()
+            if conn is None or not missing:
+                return found
+
+            from_disk = {}
+            for start in range(0, len(missing), 500):  # stay below sqlite's limit of query parameters
+                chunk = missing[start:start + 500]
+                rows = conn.execute(f'SELECT key, value FROM embeddings WHERE key IN ({",".join("?" * len(chunk))})',
+                                    chunk).fetchall()
+                for key, value in rows:
+                    from_disk[key] = torch.from_numpy(np.frombuffer(value, dtype=np.float32).copy())
+            if from_disk:
+                now = time.time()
+                conn.executemany('UPDATE embeddings SET accessed = ? WHERE key = ?',
+                                 [(now, key) for key in from_disk])
+                conn.commit()
+                for key, embedding in from_disk.items():
+                    self._remember(key, embedding)
+
+            return [embedding if embedding is not None else from_disk.get(key, None)
+                    for key, embedding in zip(keys, found)]
+
+    def put(self, keys: List[str], embeddings: torch.Tensor) -> None:
+        """
+        Stores a batch of embeddings (one row of `embeddings` per key).
+        """
+        embeddings = embeddings.detach().to('cpu', torch.float32)
+        with self._lock:
+            for key, embedding in zip(keys, embeddings):
+                self._remember(key, embedding.clone())
+
+            conn = self._get_conn()
+            if conn is None:
+                return
+            now = time.time()
+            rows = [(key, embedding.numpy().tobytes(), embedding.numel() * 4, now)
+                    for key, embedding in zip(keys, embeddings)]
+            conn.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)', rows)
+            conn.commit()
+            self._disk_bytes += sum(row[2] for row in rows)  # replaced keys are over-counted until next eviction
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """
+        Drops the least recently used on-disk entries until the store is back within 90% of its size budget.
+        """  # noqa
+        target = int(self.max_disk_bytes * 0.9)
+        self._disk_bytes = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM embeddings').fetchone()[0]
+        evicted = 0
+        for key, nbytes in conn.execute('SELECT key, nbytes FROM embeddings ORDER BY accessed').fetchall():
+            if self._disk_bytes <= target:
+                break
+            conn.execute('DELETE FROM embeddings WHERE key = ?', (key,))
+            self._disk_bytes -= nbytes
+            evicted += 1
+        conn.commit()
+        log.debug(f'Evicted {evicted} embeddings from the cache at {self.path}')
+
+    def encode(self, model_id: str, values: List, encode_fn: Callable[[List], torch.Tensor]) -> torch.Tensor:
+        """
+        Embeds `values`, only calling `encode_fn` on the (deduplicated) values that are not cached yet.
+
+        :param model_id: identity of the model that produces the embeddings, see `model_fingerprint()`.
+        :param values: values to embed.
+        :param encode_fn: function that embeds a list of values into a (len(values), embedding dim) tensor.
+        :return: tensor with one embedding per value, in the same order as `values`.
+        """  # noqa
+        keys = [self.get_key(model_id, value) for value in values]
+        found = self.get(keys)
+
+        misses = {}
+        for key, value, embedding in zip(keys, values, found):
+            if embedding is None and key not in misses:
+                misses[key] = value
+
+        if misses:
+            computed = encode_fn(list(misses.values()))
+            self.put(list(misses.keys()), computed)
+            computed = dict(zip(misses.keys(), computed.detach().to('cpu', torch.float32)))
+            found = [embedding if embedding is not None else computed[key] for key, embedding in zip(keys, found)]
+
+        if len(found) == 0:
+            return torch.zeros((0, 0))
+        return torch.stack(found)
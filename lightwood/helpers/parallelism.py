@@ -1,7 +1,17 @@
 import os
-from typing import Dict
+import time
+import weakref
+import threading
+import traceback
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import dill
 import psutil
 import multiprocessing as mp
+import torch
+import torch.multiprocessing as torch_mp
+from joblib import parallel_backend
+from threadpoolctl import threadpool_limits
 from lightwood.helpers.log import log
 
 MAX_SEQ_ENCODERS = 20
@@ -73,3 +83,166 @@ def parallel_encoding_check(df, encoders):
         return True
 
     return False
+
+
+# state of the worker processes spawned by `parallel_fit_mixers()`
+_worker_datasets = None
+_worker_threads = None
+
+
+def get_worker_threads() -> Optional[int]:
+    """
+    :return: the thread budget of this process if it is a worker of `parallel_fit_mixers()`, else `None`.
+    """  # noqa
+    return _worker_threads
+
+
+def _share_datasets(fit_args: List[tuple]) -> Tuple[list, list]:
+    """
+    Finds the distinct `EncodedDs` objects behind the train/dev datasets in `fit_args` (unpacking `ConcatedEncodedDs`), and encodes each into tensors in shared memory.
+
+    :return: the datasets, and their (X, Y) tensors. Datasets that cache their encoded data on disk get `None` tensors instead, their workers load the same memory-mapped files.
+    """  # noqa
+    datasets = []
+    for _, *data in fit_args:
+        for ds in data:
+            for leaf in getattr(ds, 'encoded_ds_arr', [ds]):
+                if not any(leaf is other for other in datasets):
+                    datasets.append(leaf)
+
+    tensors = []
+    for ds in datasets:
+        X, Y = ds._get_X(), ds._get_Y()
+        if ds.cache_dir is not None:
+            tensors.append((None, None))
+        else:
+            tensors.append((X.share_memory_(), Y.share_memory_() if Y is not None else None))
+    return datasets, tensors
+
+
+def _init_fit_worker(datasets: bytes, tensors: list, n_threads: int) -> None:
+    global _worker_datasets, _worker_threads
+    _worker_datasets = dill.loads(datasets)
+    for ds, (X, Y) in zip(_worker_datasets, tensors):
+        ds.X_cache, ds.Y_cache = X, Y
+    _worker_threads = n_threads
+
+    # thread budget for torch, OpenMP/BLAS pools and for mixers that size their own pools with `get_nr_procs()`
+    os.environ['LIGHTWOOD_N_WORKERS'] = str(n_threads)
+    torch.set_num_threads(n_threads)
+
+
+def _encoder_state(encoder: Optional[object]) -> Dict[str, bytes]:
+    if encoder is None:
+        return {}
+    return {attr: dill.dumps(value) for attr, value in vars(encoder).items()}
+
+
+def _fit_mixer_worker(task: bytes) -> Tuple[Optional[bytes], float, float, Optional[str]]:
+    from lightwood.data.encoded_ds import ConcatedEncodedDs
+    mixer, method, data_idxs = dill.loads(task)
+    train_data, dev_data = [ConcatedEncodedDs([_worker_datasets[i] for i in idxs]) if len(idxs) > 1
+                            else _worker_datasets[idxs[0]] for idxs in data_idxs]
+    target_encoder = getattr(mixer, 'target_encoder', None)
+    encoder_state = _encoder_state(target_encoder)
+    started = time.time()
+    try:
+        # pool workers can't start loky (joblib's default backend) processes of their own, so joblib uses threads
+        with threadpool_limits(limits=_worker_threads), parallel_backend('threading', n_jobs=_worker_threads):
+            getattr(mixer, method)(train_data, dev_data)
+        # attributes the fit set on this process' copy of the target encoder (e.g. `Neural` sets `decode_log`)
+        changed = {attr: value for attr, value in vars(target_encoder).items()
+                   if encoder_state.get(attr) != dill.dumps(value)} if target_encoder is not None else {}
+        return dill.dumps((mixer, changed)), started, time.time() - started, None
+    except Exception as e:
+        log.debug(traceback.format_exc())
+        return None, started, time.time() - started, f'{type(e).__name__}: {e}'
+
+
+def _relink_target_encoder(mixer: object, fitted_mixer: object, changed: Dict[str, object]) -> None:
+    """
+    Points `fitted_mixer` back at the target encoder of `mixer`, which is shared with the predictor and other mixers, instead of the copy it was fitted with. Changes the fit made to the copy are applied to the shared encoder, as they would have been when fitting in this process.
+    """  # noqa
+    target_encoder = getattr(mixer, 'target_encoder', None)
+    if target_encoder is None or not hasattr(fitted_mixer, 'target_encoder'):
+        return
+    for attr, value in changed.items():
+        setattr(target_encoder, attr, value)
+    fitted_mixer.target_encoder = target_encoder
+
+
+def parallel_fit_mixers(fit_args: List[tuple], nr_procs: Optional[int] = None, runtime_log: Optional[dict] = None,
+                        method: str = 'fit') -> List[Tuple[Optional[object], Optional[str]]]:
+    """
+    Fits independent mixers concurrently, each in its own process.
+
+    The encoded train/dev matrices are placed in shared memory once and handed to every worker without copies (or, if the datasets cache their encoded data on disk, re-opened as memory maps). The available cores (`nr_procs`, by default `get_nr_procs()`) are split evenly between the mixers that run at the same time, and every worker limits torch, OpenMP and BLAS to its share.
+
+    Fitted mixers are unpickled copies, except for their `target_encoder`, which is re-linked to the encoder of the mixer that was passed in. Changes their fit made to the target encoder are applied to it in `fit_args` order, same as when fitting them one after the other.
+
+    Workers are started with the `spawn` method (so that CUDA and OpenMP runtimes are safe to use in them), which means scripts that call this must guard their entry point with `if __name__ == '__main__':`.
+
+    :param fit_args: list of (mixer, train data, dev data) tuples, with the arguments of each `mixer.fit()` call.
+    :param nr_procs: amount of cores to use.
+    :param runtime_log: if specified, the fit time of each mixer is stored here, as in the predictor's `runtime_log`.
+    :param method: mixer method that is called with the train and dev data, e.g. `partial_fit`.
+
+    :return: a (fitted mixer, error) tuple per element of `fit_args`. If fitting failed, the mixer is `None` and the error message is set.
+    """  # noqa
+    nr_procs = get_nr_procs() if nr_procs is None else nr_procs
+    n_workers = max(1, min(len(fit_args), nr_procs))
+    n_threads = max(1, nr_procs // n_workers)
+
+    datasets, tensors = _share_datasets(fit_args)
+    # encoded data travels separately, through shared memory
+    caches = [(ds.X_cache, ds.Y_cache) for ds in datasets]
+    for ds in datasets:
+        ds.X_cache, ds.Y_cache = None, None
+    try:
+        pickled_datasets = dill.dumps(datasets)
+    finally:
+        for ds, (X, Y) in zip(datasets, caches):
+            ds.X_cache, ds.Y_cache = X, Y
+
+    def idxs(ds):
+        return [next(i for i, other in enumerate(datasets) if other is leaf)
+                for leaf in getattr(ds, 'encoded_ds_arr', [ds])]
+
+    tasks = [dill.dumps((mixer, method, (idxs(train_data), idxs(dev_data))))
+             for mixer, train_data, dev_data in fit_args]
+
+    log.info(f'Fitting {len(fit_args)} mixers in {n_workers} processes, {n_threads} threads each')
+    ctx = torch_mp.get_context('spawn')
+    with ctx.Pool(processes=n_workers, initializer=_init_fit_worker,
+                  initargs=(pickled_datasets, tensors, n_threads)) as pool:
+        outputs = pool.map(_fit_mixer_worker, tasks, chunksize=1)
+
+    results = []
+    for (mixer, _, _), (fitted_mixer, started, runtime, error) in zip(fit_args, outputs):
+        log.info(f'Fitted mixer {type(mixer).__name__} in {round(runtime, 2)} seconds')
+        if runtime_log is not None:
+            runtime_log[(f'{method}_mixer', datetime.fromtimestamp(started))] = round(runtime, 2)
+        if fitted_mixer is not None:
+            fitted_mixer, changed = dill.loads(fitted_mixer)
+            _relink_target_encoder(mixer, fitted_mixer, changed)
+        results.append((fitted_mixer, error))
+    return results
+
+
+_instance_locks: Dict[int, threading.RLock] = {}
+_instance_locks_guard = threading.Lock()
+
+
+def instance_lock(obj: object) -> threading.RLock:
+    """
+    Returns a re-entrant lock that belongs to `obj`, created on first use.
+
+    Locks are kept outside of the object itself so that they are never pickled or deep-copied along with it (e.g. when a predictor is saved). They are keyed by identity, as many models define `__eq__` but are not hashable, and released once the object is garbage collected.
+    """  # noqa
+    with _instance_locks_guard:
+        key = id(obj)
+        lock = _instance_locks.get(key)
+        if lock is None:
+            lock = _instance_locks[key] = threading.RLock()
+            weakref.finalize(obj, _instance_locks.pop, key, None)
+        return lock
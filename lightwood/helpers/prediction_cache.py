@@ -0,0 +1,96 @@
+import json
+import hashlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array
+
+from lightwood.mixer.base import BaseMixer
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.api.types import PredictionArguments
+
+
+# consumed by the ensembles themselves, never by the mixers they call
+_ENSEMBLE_ONLY_ARGS = ('all_mixers', 'mixer_weights', 'concurrent_mixers', 'mixer_timeout')
+
+
+def dataset_fingerprint(ds: EncodedDs) -> str:
+    """
+    Identifies a dataset by hashing the contents of its data frame (column names, dtypes and values, not the index), so that two `EncodedDs` objects built separately from the same rows, e.g. the validation split filtered once when fitting the ensemble and once more when analyzing it, are recognized as the same data.
+
+    :param ds: encoded datasource.
+    :return: hex digest that identifies the data.
+    """  # noqa
+    df = ds.data_frame
+    h = hashlib.sha256()
+    h.update(repr((ds.target, len(df))).encode())
+    for col in df.columns:
+        values = df[col].values
+        try:
+            hashes = hash_array(values, categorize=False)
+        except (TypeError, ValueError):
+            # unhashable cells, e.g. lists in time series columns
+            hashes = hash_array(np.array([str(v) for v in values], dtype=object), categorize=False)
+        h.update(repr((col, str(df[col].dtype))).encode())
+        h.update(hashes.tobytes())
+    return h.hexdigest()
+
+
+class PredictionCache:
+    """
+    Holds the predictions of each mixer for a single dataset, normally the validation split.
+
+    Ensembles score (or weight) every mixer on the validation data when they are built, and `model_analyzer` then calls the ensemble on that same data again to calibrate confidence and compute accuracies. With this cache, each mixer is called once on it, keyed by mixer identity and dataset identity (see `dataset_fingerprint`). Any other dataset goes straight to the mixer.
+
+    Entries are only valid while the mixers stay unchanged, so the cache should be cleared (or dropped) once the mixers are updated, e.g. by `partial_fit()`.
+    """  # noqa
+    def __init__(self, data: EncodedDs):
+        """
+        :param data: the dataset whose predictions will be cached.
+        """
+        self.data = data
+        self._fingerprint: Optional[str] = None
+        self.entries: Dict[Tuple[int, str], Tuple[BaseMixer, pd.DataFrame]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = dataset_fingerprint(self.data)
+        return self._fingerprint
+
+    def is_cached_data(self, ds: EncodedDs) -> bool:
+        if ds is self.data:
+            return True
+        if ds.target != self.data.target or len(ds.data_frame) != len(self.data.data_frame):
+            return False
+        return dataset_fingerprint(ds) == self.fingerprint
+
+    @staticmethod
+    def _get_args_key(args: PredictionArguments) -> str:
+        args_dict = {k: v for k, v in args.to_dict().items() if k not in _ENSEMBLE_ONLY_ARGS}
+        return json.dumps(args_dict, sort_keys=True, default=str)
+
+    def predict(self, mixer: BaseMixer, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
+        """
+        :param mixer: any trained mixer.
+        :param ds: dataset to predict on. Only cached if it holds the same data as `self.data`.
+        :param args: prediction arguments passed to the mixer.
+        :return: the output of `mixer(ds, args=args)`, computed at most once for the cached dataset.
+        """  # noqa
+        if not self.is_cached_data(ds):
+            return mixer(ds, args=args)
+
+        # the mixer is stored along with its output so that its id can't be reused by another object
+        key = (id(mixer), self._get_args_key(args))
+        if key in self.entries:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.entries[key] = (mixer, mixer(ds, args=args))
+        return self.entries[key][1].copy()
+
+    def clear(self) -> None:
+        self.entries = {}
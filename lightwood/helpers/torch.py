@@ -1,7 +1,11 @@
+import os
 import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
 import torch
 from torch.nn.functional import pad
 from lightwood.helpers.device import get_devices
+from lightwood.helpers.log import log
 
 
 def concat_vectors_and_pad(vec_list, max_):
@@ -70,3 +74,78 @@ class LightwoodAutocast:
                 return func(*args, **kwargs)
 
         return decorate_autocast
+
+
+class StateDictSnapshot:
+    """
+    Keeps a CPU copy of the weights of a model, e.g. to remember the best model seen so far while training with early stopping.
+
+    The buffers are allocated once (on the first `save()`) and every later snapshot is copied into them in place with `copy_`, instead of cloning the whole module with `deepcopy` every time the model improves.
+
+    If a `checkpoint_path` is given, each snapshot is also written to that file with `torch.save`, in a background thread so that training does not wait for the disk.
+    """  # noqa
+    def __init__(self, checkpoint_path: Optional[str] = None):
+        """
+        :param checkpoint_path: optional file where every snapshot is (asynchronously) persisted.
+        """
+        self.checkpoint_path = checkpoint_path
+        self.buffers: Optional[Dict[str, torch.Tensor]] = None
+        self._executor = None
+        self._pending: Optional[Future] = None
+
+    @property
+    def empty(self) -> bool:
+        return self.buffers is None
+
+    def save(self, model: torch.nn.Module) -> None:
+        """
+        Stores the current weights of `model`.
+        """
+        self.wait()  # a checkpoint that is still being written reads from the buffers
+        state_dict = model.state_dict()
+        if self.buffers is None or self.buffers.keys() != state_dict.keys():
+            self.buffers = {name: torch.empty_like(tensor, device='cpu') for name, tensor in state_dict.items()}
+        with torch.no_grad():
+            for name, tensor in state_dict.items():
+                self.buffers[name].copy_(tensor)
+
+        if self.checkpoint_path is not None:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            self._pending = self._executor.submit(self._write_checkpoint)
+
+    def _write_checkpoint(self) -> None:
+        tmp_path = f'{self.checkpoint_path}.{os.getpid()}.tmp'
+        try:
+            torch.save(self.buffers, tmp_path)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            log.warning(f'Could not write checkpoint to {self.checkpoint_path}: {e}')
+
+    def wait(self) -> None:
+        """
+        Blocks until the last checkpoint (if any) has been written.
+        """
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    def restore(self, model: torch.nn.Module) -> torch.nn.Module:
+        """
+        Loads the stored weights back into `model` (in place). Does nothing if no snapshot was taken.
+
+        :return: the same `model`, for convenience.
+        """
+        if self.buffers is not None:
+            model.load_state_dict(self.buffers)
+        self.wait()
+        return model
+
+    def close(self) -> None:
+        """
+        Waits for the last checkpoint (if any) and shuts down the thread that writes them. Stored weights can still be restored afterwards, and a later `save()` starts a new thread.
+        """  # noqa
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -15,6 +15,19 @@ def get_ts_groups(df: pd.DataFrame, tss) -> list:
     return group_combinations
 
 
+def get_ts_group_positions(df: pd.DataFrame, group_by: List[str]) -> Dict[tuple, np.ndarray]:
+    """
+    Indexes the rows of each time series in a single pass, so that the rows of any group can be looked up instead of filtered from the whole dataframe.
+
+    :param df: Dataframe with time series data.
+    :param group_by: columns that define each time series (i.e. `TimeseriesSettings.group_by`).
+
+    :return: dictionary that maps each group combination (a tuple, as in `get_ts_groups`) to the positions of its rows in `df`.
+    """  # noqa
+    group_positions = df.groupby(by=group_by).indices
+    return {(g if isinstance(g, tuple) else tuple([g])): idxs for g, idxs in group_positions.items()}
+
+
 def get_group_matches(
         data: Union[pd.Series, pd.DataFrame],
         combination: tuple,
@@ -61,6 +61,7 @@ class ARIMAMixer(SkTime):
             mle_regression: bool = True,
             hamilton_representation: bool = False,
             concentrate_scale: bool = False,
+            nr_procs: int = 1
     ):
         """
         Wrapper for SkTime's AutoARIMA interface.
@@ -72,6 +73,7 @@ class ARIMAMixer(SkTime):
         :param ts_analysis: lightwood-produced stats about input time series
         :param auto_size: whether to filter out old data points if training split is bigger than a certain threshold (defined by the dataset sampling frequency). Enabled by default to avoid long training times in big datasets.
         :param use_stl: Whether to use de-trenders and de-seasonalizers fitted in the timeseries analysis phase.
+        :param nr_procs: amount of processes used to fit the forecasters of the different groups.
 
         For the rest of the parameters, please refer to SkTime's documentation.
         """  # noqa
@@ -125,6 +127,6 @@ class ARIMAMixer(SkTime):
             'concentrate_scale': concentrate_scale,
         }
         super().__init__(stop_after, target, dtype_dict, horizon, ts_analysis,
-                         model_path, model_kwargs, auto_size, sp, hyperparam_search, use_stl)
+                         model_path, model_kwargs, auto_size, sp, hyperparam_search, use_stl, nr_procs)
         self.name = 'AutoARIMA'
         self.stable = False
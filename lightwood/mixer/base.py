@@ -50,6 +50,8 @@ class BaseMixer:
                  args: PredictionArguments = PredictionArguments()) -> pd.DataFrame:
         """
         Calls a trained mixer to predict the target column given some input data.
+
+        Must be re-entrant: ensembles may call several mixers concurrently from different threads (see `PredictionArguments.concurrent_mixers`), and a call that timed out may still be running when the mixer is called again. Implementations should not store per-call state in the mixer, and should serialize any access to state that their underlying library mutates when predicting (see `lightwood.helpers.parallelism.instance_lock`).
         
         :param ds: encoded representations of input data.
         :param args: a `lightwood.api.types.PredictionArguments` object, including all relevant inference-time arguments to customize the behavior.
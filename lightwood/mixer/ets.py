@@ -33,7 +33,8 @@ class ETSMixer(SkTime):
             additive_only: bool = False,
             ignore_inf_ic: bool = True,
             n_jobs: Optional[int] = None,
-            random_state: Optional[int] = None
+            random_state: Optional[int] = None,
+            nr_procs: int = 1
     ):
         """
         Wrapper for SkTime's AutoETS interface.
@@ -45,6 +46,7 @@ class ETSMixer(SkTime):
         :param ts_analysis: lightwood-produced stats about input time series
         :param auto_size: whether to filter out old data points if training split is bigger than a certain threshold (defined by the dataset sampling frequency). Enabled by default to avoid long training times in big datasets.
         :param use_stl: Whether to use de-trenders and de-seasonalizers fitted in the timeseries analysis phase.
+        :param nr_procs: amount of processes used to fit the forecasters of the different groups.
 
         For the rest of the parameters, please refer to SkTime's documentation.
         """  # noqa
@@ -72,6 +74,6 @@ class ETSMixer(SkTime):
             'random_state': random_state
         }
         super().__init__(stop_after, target, dtype_dict, horizon, ts_analysis,
-                         model_path, model_kwargs, auto_size, sp, hyperparam_search, use_stl)
+                         model_path, model_kwargs, auto_size, sp, hyperparam_search, use_stl, nr_procs)
         self.name = 'AutoETS'
         self.stable = False
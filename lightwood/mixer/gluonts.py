@@ -1,4 +1,5 @@
 import importlib
+import threading
 from copy import deepcopy
 from typing import Dict, Union, Optional
 
@@ -19,6 +20,9 @@ from lightwood.mixer.base import BaseMixer
 from lightwood.api.types import PredictionArguments
 from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
 
+# guards the global RNGs while forecasts are sampled, as mixers may be called concurrently (see `BaseMixer.__call__`)
+_sampling_lock = threading.Lock()
+
 
 class GluonTSMixer(BaseMixer):
     horizon: int
@@ -149,8 +153,6 @@ class GluonTSMixer(BaseMixer):
         """ 
         Calls the mixer to emit forecasts.
         """  # noqa
-        mx.random.seed(self.seed)
-        np.random.seed(self.seed)
         length = sum(ds.encoded_ds_lengths) if isinstance(ds, ConcatedEncodedDs) else len(ds)
 
         ydf = pd.DataFrame(index=np.arange(length), dtype=object)
@@ -168,7 +170,11 @@ class GluonTSMixer(BaseMixer):
         df = ds.data_frame
         ydf['__original_index'] = df['__mdb_original_index'].values
         input_ds = self._make_initial_ds(df, groups=groups)  # TODO test with novel group
-        forecasts = list(self.model.predict(input_ds))
+        # forecasts are sampled from the global RNGs, seeded for reproducibility
+        with _sampling_lock:
+            mx.random.seed(self.seed)
+            np.random.seed(self.seed)
+            forecasts = list(self.model.predict(input_ds))
         for group, group_forecast in zip(groups, forecasts):
             _, subdf = get_group_matches(df, (group, ), gby)
             idx = ydf[ydf['__original_index'] == max(subdf['__mdb_original_index'])].index.values[0]
@@ -0,0 +1,72 @@
+import copy
+from typing import Iterator, Optional, Tuple
+
+import torch
+
+from lightwood.data.encoded_ds import EncodedDs
+
+
+class TensorDataLoader:
+    """
+    Drop-in replacement for a `torch.utils.data.DataLoader` over an `EncodedDs`, for mixers that train on the full encoded feature matrix.
+
+    The encoded inputs and target are materialized once as two contiguous tensors. Each batch is then gathered with a single `index_select` per tensor (over a fresh random permutation every epoch if `shuffle` is set), instead of one `__getitem__` call per row plus the default collate function.
+
+    If `device` is a CUDA device, the materialized tensors live in pinned memory and batches are copied to the device asynchronously.
+    """  # noqa
+    def __init__(self, ds: EncodedDs, batch_size: int, shuffle: bool = False,
+                 device: Optional[torch.device] = None):
+        """
+        :param ds: encoded datasource, must contain the target column.
+        :param batch_size: amount of rows per batch. The last batch of each epoch may be smaller.
+        :param shuffle: whether to iterate over the rows in a different random order every epoch.
+        :param device: device where the network lives. Batches are yielded on this device.
+        """  # noqa
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.device = device
+        self.pin_memory = device is not None and torch.device(device).type == 'cuda' and torch.cuda.is_available()
+
+        self.X = ds.get_encoded_data(include_target=False).float().contiguous()
+        self.Y = ds.get_encoded_column_data(ds.target).float().contiguous()
+        if self.pin_memory:
+            self.X = self.X.pin_memory()
+            self.Y = self.Y.pin_memory()
+
+    def subset(self, idx: torch.Tensor) -> 'TensorDataLoader':
+        """
+        :param idx: positions of the rows to keep.
+        :return: a loader with the same settings that only iterates over the rows in `idx`.
+        """
+        loader = copy.copy(self)
+        loader.X = self.X.index_select(0, idx)
+        loader.Y = self.Y.index_select(0, idx)
+        if self.pin_memory:
+            loader.X = loader.X.pin_memory()
+            loader.Y = loader.Y.pin_memory()
+        return loader
+
+    def __len__(self) -> int:
+        return (len(self.X) + self.batch_size - 1) // self.batch_size
+
+    def _gather(self, data: torch.Tensor, idx: torch.Tensor) -> torch.Tensor:
+        if not self.pin_memory:
+            return data.index_select(0, idx)
+        batch = torch.empty((len(idx), *data.shape[1:]), dtype=data.dtype, pin_memory=True)
+        torch.index_select(data, 0, idx, out=batch)
+        return batch.to(self.device, non_blocking=True)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        n_rows = len(self.X)
+        if not self.shuffle:
+            # contiguous slices, no gathering needed
+            for start in range(0, n_rows, self.batch_size):
+                end = start + self.batch_size
+                yield self.X[start:end].to(self.device or 'cpu', non_blocking=self.pin_memory), \
+                    self.Y[start:end].to(self.device or 'cpu', non_blocking=self.pin_memory)
+            return
+
+        order = torch.randperm(n_rows)
+        for start in range(0, n_rows, self.batch_size):
+            idx = order[start:start + self.batch_size]
+            yield self._gather(self.X, idx), self._gather(self.Y, idx)
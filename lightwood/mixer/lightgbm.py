@@ -1,18 +1,20 @@
 import time
 import inspect
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Union
 import torch
 import optuna
 import lightgbm
 import numpy as np
 import pandas as pd
+import scipy.sparse
 from sklearn.preprocessing import OrdinalEncoder
 import optuna.integration.lightgbm as optuna_lightgbm
 from type_infer.dtype import dtype
 from lightwood.encoder.base import BaseEncoder
 from lightwood.helpers.log import log
+from lightwood.helpers.parallelism import get_worker_threads
 from lightwood.mixer.base import BaseMixer
-from lightwood.helpers.device import get_devices
+from lightwood.helpers.device import get_devices, cached_gpu_probe
 from lightwood.api.types import PredictionArguments
 from lightwood.data.encoded_ds import EncodedDs
 
@@ -20,22 +22,38 @@ from lightwood.data.encoded_ds import EncodedDs
 optuna.logging.set_verbosity(optuna.logging.CRITICAL)
 
 
-def check_gpu_support():
+def _probe_gpu_support() -> bool:
     try:
+        device, nr_devices = get_devices()
+        if nr_devices == 0 or str(device) == 'cpu':
+            return False
         data = np.random.rand(50, 2)
         label = np.random.randint(2, size=50)
         train_data = lightgbm.Dataset(data, label=label)
         params = {'num_iterations': 1, 'device': 'gpu'}
         lightgbm.train(params, train_set=train_data)
-        device, nr_devices = get_devices()
-        if nr_devices > 0 and str(device) != 'cpu':
-            return True
-        else:
-            return False
+        return True
     except Exception:
         return False
 
 
+def check_gpu_support() -> bool:
+    """
+    Whether LightGBM can train on a GPU. The probe trains a throwaway model, so its result is memoized (see `cached_gpu_probe`).
+    """  # noqa
+    return cached_gpu_probe(lightgbm, _probe_gpu_support)
+
+
+class _SharedDataset(lightgbm.Dataset):
+    """
+    A `lightgbm.Dataset` that is not duplicated by `copy.copy`.
+
+    The optuna tuner shallow-copies the training set before each trial. A copy of a constructed dataset shares its handle, and both objects free it when garbage collected (the "double free" crash), while a copy of a dataset that was not constructed yet bins the whole data again on every trial. Returning the same object lets every trial reuse the bin mappers. Both behaviors are pinned by `test_optuna_dataset_copies` in the unit tests.
+    """  # noqa
+    def __copy__(self):
+        return self
+
+
 class LightGBM(BaseMixer):
     model: lightgbm.LGBMModel
     ordinal_encoder: OrdinalEncoder
@@ -89,6 +107,8 @@ class LightGBM(BaseMixer):
         self.supports_proba = dtype_dict[target] in self.cls_dtypes
         self.stable = True
         self.target_encoder = target_encoder
+        self.use_sparse = False
+        self.train_dataset = None
 
         # GPU Only available via --install-option=--gpu with opencl-dev and libboost dev (a bunch of them) installed, so let's turn this off for now and we can put it behind some flag later # noqa
         gpu_works = check_gpu_support()
@@ -113,15 +133,7 @@ class LightGBM(BaseMixer):
         weight_map = getattr(self.target_encoder, 'target_weights', None)
 
         for subset_name in data.keys():
-            for input_col in self.input_cols:
-                if data[subset_name]['data'] is None:
-                    data[subset_name]['data'] = data[subset_name]['ds'].get_encoded_column_data(
-                        input_col).to(self.device)
-                else:
-                    enc_col = data[subset_name]['ds'].get_encoded_column_data(input_col)
-                    data[subset_name]['data'] = torch.cat((data[subset_name]['data'], enc_col.to(self.device)), 1)
-
-            data[subset_name]['data'] = data[subset_name]['data'].cpu().numpy()
+            data[subset_name]['data'] = self._get_input_data(data[subset_name]['ds'])
 
             label_data = data[subset_name]['ds'].get_column_original_data(self.target)
 
@@ -146,6 +158,22 @@ class LightGBM(BaseMixer):
 
         return data
 
+    def _get_input_data(self, ds: EncodedDs):
+        """
+        Builds the feature matrix for the input columns, as a `scipy.sparse` CSR matrix if `self.use_sparse` is set (LightGBM consumes it natively) and as a dense numpy array otherwise.
+        """  # noqa
+        if self.use_sparse:
+            return scipy.sparse.hstack([ds.get_encoded_column_data(col, sparse=True) for col in self.input_cols],
+                                       format='csr')
+
+        data = None
+        for input_col in self.input_cols:
+            if data is None:
+                data = ds.get_encoded_column_data(input_col).to(self.device)
+            else:
+                data = torch.cat((data, ds.get_encoded_column_data(input_col).to(self.device)), 1)
+        return data.cpu().numpy()
+
     def fit(self, train_data: EncodedDs, dev_data: EncodedDs) -> None:
         """
         Fits the LightGBM model.
@@ -163,6 +191,11 @@ class LightGBM(BaseMixer):
         self.fit_data_len = len(data['train']['ds'])
         self.positive_domain = getattr(train_data.encoders.get(self.target, None), 'positive_domain', False)
 
+        # wide one-hot columns are handed to LightGBM as sparse matrices instead of mostly-zero dense ones
+        self.use_sparse = train_data.prefers_sparse(self.input_cols)
+        if self.use_sparse:
+            log.info('Using a sparse representation of the input data')
+
         output_dtype = self.dtype_dict[self.target]
         data = self._to_dataset(data, output_dtype)
 
@@ -183,6 +216,10 @@ class LightGBM(BaseMixer):
             'device_type': self.device_str,
         }
 
+        # inside a `parallel_fit_mixers()` worker, stay within its share of the cores
+        if get_worker_threads() is not None:
+            self.params['num_threads'] = get_worker_threads()
+
         if objective == 'multiclass':
             self.all_classes = self.ordinal_encoder.categories_[0]
             self.params['num_class'] = self.all_classes.size
@@ -191,27 +228,21 @@ class LightGBM(BaseMixer):
         if self.device_str == 'gpu':
             self.params['gpu_use_dp'] = True
 
-        # Determine time per iterations
+        # Prepare the data. The datasets keep their raw data (`free_raw_data=False`) so that LightGBM can rebuild them if a later parameter change requires it, instead of failing. Optuna tunes `min_data_in_leaf`, which requires `feature_pre_filter` to be off from the start, as the binned data is reused by every trial.  # noqa
+        dataset_params = {'feature_pre_filter': False} if self.use_optuna else None
+        train_dataset = _SharedDataset(data['train']['data'], label=data['train']['label_data'],
+                                       weight=data['train']['weights'], params=dataset_params, free_raw_data=False)
+        dev_dataset = _SharedDataset(data['dev']['data'], label=data['dev']['label_data'],
+                                     weight=data['dev']['weights'], params=dataset_params, reference=train_dataset,
+                                     free_raw_data=False)
+
+        # Determine time per iterations (this includes constructing the training dataset, which is reused afterwards)
         start = time.time()
         self.params['num_iterations'] = 1
-        '''
-        Why construst a dataset here instead of using the training dataset?
-
-        Because it guards against the following crash:
-
-        WARNING:lightwood-1613058:Exception: Cannot change feature_pre_filter after constructed Dataset handle. when training mixer: <lightwood.mixer.lightgbm.LightGBM object at 0x7f39148eae20>
-        feature_fraction, val_score: inf:   0%|                                 | 0/7 [00:00<?, ?it/s]
-        free(): double free detected in tcache 2
-
-        Only happens sometimes and I can find no pattern as to when, happens for multiple input and target types.
-
-        Why does the following crash happen and what does it mean? No idea, closest relationships I can find is /w optuna modifying parameters after the dataset is create: https://github.com/microsoft/LightGBM/issues/4019 | But why this would apply here makes no sense. Could have to do with the `train` process of lightgbm itself setting a "set only once" property on a dataset when it starts. Dunno, if you find out replace this comment with the real reason.
-        ''' # noqa
         kwargs = {}
         if 'verbose_eval' in inspect.getfullargspec(lightgbm.train).args:
             kwargs['verbose_eval'] = False
-        self.model = lightgbm.train(self.params, lightgbm.Dataset(data['train']['data'], label=data['train']
-                                    ['label_data'], weight=data['train']['weights']), **kwargs)
+        self.model = lightgbm.train(self.params, train_dataset, **kwargs)
         end = time.time()
         seconds_for_one_iteration = max(0.1, end - start)
 
@@ -239,13 +270,6 @@ class LightGBM(BaseMixer):
 
         self.params['early_stopping_rounds'] = 5
 
-        # Prepare the data
-        train_dataset = lightgbm.Dataset(data['train']['data'], label=data['train']['label_data'],
-                                         weight=data['train']['weights'])
-
-        dev_dataset = lightgbm.Dataset(data['dev']['data'], label=data['dev']['label_data'],
-                                       weight=data['dev']['weights'])
-
         if 'verbose_eval' in inspect.getfullargspec(lightgbm.train).args:
             kwargs['verbose_eval'] = False
         self.model = model_generator.train(
@@ -255,6 +279,10 @@ class LightGBM(BaseMixer):
         self.num_iterations = self.model.best_iteration
         log.info(f'Lightgbm model contains {self.model.num_trees()} weak estimators')
 
+        # later calls to `partial_fit` bin their data with the same bin mappers, which only needs the constructed handle
+        train_dataset.data = None
+        self.train_dataset = train_dataset
+
         if self.fit_on_dev:
             self.partial_fit(dev_data, train_data)
 
@@ -274,13 +302,21 @@ class LightGBM(BaseMixer):
         output_dtype = self.dtype_dict[self.target]
         data = self._to_dataset(data, output_dtype)
 
+        # reuse the bin mappers of the original training data if it is still around (it is not pickled)
+        reference = getattr(self, 'train_dataset', None)
+        dataset_params = reference.get_params() if reference is not None else None
         train_dataset = lightgbm.Dataset(data['retrain']['data'], label=data['retrain']['label_data'],
-                                         weight=data['retrain']['weights'])
+                                         weight=data['retrain']['weights'], params=dataset_params, reference=reference)
         dev_dataset = lightgbm.Dataset(data['dev']['data'], label=data['dev']['label_data'],
-                                       weight=data['dev']['weights'])
+                                       weight=data['dev']['weights'], params=dataset_params,
+                                       reference=reference if reference is not None else train_dataset)
 
         log.info(f'Updating lightgbm model with {iterations} iterations')
         self.params['num_iterations'] = int(iterations)
+        if get_worker_threads() is not None:
+            self.params['num_threads'] = get_worker_threads()
+        else:
+            self.params.pop('num_threads', None)
 
         kwargs = {}
         if 'verbose_eval' in inspect.getfullargspec(lightgbm.train).args:
@@ -292,6 +328,11 @@ class LightGBM(BaseMixer):
             init_model=self.model, **kwargs)
         log.info(f'Model now has a total of {self.model.num_trees()} weak estimators')
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('train_dataset', None)  # holds a native handle, only used to speed up `partial_fit`
+        return state
+
     def __call__(self, ds: EncodedDs,
                  args: PredictionArguments = PredictionArguments()) -> pd.DataFrame:
         """
@@ -302,14 +343,12 @@ class LightGBM(BaseMixer):
 
         :return: dataframe with predictions.
         """
-        data = None
-        for input_col in self.input_cols:
-            if data is None:
-                data = ds.get_encoded_column_data(input_col).to(self.device)
-            else:
-                data = torch.cat((data, ds.get_encoded_column_data(input_col).to(self.device)), 1)
+        return self._predict(self._get_input_data(ds), args)
 
-        data = data.cpu().numpy()
+    def _predict(self, data: Union[np.ndarray, scipy.sparse.csr_matrix], args: PredictionArguments) -> pd.DataFrame:
+        """
+        Predicts and decodes the target for a feature matrix built with `_get_input_data()`.
+        """
         raw_predictions = self.model.predict(data)
 
         if self.ordinal_encoder is not None:
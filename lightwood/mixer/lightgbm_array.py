@@ -1,10 +1,13 @@
+import math
 from copy import deepcopy
 from typing import Dict, List, Union, Optional
 
 import numpy as np
 import pandas as pd
+import multiprocessing as mp
 
 from lightwood.helpers.log import log
+from lightwood.helpers.parallelism import parallel_fit_mixers
 from lightwood.mixer.helpers.ts import _apply_stl_on_training, _stl_transform, _stl_inverse_transform
 from lightwood.encoder.base import BaseEncoder
 from lightwood.mixer.base import BaseMixer
@@ -14,7 +17,11 @@ from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
 
 
 class LightGBMArray(BaseMixer):
-    """LightGBM-based model, intended for usage in time series tasks."""
+    """
+    LightGBM-based model, intended for usage in time series tasks. One `LightGBM` mixer is trained for each step of the forecast horizon.
+
+    If `nr_procs` is bigger than one, the horizon models are trained concurrently in a pool of processes (see `parallel_fit_mixers()`), each limited to its share of the cores. The encoded data is built once and shared with the workers.
+    """  # noqa
     models: List[LightGBM]
     submodel_stop_after: float
     target: str
@@ -32,8 +39,21 @@ class LightGBMArray(BaseMixer):
             target_encoder: BaseEncoder,
             ts_analysis: Dict[str, object],
             use_stl: bool,
-            tss: TimeseriesSettings
+            tss: TimeseriesSettings,
+            nr_procs: int = 1
     ):
+        """
+        :param stop_after: time budget in seconds, for the whole horizon.
+        :param target: name of the target column that the mixer will learn to predict.
+        :param dtype_dict: dictionary with dtypes of all columns in the data.
+        :param input_cols: list of column names.
+        :param fit_on_dev: unused, the horizon models are not refit on the dev data.
+        :param target_encoder: encoder used for the target.
+        :param ts_analysis: dictionary with the time series analysis of the training data.
+        :param use_stl: currently ignored, STL detrending is disabled for this mixer.
+        :param tss: time series settings of the problem definition.
+        :param nr_procs: amount of cores used to train the horizon models. By default, the models are trained one after the other, in this process. Pools are started with `spawn`, so scripts that set this must guard their entry point with `if __name__ == '__main__':`.
+        """  # noqa
         super().__init__(stop_after)
         self.tss = tss
         self.horizon = tss.horizon
@@ -56,6 +76,7 @@ class LightGBMArray(BaseMixer):
         self.supports_proba = False
         self.use_stl = False
         self.stable = True
+        self.nr_procs = nr_procs
 
     def _fit(self, train_data: EncodedDs, dev_data: EncodedDs, submodel_method='fit') -> None:
         original_train = deepcopy(train_data.data_frame)
@@ -64,8 +85,24 @@ class LightGBMArray(BaseMixer):
         if self.use_stl and self.ts_analysis.get('stl_transforms', False):
             _apply_stl_on_training(train_data, dev_data, self.target, self.tss, self.ts_analysis)
 
-        for timestep in range(self.horizon):
-            getattr(self.models[timestep], submodel_method)(train_data, dev_data)
+        n_workers = min(self.horizon, self.nr_procs)
+        if n_workers > 1 and mp.current_process().daemon:
+            n_workers = 1  # e.g. this mixer is itself being fit by a worker of `parallel_fit_mixers()`
+
+        if n_workers > 1:
+            # every model gets the time it would have if the horizon was trained in sequential rounds of `n_workers`
+            if submodel_method == 'fit':
+                for model in self.models:
+                    model.stop_after = self.stop_after / math.ceil(self.horizon / n_workers)
+            results = parallel_fit_mixers([(model, train_data, dev_data) for model in self.models], self.nr_procs,
+                                          method=submodel_method)
+            for model, error in results:
+                if error is not None:
+                    raise Exception(f'Failed to {submodel_method} a LightGBM model of the horizon: {error}')
+            self.models = [model for model, _ in results]
+        else:
+            for timestep in range(self.horizon):
+                getattr(self.models[timestep], submodel_method)(train_data, dev_data)
 
         # restore dfs
         train_data.data_frame = original_train
@@ -93,8 +130,10 @@ class LightGBMArray(BaseMixer):
         if self.use_stl and self.ts_analysis.get('stl_transforms', False):
             ds.data_frame = _stl_transform(ydf, ds, self.target, self.tss, self.ts_analysis)
 
+        # all models share their input columns, so the feature matrix is only built once
+        data = self.models[0]._get_input_data(ds)
         for timestep in range(self.horizon):
-            ydf[f'prediction_{timestep}'] = self.models[timestep](ds, args)['prediction'].values
+            ydf[f'prediction_{timestep}'] = self.models[timestep]._predict(data, args)['prediction'].values
 
         if self.use_stl and self.ts_analysis.get('stl_transforms', False):
             ydf = _stl_inverse_transform(ydf, ds, self.tss, self.ts_analysis)
@@ -1,6 +1,5 @@
 import time
-from copy import deepcopy
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import torch
 import numpy as np
@@ -9,18 +8,18 @@ from torch import nn
 import torch_optimizer as ad_optim
 from sklearn.metrics import r2_score
 from torch.cuda.amp import GradScaler
-from torch.utils.data import DataLoader
 from torch.nn.modules.loss import MSELoss
 from torch.optim.optimizer import Optimizer
 
 from type_infer.dtype import dtype
 from lightwood.helpers.log import log
 from lightwood.encoder.base import BaseEncoder
-from lightwood.helpers.torch import LightwoodAutocast
+from lightwood.helpers.torch import LightwoodAutocast, StateDictSnapshot
 from lightwood.data.encoded_ds import EncodedDs
 from lightwood.mixer.base import BaseMixer
 from lightwood.mixer.helpers.ar_net import ArNet
 from lightwood.mixer.helpers.default_net import DefaultNet
+from lightwood.mixer.helpers.batch_loader import TensorDataLoader
 from lightwood.api.types import PredictionArguments
 from lightwood.mixer.helpers.transform_corss_entropy_loss import TransformCrossEntropyLoss
 
@@ -42,7 +41,11 @@ class Neural(BaseMixer):
             net: str,
             fit_on_dev: bool,
             search_hyperparameters: bool,
-            n_epochs: Optional[int] = None
+            n_epochs: Optional[int] = None,
+            checkpoint_path: Optional[str] = None,
+            lr: Optional[float] = None,
+            lr_search_rows: int = 5000,
+            lr_search_steps: int = 100
     ):
         """
         The Neural mixer trains a fully connected dense network from concatenated encoded outputs of each of the features in the dataset to predicted the encoded output. 
@@ -55,6 +58,10 @@ class Neural(BaseMixer):
         :param fit_on_dev: If we should fit on the dev dataset
         :param search_hyperparameters: If the network should run a more through hyperparameter search (currently disabled)
         :param n_epochs: amount of epochs that the network will be trained for. Supersedes all other early stopping criteria if specified.
+        :param checkpoint_path: optional file where the weights of the best model found so far are saved (asynchronously) every time the dev loss improves.
+        :param lr: learning rate. If not specified, it is found with a short learning rate sweep (see `lr_search_rows` and `lr_search_steps`) the first time the mixer is fit, and re-used afterwards (e.g. when calling `partial_fit`).
+        :param lr_search_rows: the learning rate sweep runs on a random subsample of at most this many training rows, stratified by class for categorical targets.
+        :param lr_search_steps: maximum amount of optimizer steps of the learning rate sweep.
         """ # noqa
         super().__init__(stop_after)
         self.dtype_dict = dtype_dict
@@ -62,11 +69,16 @@ class Neural(BaseMixer):
         self.target_encoder = target_encoder
         self.epochs_to_best = 0
         self.n_epochs = n_epochs
+        self.checkpoint_path = checkpoint_path
+        self.lr = lr
+        self.lr_search_rows = lr_search_rows
+        self.lr_search_steps = lr_search_steps
         self.fit_on_dev = fit_on_dev
         self.net_name = net
         self.supports_proba = dtype_dict[target] in [dtype.binary, dtype.categorical]
         self.search_hyperparameters = search_hyperparameters
         self.stable = True
+        self.inference_block_size = 8192
 
     def _final_tuning(self, data):
         if self.dtype_dict[self.target] in (dtype.integer, dtype.float, dtype.quantity):
@@ -77,7 +89,7 @@ class Neural(BaseMixer):
                     self.target_encoder.decode_log = decode_log
                     decoded_predictions = []
                     decoded_real_values = []
-                    for X, Y in data:
+                    for X, Y in TensorDataLoader(data, self.inference_block_size, device=self.model.device):
                         X = X.to(self.model.device)
                         Y = Y.to(self.model.device)
                         Yh = self._net_call(X)
@@ -110,26 +122,48 @@ class Neural(BaseMixer):
         optimizer = ad_optim.Ranger(self.model.parameters(), lr=self.lr, weight_decay=2e-2)
         return optimizer
 
-    def _find_lr(self, dl):
+    def _lr_search_loader(self, dl: TensorDataLoader) -> TensorDataLoader:
+        """
+        Subsamples the (already encoded) training data for the learning rate sweep. For categorical targets, each class keeps its share of rows.
+        """  # noqa
+        n_rows = len(dl.X)
+        if n_rows <= self.lr_search_rows:
+            return dl
+
+        if self.dtype_dict[self.target] in (dtype.categorical, dtype.binary):
+            labels = dl.Y.argmax(dim=1)
+            idxs = []
+            for label in labels.unique():
+                label_idxs = torch.nonzero(labels == label)[:, 0]
+                n_label = max(1, round(len(label_idxs) * self.lr_search_rows / n_rows))
+                idxs.append(label_idxs[torch.randperm(len(label_idxs))[:n_label]])
+            idx = torch.cat(idxs)
+        else:
+            idx = torch.randperm(n_rows)[:self.lr_search_rows]
+        return dl.subset(idx)
+
+    def _find_lr(self, dl, max_steps: int = 100, max_lr: float = 1.0, lr_cap: float = 1e-3):
+        """
+        Learning rate range test: starting from `self.lr`, the learning rate grows exponentially on every step (reaching `max_lr` after `max_steps` steps) until the smoothed training loss diverges. The chosen rate is a tenth of the one with the lowest smoothed loss, and at most `lr_cap`: above it, the early stopping criteria in `_max_fit` tend to stop before the network is fully trained.
+
+        :return: the chosen learning rate, and the model with its weights reset to what they were before the search (training on from the weights reached at high learning rates converges to worse models).
+        """  # noqa
         optimizer = self._select_optimizer()
         criterion = self._select_criterion()
         scaler = GradScaler()
 
-        running_losses: List[float] = []
-        cum_loss = 0
-        lr_log = []
-        best_model = self.model
-        stop = False
-        batches = 0
-        for epoch in range(1, 101):
-            if stop:
-                break
-
-            for i, (X, Y) in enumerate(dl):
-                if stop:
-                    break
-
-                batches += len(X)
+        lr = self.lr
+        lr_mult = (max_lr / lr) ** (1 / max_steps)
+        smoothed_loss = 0
+        best_loss = None
+        best_lr = None
+        initial_model = StateDictSnapshot()
+        initial_model.save(self.model)
+        steps = 0
+        self.model = self.model.train()
+        while steps < max_steps:
+            pass_start = steps
+            for X, Y in dl:
                 X = X.to(self.model.device)
                 Y = Y.to(self.model.device)
                 with LightwoodAutocast():
@@ -143,33 +177,40 @@ class Neural(BaseMixer):
                     else:
                         loss.backward()
                         optimizer.step()
-                cum_loss += loss.item()
-
-                # Account for ranger lookahead update
-                if (i + 1) * epoch % 6:
-                    batches = 0
-                    lr = optimizer.param_groups[0]['lr']
-                    log.info(f'Loss of {cum_loss} with learning rate {lr}')
-                    running_losses.append(cum_loss)
-                    lr_log.append(lr)
-                    cum_loss = 0
-                    if len(running_losses) < 2 or np.mean(running_losses[:-1]) > np.mean(running_losses):
-                        optimizer.param_groups[0]['lr'] = lr * 1.4
-                        # Time saving since we don't have to start training fresh
-                        best_model = deepcopy(self.model)
-                    else:
-                        stop = True
+                steps += 1
+
+                # exponential moving average of the loss, with bias correction
+                smoothed_loss = 0.9 * smoothed_loss + 0.1 * loss.item()
+                debiased_loss = smoothed_loss / (1 - 0.9 ** steps)
+                log.debug(f'Loss of {debiased_loss} with learning rate {lr}')
+                if np.isnan(debiased_loss) or (best_loss is not None and debiased_loss > 4 * best_loss):
+                    steps = max_steps
+                    break
+                if best_loss is None or debiased_loss < best_loss:
+                    best_loss = debiased_loss
+                    best_lr = lr
+                if steps >= max_steps:
+                    break
 
-        best_loss_lr = lr_log[np.argmin(running_losses)]
-        lr = best_loss_lr
+                lr *= lr_mult
+                for group in optimizer.param_groups:
+                    group['lr'] = lr
+
+            if steps == pass_start:
+                break  # no batches to train on
+
+        if best_lr is None:
+            return self.lr, initial_model.restore(self.model)
+
+        lr = min(max(self.lr, best_lr / 10), lr_cap)
         log.info(f'Found learning rate of: {lr}')
-        return lr, best_model
+        return lr, initial_model.restore(self.model)
 
     def _max_fit(self, train_dl, dev_dl, criterion, optimizer, scaler, stop_after, return_model_after):
         epochs_to_best = 0
         best_dev_error = pow(2, 32)
         running_errors = []
-        best_model = self.model
+        best_model = StateDictSnapshot(getattr(self, 'checkpoint_path', None))
 
         for epoch in range(1, return_model_after + 1):
             self.model = self.model.train()
@@ -205,7 +246,7 @@ class Neural(BaseMixer):
 
             if best_dev_error > running_errors[-1]:
                 best_dev_error = running_errors[-1]
-                best_model = deepcopy(self.model)
+                best_model.save(self.model)
                 epochs_to_best = epoch
 
             # manually set epoch limit
@@ -225,9 +266,10 @@ class Neural(BaseMixer):
                 elif running_errors[-1] < 0.0001 or train_error < 0.0001:
                     break
 
+        best_model.close()  # waits for the last checkpoint, no more are written
         if np.isnan(best_dev_error):
             best_dev_error = pow(2, 32)
-        return best_model, epochs_to_best, best_dev_error
+        return best_model.restore(self.model), epochs_to_best, best_dev_error
 
     def _error(self, dev_dl, criterion) -> float:
         self.model = self.model.eval()
@@ -271,17 +313,16 @@ class Neural(BaseMixer):
         self.batch_size = min(200, int(len(train_data) / 10))
         self.batch_size = max(40, self.batch_size)
 
-        dev_dl = DataLoader(dev_data, batch_size=self.batch_size, shuffle=False)
-        train_dl = DataLoader(train_data, batch_size=self.batch_size, shuffle=False)
-
-        self.lr = 1e-4
         self.num_hidden = 1
 
         # Find learning rate
         # keep the weights
         self._init_net(train_data)
+        dev_dl = TensorDataLoader(dev_data, self.batch_size, shuffle=False, device=self.model.device)
+        train_dl = TensorDataLoader(train_data, self.batch_size, shuffle=True, device=self.model.device)
         if not self.lr:
-            self.lr, self.model = self._find_lr(train_dl)
+            self.lr = 1e-6  # start of the sweep
+            self.lr, self.model = self._find_lr(self._lr_search_loader(train_dl), self.lr_search_steps)
 
         # Keep on training
         optimizer = self._select_optimizer()
@@ -312,8 +353,8 @@ class Neural(BaseMixer):
 
         # Based this on how long the initial training loop took, at a low learning rate as to not mock anything up tooo badly # noqa
         self.started = time.time()
-        train_dl = DataLoader(train_data, batch_size=self.batch_size, shuffle=True)
-        dev_dl = DataLoader(dev_data, batch_size=self.batch_size, shuffle=True)
+        train_dl = TensorDataLoader(train_data, self.batch_size, shuffle=True, device=self.model.device)
+        dev_dl = TensorDataLoader(dev_data, self.batch_size, shuffle=False, device=self.model.device)
         optimizer = self._select_optimizer()
         criterion = self._select_criterion()
         scaler = GradScaler()
@@ -331,35 +372,49 @@ class Neural(BaseMixer):
 
         :returns: A dataframe cotaining the decoded predictions and (depending on the args) additional information such as the probabilites for each target class
         """ # noqa
+        decoded_predictions, all_probs, rev_map = self._batched_predict(ds, args)
+        ydf = pd.DataFrame({'prediction': decoded_predictions})
+
+        if args.predict_proba and self.supports_proba:
+            raw_predictions = np.array(all_probs)
+
+            for idx, label in enumerate(rev_map.values()):
+                ydf[f'__mdb_proba_{label}'] = raw_predictions[:, idx]
+
+        return ydf
+
+    def _batched_predict(self, ds: EncodedDs, args: PredictionArguments) -> Tuple[List[object], List[List[float]], Dict]:  # noqa
+        """
+        Runs the network over the encoded feature matrix in blocks of `self.inference_block_size` rows, decoding each block with a single call to the target encoder. If the target encoder has dependencies, their values are passed as column arrays.
+
+        :returns: decoded predictions, class probabilities (if requested and supported) and the reverse map of dimension to class name for these probabilities.
+        """  # noqa
         self.model = self.model.eval()
         decoded_predictions: List[object] = []
         all_probs: List[List[float]] = []
         rev_map = {}
 
+        X_all = ds.get_encoded_data(include_target=False)
+        dependencies = [dep for dep in (self.target_encoder.dependencies or []) if dep in ds.data_frame.columns]
+        dependency_arrays = {dep: ds.data_frame[dep].values for dep in dependencies}
+
         with torch.no_grad():
-            for idx, (X, Y) in enumerate(ds):
-                X = X.to(self.model.device)
+            for start in range(0, len(X_all), self.inference_block_size):
+                end = start + self.inference_block_size
+                X = X_all[start:end].to(self.model.device)
                 Yh = self._net_call(X)
                 Yh = torch.unsqueeze(Yh, 0) if len(Yh.shape) < 2 else Yh
 
                 kwargs = {}
-                for dep in self.target_encoder.dependencies:
-                    kwargs['dependency_data'] = {dep: ds.data_frame.iloc[idx][[dep]].values}
+                if dependency_arrays:
+                    kwargs['dependency_data'] = {dep: values[start:end] for dep, values in dependency_arrays.items()}
 
                 if args.predict_proba and self.supports_proba:
                     decoded_prediction, probs, rev_map = self.target_encoder.decode_probabilities(Yh, **kwargs)
-                    all_probs.append(probs)
+                    all_probs.extend(probs)
                 else:
                     decoded_prediction = self.target_encoder.decode(Yh, **kwargs)
 
                 decoded_predictions.extend(decoded_prediction)
 
-            ydf = pd.DataFrame({'prediction': decoded_predictions})
-
-            if args.predict_proba and self.supports_proba:
-                raw_predictions = np.array(all_probs).squeeze(axis=1)
-
-                for idx, label in enumerate(rev_map.values()):
-                    ydf[f'__mdb_proba_{label}'] = raw_predictions[:, idx]
-
-            return ydf
+        return decoded_predictions, all_probs, rev_map
@@ -1,6 +1,6 @@
 import time
 from copy import deepcopy
-from typing import Dict, Optional, List
+from typing import Dict, Optional
 
 import numpy as np
 import pandas as pd
@@ -9,7 +9,6 @@ import torch
 from torch import nn
 import torch_optimizer as ad_optim
 from torch.cuda.amp import GradScaler
-from torch.utils.data import DataLoader
 from torch.optim.optimizer import Optimizer
 
 from type_infer.dtype import dtype
@@ -19,6 +18,7 @@ from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
 from lightwood.mixer.neural import Neural
 from lightwood.mixer.helpers.ar_net import ArNet
 from lightwood.mixer.helpers.default_net import DefaultNet
+from lightwood.mixer.helpers.batch_loader import TensorDataLoader
 from lightwood.mixer.helpers.ts import _apply_stl_on_training, _stl_transform, _stl_inverse_transform
 from lightwood.api.types import TimeseriesSettings
 
@@ -97,16 +97,16 @@ class NeuralTs(Neural):
         self.batch_size = min(200, int(len(train_data) / 10))
         self.batch_size = max(40, self.batch_size)
 
-        dev_dl = DataLoader(dev_data, batch_size=self.batch_size, shuffle=False)
-        train_dl = DataLoader(train_data, batch_size=self.batch_size, shuffle=False)
-
-        self.lr = 1e-4
         self.num_hidden = 1
 
         # Find learning rate
         # keep the weights
         self._init_net(train_data)
-        self.lr, self.model = self._find_lr(train_dl)
+        dev_dl = TensorDataLoader(dev_data, self.batch_size, shuffle=False, device=self.model.device)
+        train_dl = TensorDataLoader(train_data, self.batch_size, shuffle=True, device=self.model.device)
+        if not self.lr:
+            self.lr = 1e-6  # start of the sweep
+            self.lr, self.model = self._find_lr(self._lr_search_loader(train_dl), self.lr_search_steps)
 
         # Keep on training
         optimizer = self._select_optimizer()
@@ -135,11 +135,6 @@ class NeuralTs(Neural):
                  ) -> pd.DataFrame:
         original_df = deepcopy(ds.data_frame)
 
-        self.model = self.model.eval()
-        decoded_predictions = []
-        all_probs: List[List[float]] = []
-        rev_map = {}
-
         length = sum(ds.encoded_ds_lengths) if isinstance(ds, ConcatedEncodedDs) else len(ds)
         pred_cols = [f'prediction_{i}' for i in range(self.timeseries_settings.horizon)]
         ydf = pd.DataFrame(0,  # zero-filled
@@ -150,23 +145,7 @@ class NeuralTs(Neural):
         if self.use_stl and self.ts_analysis.get('stl_transforms', False):
             ds.data_frame = _stl_transform(ydf, ds, self.target, self.timeseries_settings, self.ts_analysis)
 
-        with torch.no_grad():
-            for idx, (X, Y) in enumerate(ds):
-                X = X.to(self.model.device)
-                Yh = self.model(X)
-                Yh = torch.unsqueeze(Yh, 0) if len(Yh.shape) < 2 else Yh
-
-                kwargs = {}
-                for dep in self.target_encoder.dependencies:
-                    kwargs['dependency_data'] = {dep: ds.data_frame.iloc[idx][[dep]].values}
-
-                if args.predict_proba and self.supports_proba:
-                    decoded_prediction, probs, rev_map = self.target_encoder.decode_probabilities(Yh, **kwargs)
-                    all_probs.append(probs)
-                else:
-                    decoded_prediction = self.target_encoder.decode(Yh, **kwargs)
-
-                decoded_predictions.extend(decoded_prediction)
+        decoded_predictions, all_probs, rev_map = self._batched_predict(ds, args)
 
         decoded_predictions = np.array(decoded_predictions)
         if len(decoded_predictions.shape) == 1:
@@ -182,7 +161,7 @@ class NeuralTs(Neural):
             ydf['prediction'] = [p[0] for p in ydf['prediction']]
 
         if args.predict_proba and self.supports_proba:
-            raw_predictions = np.array(all_probs).squeeze(axis=1)
+            raw_predictions = np.array(all_probs)
 
             for idx, label in enumerate(rev_map.values()):
                 ydf[f'__mdb_proba_{label}'] = raw_predictions[:, idx]
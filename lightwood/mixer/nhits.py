@@ -9,6 +9,7 @@ from neuralforecast.losses.pytorch import MQLoss
 
 from lightwood.helpers.log import log
 from lightwood.mixer.base import BaseMixer
+from lightwood.helpers.parallelism import instance_lock
 from lightwood.api.types import PredictionArguments
 from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
 
@@ -172,7 +173,8 @@ class NHitsMixer(BaseMixer):
         group_ends = []
         for group in input_df['unique_id'].unique():
             group_ends.append(input_df[input_df['unique_id'] == group]['index'].iloc[-1])
-        fcst = self.model.predict(input_df).reset_index()
+        with instance_lock(self.model):  # neuralforecast keeps the latest prediction dataset in the model
+            fcst = self.model.predict(input_df).reset_index()
 
         for gidx, group in zip(group_ends, input_df['unique_id'].unique()):
             for pred_col, target_col in zip(pred_cols, target_cols):
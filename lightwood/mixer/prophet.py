@@ -34,6 +34,7 @@ class ProphetMixer(SkTime):
             mcmc_samples: int = 0,
             alpha: float = 0.05,
             uncertainty_samples: int = 1000,
+            nr_procs: int = 1
     ):
         """
         Wrapper for SkTime's Prophet interface.
@@ -45,6 +46,7 @@ class ProphetMixer(SkTime):
         :param ts_analysis: lightwood-produced stats about input time series
         :param auto_size: whether to filter out old data points if training split is bigger than a certain threshold (defined by the dataset sampling frequency). Enabled by default to avoid long training times in big datasets.
         :param use_stl: Whether to use de-trenders and de-seasonalizers fitted in the timeseries analysis phase.
+        :param nr_procs: amount of processes used to fit the forecasters of the different groups.
         
         For the rest of the parameters, please refer to SkTime's documentation.
         """  # noqa
@@ -77,6 +79,6 @@ class ProphetMixer(SkTime):
 
         # setup sktime base mixer
         super().__init__(stop_after, target, dtype_dict, horizon, ts_analysis,
-                         model_path, model_kwargs, auto_size, sp, hyperparam_search, use_stl)
+                         model_path, model_kwargs, auto_size, sp, hyperparam_search, use_stl, nr_procs)
         self.name = 'Prophet'
         self.stable = False
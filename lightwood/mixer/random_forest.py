@@ -13,6 +13,7 @@ from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 
 from type_infer.dtype import dtype
 from lightwood.helpers.log import log
+from lightwood.helpers.parallelism import get_worker_threads
 from lightwood.encoder.base import BaseEncoder
 from lightwood.data.encoded_ds import ConcatedEncodedDs, EncodedDs
 from lightwood.mixer.base import BaseMixer
@@ -102,7 +103,7 @@ class RandomForest(BaseMixer):
             'max_depth': 5,
             'max_features': 1.,
             'bootstrap': True,
-            'n_jobs': -1,
+            'n_jobs': get_worker_threads() if get_worker_threads() is not None else -1,
             'random_state': 0
         }
 
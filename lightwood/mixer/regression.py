@@ -1,5 +1,6 @@
 from typing import Optional
 import torch
+import numpy as np
 import pandas as pd
 from scipy.special import softmax
 from sklearn.linear_model import Ridge
@@ -52,15 +53,13 @@ class Regression(BaseMixer):
         if self.target_dtype not in (dtype.float, dtype.integer, dtype.quantity):
             raise Exception(f'Unspported {self.target_dtype} type for regression')
 
-        if self.stop_after < len(train_data) * len(self.dtype_dict) / pow(10, 3):
+        if self.stop_after < len(train_data) * len(self.dtype_dict) / pow(10, 5):
             raise Exception(f'Insufficient time ({self.stop_after} seconds) to fit a linear regression on the data!')
 
         log.info('Fitting Linear Regression model')
-        X = []
-        Y = []
-        for x, y in ConcatedEncodedDs([train_data, dev_data]):
-            X.append(x.tolist())
-            Y.append(y.tolist())
+        data = ConcatedEncodedDs([train_data, dev_data])
+        X = self._get_X(data)
+        Y = data.get_encoded_column_data(data.target).cpu().numpy().astype(np.float64)
 
         if self.supports_proba:
             self.label_map = self.target_encoder.rev_map
@@ -68,6 +67,12 @@ class Regression(BaseMixer):
         self.model = Ridge().fit(X, Y)
         log.info(f'Regression based correlation of: {self.model.score(X, Y)}')
 
+    def _get_X(self, ds: EncodedDs) -> np.ndarray:
+        """
+        The encoded feature matrix of `ds`, in double precision so that `Ridge` does not solve in float32.
+        """
+        return ds.get_encoded_data(include_target=False).cpu().numpy().astype(np.float64)
+
     def partial_fit(self, train_data: EncodedDs, dev_data: EncodedDs, args: Optional[dict] = None) -> None:
         """
         Fits the linear regression on some data, this refits the model entirely rather than updating it
@@ -87,11 +92,7 @@ class Regression(BaseMixer):
 
         :returns: A dataframe cotaining the decoded predictions and (depending on the args) additional information such as the probabilites for each target class
         """ # noqa
-        X = []
-        for x, _ in ds:
-            X.append(x.tolist())
-
-        Yh = self.model.predict(X)
+        Yh = self.model.predict(self._get_X(ds))
 
         decoded_predictions = self.target_encoder.decode(torch.Tensor(Yh))
 
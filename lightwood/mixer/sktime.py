@@ -1,9 +1,9 @@
 import inspect
 import importlib
+import multiprocessing as mp
 from copy import deepcopy
 from datetime import datetime
-from itertools import product
-from typing import Dict, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
 import optuna
 import numpy as np
@@ -17,9 +17,25 @@ from lightwood.helpers.log import log
 from lightwood.mixer.base import BaseMixer
 from lightwood.api.types import PredictionArguments
 from lightwood.helpers.ts import get_group_matches
+from lightwood.helpers.parallelism import instance_lock
 from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
 
 
+def _fit_forecaster(args: Tuple[BaseForecaster, pd.Series, ForecastingHorizon, type]) -> BaseForecaster:
+    """
+    Fits the forecaster of a single group, falling back to `model_class` with its default options if that fails.
+
+    Defined at module level so that it can be sent to worker processes.
+    """  # noqa
+    model, series, fh, model_class = args
+    try:
+        model.fit(series, fh=fh)
+    except Exception:
+        model = model_class()  # with default options (i.e. no seasonality, among others)
+        model.fit(series, fh=fh)
+    return model
+
+
 class SkTime(BaseMixer):
     forecaster: str
     horizon: int
@@ -40,7 +56,8 @@ class SkTime(BaseMixer):
             auto_size: bool = True,
             sp: int = None,
             hyperparam_search: bool = True,
-            use_stl: bool = False
+            use_stl: bool = False,
+            nr_procs: int = 1
     ):
         """
         This mixer is a wrapper around the popular time series library sktime. It exhibits different behavior compared
@@ -69,6 +86,7 @@ class SkTime(BaseMixer):
         :param hyperparam_search: bool that indicates whether to perform the hyperparameter tuning or not.
         :param auto_size: whether to filter out old data points if training split is bigger than a certain threshold (defined by the dataset sampling frequency). Enabled by default to avoid long training times in big datasets.
         :param use_stl: Whether to use de-trenders and de-seasonalizers fitted in the timeseries analysis phase.
+        :param nr_procs: amount of processes used to fit the forecasters of the different groups. By default, they are fit one after the other.
         """  # noqa
         super().__init__(stop_after)
         self.stable = False
@@ -92,6 +110,7 @@ class SkTime(BaseMixer):
         self.auto_size = auto_size
         self.cutoff_factor = 4  # times the detected maximum seasonal period
         self.use_stl = use_stl
+        self.nr_procs = nr_procs
 
         # optuna hyperparameter tuning
         self.models = {}
@@ -151,6 +170,7 @@ class SkTime(BaseMixer):
         except AttributeError:
             model_class = AutoARIMA  # use AutoARIMA when the provided class does not exist
 
+        to_fit = []  # (group, series) pairs, forecasters are fit once all of them are set up
         for group in self.ts_analysis['group_combinations']:
             kwargs = {}
             sp = self.sp if self.sp else self.ts_analysis['periods'].get(group, '__default')[0]
@@ -209,11 +229,17 @@ class SkTime(BaseMixer):
                 if self.auto_size:
                     cutoff = min(len(series), max(500, options['sp'] * self.cutoff_factor))
                     series = series.iloc[-cutoff:]
-                try:
-                    self.models[group].fit(series, fh=self.fh)
-                except Exception:
-                    self.models[group] = model_class()  # with default options (i.e. no seasonality, among others)
-                    self.models[group].fit(series, fh=self.fh)
+                to_fit.append((group, series))
+
+        tasks = [(self.models[group], series, self.fh, model_class) for group, series in to_fit]
+        nr_procs = min(self.nr_procs, len(tasks))
+        if nr_procs > 1 and not mp.current_process().daemon:
+            with mp.Pool(processes=nr_procs) as pool:
+                fitted = pool.map(_fit_forecaster, tasks)
+        else:
+            fitted = [_fit_forecaster(task) for task in tasks]
+        for (group, _), model in zip(to_fit, fitted):
+            self.models[group] = model
 
     def partial_fit(self, train_data: EncodedDs, dev_data: EncodedDs, args: Optional[dict] = None) -> None:
         """
@@ -245,27 +271,26 @@ class SkTime(BaseMixer):
         df = deepcopy(ds.data_frame)
         df = df.rename_axis('__sktime_index').reset_index()
 
-        length = sum(ds.encoded_ds_lengths) if isinstance(ds, ConcatedEncodedDs) else len(ds)
         ydf = pd.DataFrame(0,  # zero-filled
                            index=df.index,
                            columns=['prediction'],
                            dtype=object)
 
-        group_values = {gcol: df[gcol].tolist() for gcol in self.grouped_by} \
-            if self.ts_analysis['tss'].group_by \
-            else {'': ['__default' for _ in range(length)]}
+        if self.ts_analysis['tss'].group_by:
+            # positions of the rows of each group present in the data (rows with missing group values are left out)
+            group_positions = df.groupby(self.grouped_by, sort=False).indices
+        else:
+            group_positions = {'__default': np.arange(len(df))}
 
         pending_idxs = set(df.index)
-        all_group_combinations = list(product(*[set(x) for x in group_values.values()]))
-        for group in all_group_combinations:
-            group = tuple(group)
-            group = '__default' if group[0] == '__default' else group
-            series_idxs, series_data = get_group_matches(df, group, self.grouped_by)
+        for group, positions in group_positions.items():
+            group = group if isinstance(group, tuple) or group == '__default' else (group,)
+            series_data = df.iloc[positions]
+            series_idxs = list(series_data.index)
 
             if series_data.size > 0:
                 start_ts = series_data['__sktime_index'].iloc[0]
                 series = series_data[self.target]
-                series_idxs = sorted(series_idxs)
                 if self.models.get(group, False) and self.models[group].is_fitted:
                     freq = self.ts_analysis['deltas'][group]
                     delta = (start_ts - self.cutoffs[group]).total_seconds()
@@ -280,8 +305,8 @@ class SkTime(BaseMixer):
 
         # apply default model in all remaining novel-group rows
         if len(pending_idxs) > 0:
-            series = df[self.target][list(pending_idxs)].squeeze()
-            ydf = self._call_default(ydf, series, list(pending_idxs))
+            pending_idxs = sorted(pending_idxs)
+            ydf = self._call_default(ydf, df[self.target].iloc[pending_idxs].values, pending_idxs)
 
         return ydf[['prediction']]
 
@@ -308,23 +333,31 @@ class SkTime(BaseMixer):
         start = max(offset, min_offset)
         end = start + series.shape[0] + self.horizon
 
-        # Workaround for StatsForecastAutoARIMA (see sktime#3600)
-        if isinstance(submodel, AutoARIMA):
-            all_preds = model.predict(np.arange(min_offset, end)).tolist()[-(end - start):]
-        else:
-            all_preds = model.predict(np.arange(start, end)).tolist()
+        # sktime forecasters store the forecasting horizon of each `predict()` call
+        with instance_lock(model):
+            # Workaround for StatsForecastAutoARIMA (see sktime#3600)
+            if isinstance(submodel, AutoARIMA):
+                all_preds = model.predict(np.arange(min_offset, end)).tolist()[-(end - start):]
+            else:
+                all_preds = model.predict(np.arange(start, end)).tolist()
 
-        for true_idx, (idx, _) in enumerate(series.items()):
-            start_idx = max(0, true_idx)
-            end_idx = start_idx + self.horizon
-            ydf['prediction'].loc[idx] = all_preds[start_idx:end_idx]
-        return ydf
+        # the forecast for the i-th row of the series spans the `horizon` predictions that start at position i
+        windows = np.lib.stride_tricks.sliding_window_view(np.asarray(all_preds), self.horizon)[:series.shape[0]]
+        return self._set_predictions(ydf, series.index, windows)
 
     def _call_default(self, ydf, data, idxs):
         # last value from each window equals shifted target (by 1)  # noqa
         series = np.array([0] + list(data.flatten())[:-1])
-        all_preds = [[value for _ in range(self.horizon)] for value in series]
-        ydf['prediction'].iloc[idxs] = all_preds
+        all_preds = np.repeat(series.reshape(-1, 1), self.horizon, axis=1)
+        return self._set_predictions(ydf, ydf.index[idxs], all_preds)
+
+    def _set_predictions(self, ydf: pd.DataFrame, idxs: Union[pd.Index, List], predictions: np.ndarray) -> pd.DataFrame:
+        """
+        Stores one forecast (a row of `predictions`) per each index in `idxs` in a single write.
+        """
+        positions = ydf.index.get_indexer(idxs)
+        ydf.iloc[positions, ydf.columns.get_loc('prediction')] = pd.Series(predictions.tolist(),
+                                                                           index=ydf.index[positions])
         return ydf
 
     def _get_best_model(self, trial, train_data, test_data):
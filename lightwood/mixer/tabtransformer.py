@@ -34,9 +34,9 @@ class TabTransformerMixer(Neural):
             'FTTransformer',
             False,  # fit_on_dev
             search_hyperparameters,
-            n_epochs=self.train_args.get('n_epochs', None)
+            n_epochs=self.train_args.get('n_epochs', None),
+            lr=self.train_args.get('lr', None)
         )
-        self.lr = self.train_args.get('lr')
         self.stable = False  # still experimental
 
     def _init_net(self, ds: EncodedDs):
@@ -6,10 +6,12 @@ import optuna
 import xgboost as xgb
 import numpy as np
 import pandas as pd
+import scipy.sparse
 from sklearn.preprocessing import OrdinalEncoder
 from type_infer.dtype import dtype
 
 from lightwood.helpers.log import log
+from lightwood.helpers.device import cached_gpu_probe
 from lightwood.helpers.parallelism import get_nr_procs
 from lightwood.mixer.base import BaseMixer
 from lightwood.encoder.base import BaseEncoder
@@ -19,7 +21,7 @@ from lightwood.data.encoded_ds import EncodedDs
 optuna.logging.set_verbosity(optuna.logging.CRITICAL)
 
 
-def check_gpu_support():
+def _probe_gpu_support() -> bool:
     try:
         from sklearn.datasets import load_iris
         from sklearn.model_selection import train_test_split
@@ -33,6 +35,13 @@ def check_gpu_support():
         return False
 
 
+def check_gpu_support() -> bool:
+    """
+    Whether XGBoost can train on a GPU. The probe trains a throwaway model, so its result is memoized (see `cached_gpu_probe`).
+    """  # noqa
+    return cached_gpu_probe(xgb, _probe_gpu_support)
+
+
 class XGBoostMixer(BaseMixer):
     model: Union[xgb.XGBClassifier, xgb.XGBRegressor]
     ordinal_encoder: OrdinalEncoder
@@ -53,7 +62,7 @@ class XGBoostMixer(BaseMixer):
     We can basically think of this mixer as a wrapper to the XGBoost Python package. To do so, there are a few caveats the user may want to be aware about:
         * If you seek GPU utilization, XGBoost must be compiled from source instead of being installed through `pip`.
         * Integer, float, and quantity `dtype`s are treated as regression tasks with `reg:squarederror` loss. All other supported `dtype`s is casted as a multiclass task with `multi:softmax` loss.
-        * A partial fit can be performed with the `dev` data split as part of `fit`, if specified with the `fit_on_dev` argument.
+        * A partial fit can be performed with the `dev` data split as part of `fit`, if specified with the `fit_on_dev` argument. Partial fits continue boosting from the existing model rather than retraining it.
 
     There are a couple things in the backlog that will hopefully be added soon:
         * An automatic optuna-based hyperparameter search. This procedure triggers when a single iteration of XGBoost is deemed fast enough (given the time budget).
@@ -63,7 +72,8 @@ class XGBoostMixer(BaseMixer):
     def __init__(
             self, stop_after: float, target: str, dtype_dict: Dict[str, str],
             input_cols: List[str],
-            fit_on_dev: bool, use_optuna: bool, target_encoder: BaseEncoder):
+            fit_on_dev: bool, use_optuna: bool, target_encoder: BaseEncoder,
+            partial_fit_rounds: Optional[int] = None, early_stopping_rounds: int = 5):
         """
         :param stop_after: time budget in seconds.
         :param target: name of the target column that the mixer will learn to predict.
@@ -71,6 +81,8 @@ class XGBoostMixer(BaseMixer):
         :param input_cols: list of column names.
         :param fit_on_dev: whether to perform a `partial_fit()` at the end of `fit()` using the `dev` data split.
         :param use_optuna: whether to activate the automated hyperparameter search (optuna-based). Note that setting this flag to `True` does not guarantee the search will run, rather, the speed criteria will be checked first (i.e., if a single iteration is too slow with respect to the time budget, the search will not take place). 
+        :param partial_fit_rounds: maximum amount of boosting rounds added by each `partial_fit()`. By default, this is half the rounds of the fitted model, scaled by the size of the new data relative to the original training data (same as the LightGBM mixer).
+        :param early_stopping_rounds: training (and each `partial_fit()`) stops if the loss on the dev data does not improve for this many rounds.
         """  # noqa
         super().__init__(stop_after)
         self.model = None
@@ -89,6 +101,9 @@ class XGBoostMixer(BaseMixer):
         self.supports_proba = dtype_dict[target] in self.cls_dtypes
         self.stable = True
         self.target_encoder = target_encoder
+        self.use_sparse = False
+        self.partial_fit_rounds = partial_fit_rounds
+        self.early_stopping_rounds = early_stopping_rounds
 
         gpu_works = check_gpu_support()
         if not gpu_works:
@@ -108,15 +123,20 @@ class XGBoostMixer(BaseMixer):
         :param output_dtype:
         :return: modified `data` object that conforms to XGBoost's expected format.
         """  # noqa
-        data = None
-        for input_col in self.input_cols:
-            if data is None:
-                data = ds.get_encoded_column_data(input_col).to(self.device)
-            else:
-                enc_col = ds.get_encoded_column_data(input_col).to(self.device)
-                data = torch.cat((data, enc_col.to(self.device)), 1)
+        if self.use_sparse:
+            # XGBoost takes CSR input natively; dense columns are stored in full so their zeros are not read as missing
+            data = scipy.sparse.hstack([ds.get_encoded_column_data(col, sparse=True) for col in self.input_cols],
+                                       format='csr')
+        else:
+            data = None
+            for input_col in self.input_cols:
+                if data is None:
+                    data = ds.get_encoded_column_data(input_col).to(self.device)
+                else:
+                    enc_col = ds.get_encoded_column_data(input_col).to(self.device)
+                    data = torch.cat((data, enc_col.to(self.device)), 1)
 
-        data = data.cpu().numpy()
+            data = data.cpu().numpy()
 
         if mode in ('train', 'dev'):
             label_data = ds.get_column_original_data(self.target)
@@ -126,12 +146,13 @@ class XGBoostMixer(BaseMixer):
                     self.label_set = list(set(label_data))
                     self.ordinal_encoder.fit(np.array(list(self.label_set)).reshape(-1, 1))
 
-                filtered_label_data = []
-                for x in label_data:
-                    if x in self.label_set:
-                        filtered_label_data.append(x)
+                # rows with labels unseen at training time are dropped
+                known = np.array([x in self.label_set for x in label_data], dtype=bool)
+                if not known.all():
+                    data = data[known]
+                    label_data = np.array(label_data)[known]
 
-                label_data = self.ordinal_encoder.transform(np.array(filtered_label_data).reshape(-1, 1)).flatten()
+                label_data = self.ordinal_encoder.transform(np.array(label_data).reshape(-1, 1)).flatten()
 
             elif output_dtype == dtype.integer:
                 label_data = label_data.clip(-pow(2, 63), pow(2, 63)).astype(int)
@@ -170,11 +191,14 @@ class XGBoostMixer(BaseMixer):
             'n_jobs': get_nr_procs(train_data.data_frame),
             'process_type': 'default',  # normal training
             'verbosity': 0,
-            'early_stopping_rounds': 5
+            'early_stopping_rounds': self.early_stopping_rounds
             # 'device_type': self.device_str,  # TODO
         }
 
-        # Prepare the data
+        # Prepare the data, wide one-hot columns are kept sparse
+        self.use_sparse = train_data.prefers_sparse(self.input_cols)
+        if self.use_sparse:
+            log.info('Using a sparse representation of the input data')
         train_dataset, train_labels = self._to_dataset(train_data, output_dtype, mode='train')
         dev_dataset, dev_labels = self._to_dataset(dev_data, output_dtype, mode='dev')
 
@@ -225,14 +249,43 @@ class XGBoostMixer(BaseMixer):
         with xgb.config_context(verbosity=0):
             self.model = model_class(**self.params)
             self.model.fit(train_dataset, train_labels, eval_set=[(dev_dataset, dev_labels)])
+        self.num_iterations = self.model.best_iteration + 1
 
         if self.fit_on_dev:
             self.partial_fit(dev_data, train_data)
 
     def partial_fit(self, train_data: EncodedDs, dev_data: EncodedDs, args: Optional[dict] = None) -> None:
-        # TODO: https://xgboost.readthedocs.io/en/stable/python/python_api.html#module-xgboost.sklearn
-        # To resume training from a previous checkpoint, explicitly pass xgb_model argument.
-        log.info('XGBoost mixer does not have a `partial_fit` implementation')
+        """
+        Updates the XGBoost model, by boosting additional rounds (see `partial_fit_rounds`) on top of the existing ones with the new data. Stops early if the loss on `dev_data` stops improving.
+
+        :param train_data: encoded features for (new) training dataset
+        :param dev_data: encoded features for (new) dev dataset
+        """  # noqa
+        if self.partial_fit_rounds is not None:
+            iterations = max(1, int(self.partial_fit_rounds))
+        else:
+            pct_of_original = len(train_data) / self.fit_data_len
+            iterations = max(1, int(self.num_iterations * pct_of_original / 2))
+
+        output_dtype = self.dtype_dict[self.target]
+        train_dataset, train_labels = self._to_dataset(train_data, output_dtype, mode='dev')
+        dev_dataset, dev_labels = self._to_dataset(dev_data, output_dtype, mode='dev')
+
+        # the scikit-learn wrapper can't continue training on data that lacks some of the classes, so the booster is
+        # updated through the native interface. Trees past the best iteration are not used for predicting, so they are
+        # not kept either.
+        booster = self.model.get_booster()[:self.num_iterations]
+        params = {k: v for k, v in self.model.get_xgb_params().items() if v is not None}
+
+        log.info(f'Updating XGBoost model with {iterations} iterations')
+        with xgb.config_context(verbosity=0):
+            booster = xgb.train(params, xgb.DMatrix(train_dataset, label=train_labels), num_boost_round=iterations,
+                                evals=[(xgb.DMatrix(dev_dataset, label=dev_labels), 'dev')],
+                                early_stopping_rounds=self.early_stopping_rounds, xgb_model=booster,
+                                verbose_eval=False)
+            self.model.load_model(booster.save_raw())
+        self.num_iterations = self.model.best_iteration + 1
+        log.info(f'Model now has a total of {self.num_iterations} boosting rounds')
 
     def __call__(self, ds: EncodedDs,
                  args: PredictionArguments = PredictionArguments()) -> pd.DataFrame:
@@ -3,6 +3,7 @@ from lightwood.api.types import ProblemDefinition
 import unittest
 import multiprocessing as mp
 import os
+import tempfile
 import pandas as pd
 
 
@@ -41,11 +42,9 @@ class TestBasic(unittest.TestCase):
         ctx = mp.get_context('spawn')
         df = pd.read_csv('tests/data/hdi.csv').iloc[0:400]
         code = code_from_problem(df, ProblemDefinition.from_dict({'target': 'Development Index', 'time_aim': 20}))
-        path = 'test.pickle'
-        try:
-            os.remove(path)
-        except Exception:
-            pass
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, 'test.pickle')
         proc = ctx.Process(target=execute_first_bit, args=(code, df, path,))
         proc.start()
         proc.join()
@@ -0,0 +1,187 @@
+import unittest
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+
+from lightwood.analysis.nc.base import CachedRegressorAdapter
+from lightwood.analysis.nc.calibrate import _detached_copy
+from lightwood.analysis.nc.icp import IcpClassifier, IcpRegressor
+from lightwood.analysis.nc.nc import RegressorNc, BoostedAbsErrorErrFunc, SignErrorErrFunc
+from lightwood.analysis.nc.util import get_numeric_conf_range
+from lightwood.helpers.ts import get_ts_group_positions
+
+
+class RoundedNc:
+    """
+    Nonconformity scorer with many ties: the rounded distance between the first feature and the label.
+    """
+    def fit(self, x, y):
+        pass
+
+    def score(self, x, y):
+        scores = np.round(np.abs(x[:, 0] - y), 1)
+        scores[x[:, 1] > 0.98] = np.nan
+        return scores
+
+
+def _loop_p_values(icp: IcpClassifier, x: np.ndarray) -> np.ndarray:
+    """
+    Reference implementation: scans the calibration scores once per (row, class) pair.
+    """
+    p = np.zeros((x.shape[0], icp.classes.size))
+    for i, c in enumerate(icp.classes):
+        test_nc_scores = icp.nc_function.score(x, np.full(x.shape[0], c, dtype=icp.classes.dtype))
+        for j, nc in enumerate(test_nc_scores):
+            cal_scores = icp.cal_scores[icp.condition((x[j, :], c))][::-1]
+            n_cal = cal_scores.size
+            n_eq = sum(np.where(cal_scores == nc, 1, 0))
+            n_gt = sum(np.where(cal_scores > nc, 1, 0))
+            if icp.smoothing:
+                p[j, i] = (n_gt + n_eq * np.random.uniform(0, 1, 1)[0]) / (n_cal + 1)
+            else:
+                p[j, i] = (n_gt + n_eq) / (n_cal + 1)
+    return p
+
+
+class TestIcpClassifier(unittest.TestCase):
+    def test_p_values(self):
+        np.random.seed(0)
+        n_classes = 10
+        cal_x = np.random.uniform(0, n_classes, (2000, 2))
+        cal_x[:, 1] /= n_classes
+        cal_y = np.random.randint(0, n_classes, 2000)
+        x = np.random.uniform(0, n_classes, (300, 2))
+        x[:, 1] /= n_classes
+
+        for smoothing in (False, True):
+            for condition in (None, lambda xy: int(xy[0][0] > n_classes / 2)):
+                icp = IcpClassifier(RoundedNc(), condition=condition, smoothing=smoothing)
+                icp.calibrate(cal_x, cal_y)
+
+                np.random.seed(1)
+                expected = _loop_p_values(icp, x)
+                np.random.seed(1)
+                p = icp.predict(x)
+                # the same random draws are used for smoothing
+                np.testing.assert_allclose(p, expected)
+
+        np.testing.assert_array_equal(icp.predict(x, significance=0.1), p > 0.1)
+
+    def test_many_classes(self):
+        np.random.seed(0)
+        n_classes, n_cal, n_rows = 100, 5000, 50
+        icp = IcpClassifier(RoundedNc(), smoothing=True)
+        icp.calibrate(np.random.uniform(0, n_classes, (n_cal, 2)) / [1, n_classes],
+                      np.random.randint(0, n_classes, n_cal))
+        x = np.random.uniform(0, n_classes, (n_rows, 2)) / [1, n_classes]
+
+        np.random.seed(1)
+        expected = _loop_p_values(icp, x)
+        np.random.seed(1)
+        p = icp.predict(x)
+        self.assertEqual(p.shape, (n_rows, n_classes))
+        np.testing.assert_allclose(p, expected)
+
+
+def _loop_numeric_conf_range(all_confs: np.ndarray, tolerance: float):
+    """
+    Reference implementation: row by row search of the first significance level within tolerance.
+    """
+    significances, conf_ranges = [], []
+    for sample in all_confs:
+        for idx in range(sample.shape[1]):
+            if sample[1, idx] - sample[0, idx] <= tolerance:
+                significances.append((99 - idx) / 100)
+                conf_ranges.append(sample[:, idx])
+                break
+        else:
+            significances.append(0.9991)
+            sigma = (sample[1, 0] - sample[0, 0]) / 4
+            conf_ranges.append([sample[0, 0] - sigma, sample[1, 0] + sigma])
+    return np.array(significances), np.array(conf_ranges)
+
+
+class TestIcpRegressor(unittest.TestCase):
+    def test_all_significances(self):
+        np.random.seed(0)
+        for err_func in (BoostedAbsErrorErrFunc(), SignErrorErrFunc()):
+            for n_cal in (1, 50, 2000):
+                model = CachedRegressorAdapter(None)
+                icp = IcpRegressor(RegressorNc(model, err_func), cal_size=100)
+                model.prediction_cache = np.random.normal(size=n_cal)
+                icp.calibrate(np.zeros((n_cal, 1)), np.random.normal(size=n_cal))
+
+                model.prediction_cache = np.random.normal(size=500)
+                x = np.zeros((500, 1))
+                intervals = icp.predict(x)
+                self.assertEqual(intervals.shape, (500, 2, 99))
+                for i, s in enumerate(np.arange(0.01, 1.0, 0.01)):
+                    # same widths as inverting the scores for each significance level separately
+                    width = err_func.apply_inverse(icp.cal_scores[0], s)[0, 0]
+                    np.testing.assert_array_equal(intervals[:, 0, i], model.prediction_cache - width)
+                    np.testing.assert_array_equal(intervals[:, 1, i], model.prediction_cache + width)
+
+                np.testing.assert_array_equal(icp.predict(x, [0.1, 0.5]), intervals[:, :, [9, 49]])
+                self.assertEqual(icp.predict(x, 0.1).shape, (500, 2))
+
+    def test_numeric_conf_range(self):
+        np.random.seed(0)
+        widths = np.abs(np.random.normal(size=(1000, 1, 99))) * np.linspace(3, 0.01, 99)
+        all_confs = np.concatenate([-widths, widths], axis=1)
+        for tol in (0.01, 1, 100):
+            significances, conf_ranges = get_numeric_conf_range(all_confs, {'__default': 1}, std_tol=tol)
+            expected_significances, expected_ranges = _loop_numeric_conf_range(all_confs, tol)
+            np.testing.assert_array_equal(significances, expected_significances)
+            np.testing.assert_array_equal(conf_ranges, expected_ranges)
+
+    def test_group_calibrations(self):
+        np.random.seed(0)
+        df = pd.DataFrame({'g1': np.random.choice(list('ab'), 1000), 'g2': np.random.randint(0, 3, 1000)})
+        df.loc[::50, 'g1'] = np.nan  # rows without a group are left out
+        df['y'] = np.random.normal(size=len(df)) * (df['g2'] + 1)
+        df['pred'] = np.random.normal(size=len(df))
+
+        group_positions = get_ts_group_positions(df, ['g1', 'g2'])
+        self.assertEqual(len(group_positions), 6)
+        for (g1, g2), idxs in group_positions.items():
+            np.testing.assert_array_equal(idxs, np.flatnonzero((df['g1'] == g1) & (df['g2'] == g2)))
+
+        model = CachedRegressorAdapter(None)
+        model.prediction_cache = df['pred'].values
+        normalizer = CachedRegressorAdapter(None)  # stands in for the normalizer, only its cache matters here
+        normalizer.prediction_cache = np.ones(len(df))
+        icp = IcpRegressor(RegressorNc(model, BoostedAbsErrorErrFunc(), normalizer=normalizer), cal_size=100)
+        x = np.zeros((len(df), 1))
+        group_icp = _detached_copy(icp)
+        calibrations = {}
+        for group, idxs in group_positions.items():
+            group_icp.nc_function.model.prediction_cache = df['pred'].values[idxs]
+            group_icp.nc_function.normalizer.prediction_cache = normalizer.prediction_cache[idxs]
+            group_icp.calibrate(x[idxs], df['y'].values[idxs])
+            calibrations[group] = group_icp.get_calibration()
+
+        # the base ICP keeps the caches of the whole dataset
+        self.assertIs(icp.nc_function.model, model)
+        self.assertIs(icp.nc_function.normalizer, normalizer)
+        np.testing.assert_array_equal(model.prediction_cache, df['pred'].values)
+        self.assertEqual(len(normalizer.prediction_cache), len(df))
+
+        # deep copies of the ICP (which grouped calibration used to make) share the adapters of the base ICP too
+        self.assertIs(deepcopy(icp).nc_function.model, model)
+        self.assertIs(deepcopy(icp).nc_function.normalizer, normalizer)
+
+        for group, idxs in group_positions.items():
+            # same intervals as an ICP calibrated on the group alone
+            expected_model = CachedRegressorAdapter(None)
+            expected_model.prediction_cache = df['pred'].values[idxs]
+            expected_normalizer = CachedRegressorAdapter(None)
+            expected_normalizer.prediction_cache = normalizer.prediction_cache[idxs]
+            expected_icp = IcpRegressor(RegressorNc(expected_model, BoostedAbsErrorErrFunc(),
+                                                    normalizer=expected_normalizer), cal_size=100)
+            expected_icp.calibrate(x[idxs], df['y'].values[idxs])
+
+            group_icp.set_calibration(calibrations[group])
+            group_icp.nc_function.model.prediction_cache = df['pred'].values[idxs]
+            group_icp.nc_function.normalizer.prediction_cache = normalizer.prediction_cache[idxs]
+            np.testing.assert_array_equal(group_icp.predict(x[idxs]), expected_icp.predict(x[idxs]))
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import torch
+
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
+
+
+class TestEncodedDs(unittest.TestCase):
+    def _get_ds(self):
+        df = pd.DataFrame({
+            'num': [1, 2.5, None, -4, 0, 7],
+            'cat': ['a', 'b', 'a', 'c', None, 'b'],
+            'target': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        }, index=[10, 3, 7, 1, 0, 22])  # non-default index on purpose
+        encoders = {
+            'num': NumericEncoder(),
+            'cat': OneHotEncoder(),
+            'target': NumericEncoder(is_target=True)
+        }
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        return df, encoders
+
+    def test_columnar_matches_per_row(self):
+        df, encoders = self._get_ds()
+        columnar_ds = EncodedDs(encoders, df, 'target')
+        row_ds = EncodedDs(encoders, df, 'target')
+        row_ds.cache_encoded = False
+
+        for idx in range(len(df)):
+            X, Y = columnar_ds[idx]
+            X_row, Y_row = row_ds[idx]
+            self.assertTrue(torch.equal(X, X_row))
+            self.assertTrue(torch.equal(Y, Y_row))
+
+        X = columnar_ds.get_encoded_data(include_target=False)
+        self.assertEqual(X.dtype, torch.float32)
+        self.assertEqual(tuple(X.shape), (len(df), columnar_ds.input_length))
+        for col, (start, end) in columnar_ds.encoder_spans.items():
+            self.assertTrue(torch.equal(columnar_ds.get_encoded_column_data(col), X[:, start:end]))
+
+        full = columnar_ds.get_encoded_data(include_target=True)
+        self.assertEqual(full.shape[1], columnar_ds.input_length + encoders['target'].output_size)
+
+    def test_batch_encoding_fallback(self):
+        df, encoders = self._get_ds()
+        expected = EncodedDs(encoders, df, 'target').get_encoded_column_data('num')
+        encode = NumericEncoder.encode
+
+        def single_row_encode(encoder, data, *args, **kwargs):
+            if len(data) > 1:
+                raise ValueError('one row at a time')
+            return encode(encoder, data, *args, **kwargs)
+
+        # failed batched calls are retried one row at a time
+        with mock.patch.object(NumericEncoder, 'encode', single_row_encode):
+            encoded = EncodedDs(encoders, df, 'target').get_encoded_column_data('num')
+        self.assertTrue(torch.equal(encoded, expected))
+
+        # errors that are not specific to batching are raised
+        with mock.patch.object(NumericEncoder, 'encode', side_effect=ValueError('broken')):
+            with self.assertRaises(ValueError):
+                EncodedDs(encoders, df, 'target').get_encoded_column_data('num')
+
+    def test_missing_target(self):
+        df, encoders = self._get_ds()
+        ds = EncodedDs(encoders, df.drop(columns=['target']), 'target')
+        X, Y = ds[0]
+        self.assertEqual(X.shape[0], ds.input_length)
+        self.assertEqual(Y.numel(), 0)
+
+    def test_clear_cache(self):
+        df, encoders = self._get_ds()
+        ds = EncodedDs(encoders, df, 'target')
+        before = ds.get_encoded_column_data('num').clone()
+        ds.clear_cache()
+        ds.data_frame['num'] = ds.data_frame['num'].fillna(0) * 2
+        self.assertFalse(torch.equal(before, ds.get_encoded_column_data('num')))
+
+    def test_concated(self):
+        df, encoders = self._get_ds()
+        ds = EncodedDs(encoders, df, 'target')
+        concat = ConcatedEncodedDs([ds, ds])
+        self.assertEqual(concat.get_encoded_data(include_target=False).shape[0], 2 * len(df))
+
+    def test_disk_cache(self):
+        df, encoders = self._get_ds()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ds = EncodedDs(encoders, df, 'target', cache_dir=cache_dir)
+            X = ds.get_encoded_data(include_target=False)
+            Y = ds.get_encoded_column_data('target')
+            self.assertEqual(len([f for f in os.listdir(cache_dir) if f.endswith('.npy')]), 2)
+            self.assertTrue(torch.equal(X, EncodedDs(encoders, df, 'target').get_encoded_data(include_target=False)))
+
+            # same data and encoders: the cached matrices are reused without re-encoding
+            with mock.patch.object(NumericEncoder, 'encode', side_effect=AssertionError):
+                cached_ds = EncodedDs(encoders, df, 'target', cache_dir=cache_dir)
+                self.assertTrue(torch.equal(X, cached_ds.get_encoded_data(include_target=False)))
+                self.assertTrue(torch.equal(Y, cached_ds.get_encoded_column_data('target')))
+
+            # differently prepared encoders get their own files
+            other_encoders = dict(encoders, num=NumericEncoder())
+            other_encoders['num'].prepare(df['num'] * 2)
+            other_ds = EncodedDs(other_encoders, df, 'target', cache_dir=cache_dir)
+            other_ds.get_encoded_data(include_target=False)
+            self.assertEqual(len([f for f in os.listdir(cache_dir) if f.endswith('.npy')]), 3)
+
+            other_ds.clear_cache(remove_files=True)
+            self.assertEqual(len([f for f in os.listdir(cache_dir) if f.endswith('.npy')]), 2)
+
+    def test_sparse(self):
+        df, encoders = self._get_ds()
+        ds = EncodedDs(encoders, df, 'target')
+        X_sparse = ds.get_encoded_data(include_target=False, sparse=True)
+        self.assertTrue(scipy.sparse.isspmatrix_csr(X_sparse))
+        self.assertIsNone(ds.X_cache)  # the dense matrix is never built
+
+        X = ds.get_encoded_data(include_target=False)
+        self.assertTrue(np.array_equal(X_sparse.toarray(), X.numpy()))
+        # dense columns keep their zeros as stored entries, only the one-hot block is really sparse
+        self.assertEqual(X_sparse.nnz, len(df) * (encoders['num'].output_size + 1))
+
+        full_sparse = ds.get_encoded_data(include_target=True, sparse=True)
+        self.assertTrue(np.array_equal(full_sparse.toarray(), ds.get_encoded_data(include_target=True).numpy()))
+
+        concat = ConcatedEncodedDs([ds, ds])
+        self.assertEqual(concat.get_encoded_column_data('cat', sparse=True).shape, (2 * len(df), ds.encoders['cat'].output_size))  # noqa
+
+        self.assertFalse(ds.prefers_sparse())
+        wide_df = pd.DataFrame({'cat': [f'c{i}' for i in range(200)], 'target': np.arange(200.0)})
+        wide_encoders = {'cat': OneHotEncoder(), 'target': NumericEncoder(is_target=True)}
+        for col, encoder in wide_encoders.items():
+            encoder.prepare(wide_df[col])
+        self.assertTrue(EncodedDs(wide_encoders, wide_df, 'target').prefers_sparse())
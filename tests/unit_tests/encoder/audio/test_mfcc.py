@@ -1,6 +1,9 @@
 import os
+import tempfile
 import unittest
+from unittest import mock
 
+import torch
 from torch import Tensor
 
 from lightwood.encoder.audio import MFCCEncoder
@@ -27,3 +30,31 @@ class TestMFCCEncoder(unittest.TestCase):
         # We expect the first dimension to equal the number of images
         self.assertEqual(encoded_audio.size(0), 3)
         self.assertEqual(encoded_audio.size(1), 2000)
+
+    def test_parallel_and_cached_encode(self):
+        if MFCCEncoder is None:
+            print('Skipping this test since the system for the encoder work are not installed')
+            return
+
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        audio_paths = [
+            os.path.join(dir_path, 'test_audio_1.wav'),
+            os.path.join(dir_path, 'test_audio_2.wav'),
+            os.path.join(dir_path, 'test_audio_1.wav'),
+            None
+        ]
+        reference = MFCCEncoder()
+        reference.prepare(audio_paths)
+        expected = reference.encode(audio_paths)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            encoder = MFCCEncoder(num_workers=2, cache_dir=cache_dir)
+            encoder.prepare(audio_paths)
+            self.assertTrue(torch.allclose(encoder.encode(audio_paths), expected))
+
+            # every readable file is now cached, nothing is decoded again
+            with mock.patch('lightwood.encoder.audio.mfcc.read_from_path_or_url', side_effect=AssertionError):
+                cached = MFCCEncoder(cache_dir=cache_dir)
+                cached.output_size = encoder.output_size
+                cached.is_prepared = True
+                self.assertTrue(torch.allclose(cached.encode(audio_paths[:3]), expected[:3]))
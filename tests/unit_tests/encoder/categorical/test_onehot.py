@@ -196,3 +196,37 @@ class TestOnehot(unittest.TestCase):
 
         # Check if 0-weight class is rejected
         self.assertRaises(ValueError, enc.prepare, data)
+
+    def test_high_cardinality_batch(self):
+        """
+        Encodes and decodes a high cardinality column in a single batch; every row must round-trip and the probabilities must match the row-wise softmax.
+        """  # noqa
+        n_cats = 5000
+        data = [f'category {i}' for i in np.random.randint(0, n_cats, 20000)]
+        enc = OneHotEncoder(is_target=True, use_unknown=False)
+        enc.prepare(data)
+
+        encoded = enc.encode(data + ['unseen category'])
+        self.assertEqual(tuple(encoded.shape), (len(data) + 1, enc.output_size))
+        self.assertTrue(torch.all(encoded.sum(dim=1)[:-1] == 1))
+        self.assertEqual(encoded[-1].sum().item(), 0)
+
+        decoded, probs, _ = enc.decode_probabilities(encoded)
+        self.assertEqual(decoded, data + [_UNCOMMON_WORD])
+        np.testing.assert_allclose(probs[0], torch.softmax(encoded[0].double(), dim=0).numpy())
+
+    def test_encode_sparse(self):
+        """
+        The sparse encoding must hold exactly the same values as the dense one, in both unknown-handling modes.
+        """  # noqa
+        data = ['category 1', 'category 3', 'category 4', None, 'category 3']
+        test_data = ['unseen category', 'category 4', None, 'category 1']
+
+        for use_unknown in (True, False):
+            enc = OneHotEncoder(use_unknown=use_unknown)
+            enc.prepare(data)
+
+            sparse_encoded = enc.encode_sparse(test_data)
+            self.assertEqual(sparse_encoded.format, 'csr')
+            self.assertEqual(sparse_encoded.nnz, len(test_data) if use_unknown else 2)
+            self.assertTrue(np.array_equal(sparse_encoded.toarray(), enc.encode(test_data).numpy()))
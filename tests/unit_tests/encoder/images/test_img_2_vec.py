@@ -28,6 +28,21 @@ class TestImg2VecEncoder(unittest.TestCase):
         # encoding models.
         self.assertEqual(encoded_images_tensor.size(1), 512)
 
+    def test_batched_encode(self):
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        image_path = os.path.join(dir_path, 'test_image.jpg')
+
+        enc = Img2VecEncoder(batch_size=2, num_workers=2)
+        enc.prepare([], [])
+
+        # an odd amount of images, so that the last batch is incomplete
+        encoded_images_tensor = enc.encode(images=[image_path] * 5)
+        self.assertEqual(tuple(encoded_images_tensor.shape), (5, 512))
+
+        single = enc.encode(images=[image_path])
+        for row in encoded_images_tensor:
+            self.assertTrue(torch.allclose(row, single[0], atol=1e-4))
+
     def run_test_encoder_on_device(self, device):
         enc = Img2VecEncoder(device=device)
         enc.prepare([], [])
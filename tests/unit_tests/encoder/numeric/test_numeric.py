@@ -1,3 +1,6 @@
+import os
+import math
+import time
 import unittest
 import numpy as np
 import torch
@@ -14,6 +17,24 @@ def _pollute(array):
     ]
 
 
+def _scalar_encode(encoder, data):
+    """ Reference per-value implementation of `NumericEncoder.encode()` for feature columns """
+    ret = []
+    for real in data:
+        try:
+            real = float(real)
+        except Exception:
+            real = None
+        vector = [0] * 4
+        if not is_none(real):
+            vector[0] = 1
+            vector[1] = math.log(abs(real)) if abs(real) > 0 else -20
+            vector[2] = 1 if real < 0 and not encoder.positive_domain else 0
+            vector[3] = real / encoder._abs_mean
+        ret.append(vector)
+    return torch.Tensor(ret)
+
+
 class TestNumericEncoder(unittest.TestCase):
     def test_encode_and_decode(self):
         data = [1, 1.1, 2, -8.6, None, 0]
@@ -114,3 +135,56 @@ class TestNumericEncoder(unittest.TestCase):
             for x in decoded_repr[:-1]:
                 assert not is_none(x)
             assert decoded_repr[-1] is None
+
+    def test_vectorized_matches_scalar(self):
+        n_values = 100_000
+        n_reference = 10_000  # the scalar implementation is only run on a subsample
+        data = np.random.normal(0, 100, n_values).tolist()
+        data[::100] = [None] * len(data[::100])
+
+        encoder = NumericEncoder()
+        encoder.prepare(data[:n_reference])
+
+        expected = _scalar_encode(encoder, data[:n_reference])
+        encoded = encoder.encode(data)
+        decoded = encoder.decode(encoded)
+
+        self.assertTrue(torch.equal(encoded[:n_reference], expected))
+        self.assertEqual(len(decoded), n_values)
+
+    def test_infinite_values(self):
+        # same output as the scalar implementation: infinite features are encoded as missing
+        data = [1.5, np.inf, -np.inf, np.nan, None, -3]
+        encoder = NumericEncoder()
+        encoder.prepare([1, 2, 3])
+        self.assertTrue(torch.equal(encoder.encode(data), _scalar_encode(encoder, data)))
+        self.assertEqual(encoder.encode(data)[:, 0].tolist(), [1, 0, 0, 0, 0, 1])
+
+        # targets pass them through, so that encoded datasources reject them
+        target_encoder = NumericEncoder(is_target=True)
+        target_encoder.prepare([1, 2, 3])
+        self.assertTrue(torch.isinf(target_encoder.encode([np.inf, -np.inf])[:, 1:]).all())
+
+    @unittest.skipIf(not os.environ.get('LIGHTWOOD_BENCHMARKS'), 'set LIGHTWOOD_BENCHMARKS=1 to run benchmarks')
+    def test_benchmark_vectorized(self):
+        n_values = 1_000_000
+        n_reference = 50_000  # the scalar implementation is timed on a subsample and extrapolated
+        data = np.random.normal(0, 100, n_values).tolist()
+        data[::100] = [None] * len(data[::100])
+
+        encoder = NumericEncoder()
+        encoder.prepare(data[:n_reference])
+
+        start = time.time()
+        expected = _scalar_encode(encoder, data[:n_reference])
+        scalar_time = (time.time() - start) * n_values / n_reference
+
+        start = time.time()
+        encoded = encoder.encode(data)
+        encoder.decode(encoded)
+        vectorized_time = time.time() - start
+
+        self.assertTrue(torch.equal(encoded[:n_reference], expected))
+        print(f'NumericEncoder on {n_values} values: scalar encode ~{round(scalar_time, 2)}s (extrapolated), '
+              f'vectorized encode + decode {round(vectorized_time, 2)}s '
+              f'(x{round(scalar_time / vectorized_time, 1)})')
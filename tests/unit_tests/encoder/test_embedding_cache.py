@@ -0,0 +1,63 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import torch
+
+from lightwood.helpers.embedding_cache import EmbeddingCache, get_embedding_cache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def _encode_fn(self):
+        calls = []
+
+        def encode_fn(values):
+            calls.append(list(values))
+            return torch.tensor([[len(str(v)), float(hash(str(v)) % 1000)] for v in values])
+        return encode_fn, calls
+
+    def test_memory_cache(self):
+        cache = EmbeddingCache(max_items=3)
+        encode_fn, calls = self._encode_fn()
+
+        values = ['a', 'bb', 'a', 'ccc', 'bb']
+        embeddings = cache.encode('model', values, encode_fn)
+        self.assertEqual(calls, [['a', 'bb', 'ccc']])  # repeated values are only embedded once
+        self.assertTrue(torch.equal(embeddings, encode_fn(values)))
+
+        calls.clear()
+        cache.encode('model', ['ccc', 'a'], encode_fn)
+        self.assertEqual(calls, [])
+        cache.encode('other model', ['a'], encode_fn)  # keys are namespaced by model
+        self.assertEqual(calls, [['a']])
+        self.assertEqual(len(cache), 3)  # LRU bound
+
+        # unpickling yields the process-wide cache with the same settings, not a copy of the entries
+        restored = pickle.loads(pickle.dumps(cache))
+        self.assertIs(restored, get_embedding_cache(max_items=3))
+        self.assertEqual(len(restored), 0)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'embeddings.db')
+            encode_fn, calls = self._encode_fn()
+            values = [f'value {i}' for i in range(50)]
+
+            embeddings = EmbeddingCache(path=path, max_items=10).encode('model', values, encode_fn)
+
+            # a new cache (e.g. in another process) reads the persisted embeddings
+            calls.clear()
+            cache = EmbeddingCache(path=path, max_items=10)
+            self.assertTrue(torch.equal(cache.encode('model', values, encode_fn), embeddings))
+            self.assertEqual(calls, [])
+
+            # beyond the size budget, the least recently used entries are evicted
+            small_cache = EmbeddingCache(path=path, max_items=1, max_disk_bytes=8 * 20)
+            small_cache.encode('model', ['new value'], encode_fn)
+            n_rows = small_cache._get_conn().execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+            self.assertLessEqual(n_rows, 20)
+            self.assertIsNotNone(small_cache.get([small_cache.get_key('model', 'new value')])[0])
+
+    def test_shared(self):
+        self.assertIs(get_embedding_cache(), get_embedding_cache())
@@ -151,6 +151,28 @@ class TestPretrainedLangEncoder(unittest.TestCase):
         assert(embeddings.shape[0] == test.shape[0])
         assert(embeddings.shape[1] == N_embed_dim)
 
+    def test_batched_encode(self):
+        """
+        Batched (length-bucketed) encoding must match encoding each text on its own, in the original row order.
+        """ # noqa
+        random.seed(0)
+        train, _ = create_synthetic_data(50, ptrain=1)
+        output_enc = NumericEncoder(is_target=True)
+        output_enc.prepare(train["label"])
+
+        enc = PretrainedLangEncoder(stop_after=10, output_type=dtype.float, inference_batch_size=16)
+        enc.prepare(train["text"], pd.DataFrame(), encoded_target_values=output_enc.encode(train["label"]))
+
+        # texts of very different lengths, so that batches are reordered
+        texts = [" ".join(random.choices(train["text"].tolist(), k=random.randint(1, 40))) for _ in range(200)]
+        texts[3] = None
+
+        embeddings = enc.encode(texts)
+        row_embeddings = torch.cat([enc.encode([text]) for text in texts])
+
+        self.assertEqual(tuple(embeddings.shape), tuple(row_embeddings.shape))
+        self.assertTrue(torch.allclose(embeddings, row_embeddings, atol=1e-4))
+
     def run_test_encoder_on_device(self, device):
         train, _ = create_synthetic_data(20, ptrain=1)
         output_enc = BinaryEncoder(is_target=True)
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+from lightwood.api.types import PredictionArguments
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder
+from lightwood.ensemble import ModeEnsemble, WeightedMeanEnsemble
+from lightwood.mixer.base import BaseMixer
+
+
+class FixedMixer(BaseMixer):
+    def __init__(self, predictions):
+        super().__init__(stop_after=1)
+        self.stable = True
+        self.predictions = predictions
+
+    def __call__(self, ds, args=PredictionArguments()):
+        return pd.DataFrame({'prediction': self.predictions})
+
+
+def _fixed_mixers(predictions):
+    # ensembles name their columns after each mixer's class
+    return [type(f'FixedMixer{i}', (FixedMixer,), {})(p) for i, p in enumerate(predictions)]
+
+
+def _pick_mode_highest_score(prediction: pd.Series, mixer_scores: dict):
+    """
+    Reference implementation: row-wise vote.
+    """
+    prediction_counts = prediction.value_counts()
+    if len(prediction_counts) == 1:
+        return prediction_counts.index[0]
+    modes = prediction_counts[prediction_counts == np.max(prediction_counts.values)]
+    modes_predictions_scores = {}
+    for mode_prediction in modes.index:
+        voting_mixers_name = prediction[prediction == mode_prediction].index.tolist()
+        modes_predictions_scores[mode_prediction] = np.sum([mixer_scores[name] for name in voting_mixers_name])
+    return max(modes_predictions_scores, key=modes_predictions_scores.get)
+
+
+class TestAggregation(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({'y': np.arange(10, dtype=float)})
+        encoders = {'y': NumericEncoder(is_target=True)}
+        encoders['y'].prepare(df['y'])
+        self.ds = EncodedDs(encoders, df, 'y')
+
+    def test_mode_ensemble(self):
+        np.random.seed(0)
+        n_rows = 20_000
+        predictions = [np.random.choice(list('abcd'), n_rows) for _ in range(5)]
+        ensemble = ModeEnsemble('y', _fixed_mixers(predictions), self.ds, {'y': dtype.categorical}, [],
+                                PredictionArguments(), fit=False)
+        # tied scores, so that both tie-breaking rules are exercised
+        ensemble.mixer_scores = {f'__mdb_mixer_FixedMixer{i}': s for i, s in enumerate([0.5, 0.7, 0.5, 0.2, 0.7])}
+        ensemble.prepared = True
+
+        modes = ensemble(self.ds, PredictionArguments())['prediction']
+
+        n_ref = 5000
+        predictions_df = pd.DataFrame({f'__mdb_mixer_FixedMixer{i}': p[:n_ref] for i, p in enumerate(predictions)})
+        reference = predictions_df.apply(_pick_mode_highest_score, axis='columns', args=(ensemble.mixer_scores,))
+        self.assertEqual(len(modes), n_rows)
+        self.assertEqual(modes.iloc[:n_ref].tolist(), reference.tolist())
+
+        # missing predictions do not vote
+        votes = ModeEnsemble._vote(np.array([['a', None, 'b'], [None, None, None], ['b', 'a', 'a']], dtype=object),
+                                   np.array([0.1, 0.9, 0.5]), max_cells=2)
+        self.assertEqual(votes.tolist(), ['b', None, 'a'])
+
+    def test_weighted_mean_ensemble(self):
+        np.random.seed(0)
+        predictions = [np.random.normal(size=1000) for _ in range(3)]
+        ensemble = WeightedMeanEnsemble('y', _fixed_mixers(predictions), self.ds, PredictionArguments(),
+                                        {'y': dtype.float}, [], fit=False)
+        ensemble.weights = np.array([0.2, 0.5, 0.3])
+        ensemble.prepared = True
+
+        output = ensemble(self.ds, PredictionArguments())
+        np.testing.assert_allclose(output['prediction'].values,
+                                   np.average(np.stack(predictions, axis=1), axis=1, weights=ensemble.weights))
+
+        # user-provided weights don't need to be normalized
+        output = ensemble(self.ds, PredictionArguments(mixer_weights=[1, 0, 1]))
+        np.testing.assert_allclose(output['prediction'].values, (predictions[0] + predictions[2]) / 2)
+        with self.assertRaises(Exception):
+            ensemble(self.ds, PredictionArguments(mixer_weights=[1, 1]))
@@ -0,0 +1,122 @@
+import threading
+import unittest
+
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+from lightwood.api.types import PredictionArguments
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder
+from lightwood.ensemble import BestOf, MeanEnsemble, WeightedMeanEnsemble
+from lightwood.mixer.base import BaseMixer
+
+
+class CountingEncoder(NumericEncoder):
+    def encode(self, data):
+        self.n_calls = getattr(self, 'n_calls', 0) + 1
+        return super().encode(data)
+
+
+class StubMixer(BaseMixer):
+    def __init__(self, value, stable=True):
+        super().__init__(stop_after=1)
+        self.stable = stable
+        self.value = value
+        self.n_calls = 0
+        self.barrier = None  # if set, calls wait here for the other mixers, so they must run concurrently
+        self.release = None  # if set, calls block until this event is set
+
+    def __call__(self, ds, args=PredictionArguments()):
+        self.n_calls += 1
+        if self.barrier is not None:
+            self.barrier.wait()
+        X = ds.get_encoded_data(include_target=False)
+        if self.release is not None:
+            self.release.wait()
+        if self.value is None:
+            raise Exception('Mixer failed')
+        return pd.DataFrame({'prediction': np.full(len(X), self.value, dtype=float)})
+
+
+def _mixers(*specs):
+    # ensembles name their columns after each mixer's class
+    return [type(f'StubMixer{i}', (StubMixer,), {})(*spec) for i, spec in enumerate(specs)]
+
+
+class TestConcurrentMixers(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({'x': np.arange(20, dtype=float), 'y': np.arange(20, dtype=float)})
+        self.encoders = {'x': CountingEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in self.encoders.items():
+            encoder.prepare(df[col])
+        self.df = df
+        self.dtype_dict = {'x': dtype.float, 'y': dtype.float}
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)  # unblocks calls that were given up on
+
+    def _ds(self):
+        return EncodedDs(self.encoders, self.df, 'y')
+
+    def test_mean_ensemble(self):
+        ensemble = MeanEnsemble('y', _mixers((1,), (2,), (3,)), self._ds(), self.dtype_dict)
+        ensemble.clear_prediction_cache()  # as after analysis, so that every call reaches the mixers
+        sequential = ensemble(self._ds(), PredictionArguments())
+
+        # every mixer waits for the others before encoding, which only succeeds if they are called at once
+        barrier = threading.Barrier(len(ensemble.mixers), timeout=30)
+        for mixer in ensemble.mixers:
+            mixer.barrier = barrier
+        self.encoders['x'].n_calls = 0
+        concurrent = ensemble(self._ds(), PredictionArguments(concurrent_mixers=True))
+
+        self.assertEqual(self.encoders['x'].n_calls, 1)  # the shared datasource is encoded once
+        self.assertEqual([mixer.n_calls for mixer in ensemble.mixers], [2, 2, 2])
+        np.testing.assert_allclose(concurrent['prediction'].values, sequential['prediction'].values)
+
+        # mixers that time out are left out
+        for mixer in ensemble.mixers:
+            mixer.barrier = None
+        ensemble.mixers[2].release = self.release
+        args = PredictionArguments(concurrent_mixers=True, mixer_timeout=1)
+        results = ensemble.dispatch_mixers(ensemble.mixers, self._ds(), args)
+        self.assertIsInstance(results[0], pd.DataFrame)
+        self.assertIsInstance(results[1], pd.DataFrame)
+        self.assertIsNone(results[2])
+        predictions = ensemble(self._ds(), args)
+        np.testing.assert_allclose(predictions['prediction'].values, 1.5)
+        self.assertEqual([mixer.n_calls for mixer in ensemble.mixers], [4, 4, 4])
+
+    def test_weighted_mean_ensemble(self):
+        ensemble = WeightedMeanEnsemble('y', _mixers((1,), (2,), (4,)), self._ds(), PredictionArguments(),
+                                        self.dtype_dict, [], fit=False)
+        ensemble.weights = np.array([0.25, 0.5, 0.25])
+        ensemble.prepared = True
+        ensemble.clear_prediction_cache()
+        ensemble.mixers[1].release = self.release
+        predictions = ensemble(self._ds(), PredictionArguments(concurrent_mixers=True, mixer_timeout=1))
+        np.testing.assert_allclose(predictions['prediction'].values, 2.5)  # remaining weights are renormalized
+
+    def test_best_of(self):
+        ensemble = BestOf('y', _mixers((1,), (2, False), (3,)), self._ds(), [], PredictionArguments(),
+                          fit=False)
+        ensemble.indexes_by_accuracy = [0, 1, 2]
+        ensemble.prepared = True
+        ensemble.clear_prediction_cache()  # as after analysis, so that every call reaches the mixers
+
+        # the best mixer does not answer in time, the second one is unstable and fails, so the third one is used
+        ensemble.mixers[0].release = self.release
+        ensemble.mixers[1].value = None
+        predictions = ensemble(self._ds(), PredictionArguments(concurrent_mixers=True, mixer_timeout=1))
+        np.testing.assert_allclose(predictions['prediction'].values, 3)
+        self.assertEqual([mixer.n_calls for mixer in ensemble.mixers], [1, 1, 1])
+
+        # without a timeout, the best mixer is waited for
+        self.release.set()
+        predictions = ensemble(self._ds(), PredictionArguments(concurrent_mixers=True))
+        np.testing.assert_allclose(predictions['prediction'].values, 1)
+
+        # failures of stable mixers are raised
+        ensemble.mixers[0].value = None
+        with self.assertRaises(Exception):
+            ensemble(self._ds(), PredictionArguments(concurrent_mixers=True))
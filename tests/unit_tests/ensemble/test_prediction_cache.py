@@ -0,0 +1,81 @@
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+from lightwood.api.types import PredictionArguments
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.ensemble import BestOf, WeightedMeanEnsemble, StackedEnsemble
+from lightwood.mixer import Regression
+
+
+class CountingRegression(Regression):
+    def __call__(self, ds, args=PredictionArguments()):
+        self.n_calls = getattr(self, 'n_calls', 0) + 1
+        return super().__call__(ds, args)
+
+
+class OtherCountingRegression(CountingRegression):  # ensembles name their columns after each mixer's class
+    pass
+
+
+class TestPredictionCache(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        df = pd.DataFrame({'a': np.random.normal(size=600), 'b': np.random.choice(list('xyz'), 600)})
+        df['y'] = df['a'] * 3 + (df['b'] == 'x') * 2
+        self.encoders = {'a': NumericEncoder(), 'b': OneHotEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in self.encoders.items():
+            encoder.prepare(df[col])
+        self.df = df
+        dtype_dict = {'a': dtype.float, 'b': dtype.categorical, 'y': dtype.float}
+        train = EncodedDs(self.encoders, df.iloc[:400], 'y')
+        dev = EncodedDs(self.encoders, df.iloc[400:500], 'y')
+        self.mixers = []
+        for mixer_class in (CountingRegression, OtherCountingRegression):
+            mixer = mixer_class(10, self.encoders['y'], dtype_dict, 'y')
+            mixer.fit(train, dev)
+            self.mixers.append(mixer)
+        self.dtype_dict = dtype_dict
+
+    def _n_calls(self):
+        return [getattr(mixer, 'n_calls', 0) for mixer in self.mixers]
+
+    def test_ensembles_reuse_validation_predictions(self):
+        args = PredictionArguments()
+        for ensemble_class, kwargs in [
+            (BestOf, {'accuracy_functions': ['r2_score']}),
+            (WeightedMeanEnsemble, {'accuracy_functions': ['r2_score'], 'dtype_dict': self.dtype_dict}),
+            (StackedEnsemble, {'dtype_dict': self.dtype_dict}),
+        ]:
+            for mixer in self.mixers:
+                mixer.n_calls = 0
+            val = EncodedDs(self.encoders, self.df.iloc[500:], 'y')
+            ensemble = ensemble_class('y', self.mixers, val, args=args, **kwargs)
+            self.assertEqual(self._n_calls(), [1, 1])
+
+            # same rows in a separately built datasource (as in `model_analyzer`): no new mixer calls
+            same_val = EncodedDs(self.encoders, self.df.iloc[500:].copy(), 'y')
+            predictions = ensemble(same_val, args)
+            self.assertEqual(self._n_calls(), [1, 1])
+
+            # other data is always predicted
+            ensemble(EncodedDs(self.encoders, self.df.iloc[:100], 'y'), args)
+            self.assertEqual(sum(self._n_calls()), 2 + (1 if ensemble_class is BestOf else 2))
+
+            # once cleared (e.g. after analysis), mixers are called again and results are unchanged
+            ensemble.clear_prediction_cache()
+            np.testing.assert_allclose(ensemble(same_val, args)['prediction'].values.astype(float),
+                                       predictions['prediction'].values.astype(float))
+
+    def test_not_pickled(self):
+        val = EncodedDs(self.encoders, self.df.iloc[500:], 'y')
+        ensemble = BestOf('y', self.mixers, val, ['r2_score'], PredictionArguments())
+        self.assertEqual(len(ensemble.prediction_cache.entries), 2)
+        restored = pickle.loads(pickle.dumps(ensemble))
+        self.assertIsNone(restored.prediction_cache)
+        self.assertEqual(len(ensemble.prediction_cache.entries), 2)
+        self.assertEqual(len(restored(val, PredictionArguments())), len(val))
@@ -0,0 +1,124 @@
+import os
+import copy
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+import lightgbm
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+import lightwood.helpers.device as device_helpers
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.mixer import LightGBM
+from lightwood.mixer.lightgbm import _SharedDataset
+
+
+class TestLightGBM(unittest.TestCase):
+    def test_gpu_probe_cache(self):
+        calls = []
+
+        def probe():
+            calls.append(1)
+            return False
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.dict(os.environ, {'LIGHTWOOD_CACHE_DIR': tmp_dir}), \
+                mock.patch.dict(device_helpers._gpu_probes, clear=True):
+            self.assertFalse(device_helpers.cached_gpu_probe(lightgbm, probe))
+            self.assertFalse(device_helpers.cached_gpu_probe(lightgbm, probe))
+            self.assertEqual(len(calls), 1)
+
+            # a new process reads the result from disk
+            device_helpers._gpu_probes.clear()
+            self.assertFalse(device_helpers.cached_gpu_probe(lightgbm, probe))
+            self.assertEqual(len(calls), 1)
+
+            # other libraries are probed separately
+            device_helpers.cached_gpu_probe(np, probe)
+            self.assertEqual(len(calls), 2)
+
+        # without a cache directory, results are only kept in memory
+        with tempfile.TemporaryDirectory() as home, \
+                mock.patch.dict(os.environ, {'HOME': home}), \
+                mock.patch.dict(device_helpers._gpu_probes, clear=True):
+            os.environ.pop('LIGHTWOOD_CACHE_DIR', None)
+            device_helpers.cached_gpu_probe(lightgbm, probe)
+            device_helpers.cached_gpu_probe(lightgbm, probe)
+            self.assertEqual(len(calls), 3)
+            self.assertEqual(os.listdir(home), [])
+
+    def test_dataset_reuse(self):
+        np.random.seed(0)
+        n_rows = 2000
+        df = pd.DataFrame({'a': np.random.normal(size=n_rows), 'b': np.random.choice(list('xyz'), n_rows)})
+        df['y'] = df['a'] * 3 + (df['b'] == 'x') + np.random.normal(size=n_rows) * 0.1
+        encoders = {'a': NumericEncoder(), 'b': OneHotEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        dtype_dict = {'a': dtype.float, 'b': dtype.categorical, 'y': dtype.float}
+        train = EncodedDs(encoders, df.iloc[:1600], 'y')
+        dev = EncodedDs(encoders, df.iloc[1600:1800], 'y')
+        test = EncodedDs(encoders, df.iloc[1800:], 'y')
+
+        binned = []
+        construct = lightgbm.Dataset.construct
+
+        def counting_construct(dataset):
+            if dataset.handle is None:
+                binned.append(dataset)
+            return construct(dataset)
+
+        # with this budget the optuna search runs (on small data, a single iteration is deemed to take 0.1s)
+        mixer = LightGBM(30, 'y', dtype_dict, ['a', 'b'], True, True, encoders['y'])
+        with mock.patch.object(lightgbm.Dataset, 'construct', counting_construct):
+            mixer.fit(train, dev)
+
+        # train and dev are binned once for all optuna trials, and once more for the partial fit on dev
+        self.assertEqual(len(binned), 4)
+        predictions = mixer(test)['prediction'].values
+        self.assertGreater(np.corrcoef(predictions, df['y'].iloc[1800:].values)[0, 1], 0.95)
+
+        # the native dataset is not pickled, partial fits on a loaded mixer bin their own data
+        loaded = pickle.loads(pickle.dumps(mixer))
+        self.assertIsNone(getattr(loaded, 'train_dataset', None))
+        loaded.partial_fit(dev, train)
+        self.assertEqual(len(loaded(test)), len(test))
+
+    def test_optuna_dataset_copies(self):
+        """
+        Pins the library behavior `_SharedDataset` relies on: shallow copies of a constructed `lightgbm.Dataset` share its native handle (so they can't be used and freed independently), and the optuna tuner shallow-copies the datasets it is given before each trial.
+        """  # noqa
+        X = np.random.normal(size=(200, 3))
+        dataset = lightgbm.Dataset(X, label=X[:, 0], free_raw_data=False).construct()
+        dataset_copy = copy.copy(dataset)
+        self.assertIs(dataset_copy.handle, dataset.handle)
+        dataset_copy.handle = None  # or both objects would free it
+
+        np.random.seed(0)
+        df = pd.DataFrame({'a': np.random.normal(size=1000)})
+        df['y'] = df['a'] * 3 + np.random.normal(size=1000) * 0.1
+        encoders = {'a': NumericEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        dtype_dict = {'a': dtype.float, 'y': dtype.float}
+
+        copied = []
+        shared_copy = _SharedDataset.__copy__
+
+        def counting_copy(dataset):
+            copied.append(dataset)
+            return shared_copy(dataset)
+
+        mixer = LightGBM(30, 'y', dtype_dict, ['a'], False, True, encoders['y'])
+        with mock.patch.object(_SharedDataset, '__copy__', counting_copy):
+            mixer.fit(EncodedDs(encoders, df.iloc[:800], 'y'), EncodedDs(encoders, df.iloc[800:], 'y'))
+
+        # every trial got the dataset the mixer built, which keeps its handle for later partial fits
+        self.assertTrue(any(dataset is mixer.train_dataset for dataset in copied))
+        self.assertIsNotNone(mixer.train_dataset.handle)
+        mixer.partial_fit(EncodedDs(encoders, df.iloc[800:], 'y'), EncodedDs(encoders, df.iloc[:800], 'y'))
+        self.assertEqual(len(mixer(EncodedDs(encoders, df.iloc[800:], 'y'))), 200)
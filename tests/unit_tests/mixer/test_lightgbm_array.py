@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+from lightwood.api.types import TimeseriesSettings
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder
+from lightwood.mixer import LightGBMArray
+
+
+class TestLightGBMArray(unittest.TestCase):
+    def test_parallel_horizon(self):
+        np.random.seed(0)
+        horizon = 3
+        n_rows = 1200
+        series = np.sin(np.arange(n_rows + horizon) / 10) + np.random.normal(size=n_rows + horizon) * 0.05
+        df = pd.DataFrame({'t': np.arange(n_rows), 'lag': series[:n_rows] - 0.1, 'y': series[1:n_rows + 1]})
+        for i in range(1, horizon):
+            df[f'y_timestep_{i}'] = series[1 + i:n_rows + 1 + i]
+
+        encoders = {col: NumericEncoder() for col in ['t', 'lag']}
+        encoders['y'] = NumericEncoder(is_target=True)
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        tss = TimeseriesSettings.from_dict({'order_by': 't', 'window': 2, 'horizon': horizon})
+        train = EncodedDs(encoders, df.iloc[:800], 'y')
+        dev = EncodedDs(encoders, df.iloc[800:1000], 'y')
+        test = EncodedDs(encoders, df.iloc[1000:], 'y')
+
+        predictions = {}
+        for nr_procs in (1, 2):
+            dtype_dict = {'t': dtype.integer, 'lag': dtype.float, 'y': dtype.float}
+            mixer = LightGBMArray(20, 'y', dtype_dict, ['t', 'lag'], False, encoders['y'], {}, False, tss,
+                                  nr_procs=nr_procs)
+            mixer.fit(train, dev)
+            self.assertEqual(len(mixer.models), horizon)
+            self.assertTrue(all(model.model is not None for model in mixer.models))
+
+            # the feature matrix is built once for all the horizon models
+            predictions[nr_procs] = np.array(mixer(test)['prediction'].tolist())
+            for timestep, model in enumerate(mixer.models):
+                np.testing.assert_allclose(predictions[nr_procs][:, timestep], model(test)['prediction'].values)
+
+        targets = df[['y'] + [f'y_timestep_{i}' for i in range(1, horizon)]].iloc[1000:].values
+        for prediction in predictions.values():
+            self.assertLess(np.abs(prediction - targets).mean(), np.abs(targets - targets.mean()).mean() / 3)
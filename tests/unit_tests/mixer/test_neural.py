@@ -0,0 +1,189 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import torch
+from type_infer.dtype import dtype
+
+from lightwood.api.types import PredictionArguments
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.mixer.neural import Neural
+from lightwood.helpers.torch import StateDictSnapshot
+from lightwood.mixer.helpers.batch_loader import TensorDataLoader
+from lightwood.mixer.helpers.default_net import DefaultNet
+
+
+def _per_row_predict(mixer: Neural, ds: EncodedDs, args: PredictionArguments) -> pd.DataFrame:
+    """
+    Reference implementation: one forward pass and one decode call per row.
+    """
+    mixer.model = mixer.model.eval()
+    decoded_predictions, all_probs, rev_map = [], [], {}
+    with torch.no_grad():
+        for X, _ in ds:
+            Yh = mixer.model(X.to(mixer.model.device))
+            Yh = torch.unsqueeze(Yh, 0) if len(Yh.shape) < 2 else Yh
+            if args.predict_proba and mixer.supports_proba:
+                decoded_prediction, probs, rev_map = mixer.target_encoder.decode_probabilities(Yh)
+                all_probs.append(probs)
+            else:
+                decoded_prediction = mixer.target_encoder.decode(Yh)
+            decoded_predictions.extend(decoded_prediction)
+
+    ydf = pd.DataFrame({'prediction': decoded_predictions})
+    if all_probs:
+        raw_predictions = np.array(all_probs).squeeze(axis=1)
+        for idx, label in enumerate(rev_map.values()):
+            ydf[f'__mdb_proba_{label}'] = raw_predictions[:, idx]
+    return ydf
+
+
+class TestNeural(unittest.TestCase):
+    def test_batched_predict(self):
+        """
+        Batched inference must match the row-by-row reference (which is only run on a subsample), over several inference blocks.
+        """  # noqa
+        np.random.seed(0)
+        torch.manual_seed(0)
+        n_rows = 20_000
+        df = pd.DataFrame({'a': np.random.normal(size=n_rows), 'b': np.random.choice(list('xyzw'), n_rows)})
+        df['num'] = df['a'] * 3 + (df['b'] == 'x')
+        df['cat'] = np.where(df['a'] > 0, 'pos', 'neg')
+
+        for target, target_encoder, target_dtype in [('num', NumericEncoder(is_target=True), dtype.float),
+                                                     ('cat', OneHotEncoder(is_target=True), dtype.binary)]:
+            encoders = {'a': NumericEncoder(), 'b': OneHotEncoder(), target: target_encoder}
+            data = df[['a', 'b', target]]
+            for col, encoder in encoders.items():
+                encoder.prepare(data[col])
+            dtype_dict = {'a': dtype.float, 'b': dtype.categorical, target: target_dtype}
+
+            mixer = Neural(2, target, dtype_dict, target_encoder, 'DefaultNet', False, False)
+            mixer.fit(EncodedDs(encoders, data.iloc[:1000], target), EncodedDs(encoders, data.iloc[1000:1500], target))
+
+            ds = EncodedDs(encoders, data.drop(columns=[target]), target)
+            args = PredictionArguments(predict_proba=True)
+            predictions = mixer(ds, args)
+
+            n_ref = 5000
+            ref_ds = EncodedDs(encoders, data.drop(columns=[target]).iloc[:n_ref], target)
+            reference = _per_row_predict(mixer, ref_ds, args)
+
+            self.assertEqual(len(predictions), n_rows)
+            self.assertEqual(predictions.columns.tolist(), reference.columns.tolist())
+            if target == 'num':
+                # batched matmuls accumulate in a different order, so outputs only match up to float32 rounding
+                np.testing.assert_allclose(predictions['prediction'].iloc[:n_ref].values,
+                                           reference['prediction'].values, rtol=1e-5, atol=1e-5)
+            else:
+                self.assertEqual(predictions['prediction'].iloc[:n_ref].tolist(), reference['prediction'].tolist())
+            for col in reference.columns[1:]:
+                np.testing.assert_allclose(predictions[col].iloc[:n_ref].values, reference[col].values, rtol=1e-5)
+
+    def test_tensor_data_loader(self):
+        df = pd.DataFrame({'a': np.arange(1000, dtype=float), 'y': np.arange(1000, dtype=float) * 2})
+        encoders = {'a': NumericEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        ds = EncodedDs(encoders, df, 'y')
+
+        dl = TensorDataLoader(ds, batch_size=64, shuffle=True)
+        self.assertEqual(len(dl), 16)
+        epochs = [[(X, Y) for X, Y in dl] for _ in range(2)]
+        all_X = ds.get_encoded_data(include_target=False)
+        all_Y = ds.get_encoded_column_data('y')
+        for batches in epochs:
+            self.assertEqual(len(batches), 16)
+            self.assertEqual(len(batches[-1][0]), 1000 % 64)
+            X = torch.cat([X for X, _ in batches])
+            Y = torch.cat([Y for _, Y in batches])
+            # every row is seen exactly once per epoch, along with its own target
+            rows = (X[:, None, :] == all_X[None, :, :]).all(dim=2).int().argmax(dim=1)
+            self.assertTrue(torch.equal(X, all_X[rows]))
+            self.assertTrue(torch.equal(Y, all_Y[rows]))
+            self.assertTrue(torch.equal(torch.sort(rows).values, torch.arange(1000)))
+        self.assertFalse(torch.equal(epochs[0][0][0], epochs[1][0][0]))  # reshuffled every epoch
+
+        batches = list(TensorDataLoader(ds, batch_size=64, shuffle=False))
+        self.assertTrue(torch.equal(batches[0][0], all_X[:64]))
+
+    def test_state_dict_snapshot(self):
+        net = DefaultNet(input_size=50, output_size=3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'best.pt')
+            snapshot = StateDictSnapshot(checkpoint_path=path)
+            self.assertTrue(snapshot.empty)
+            snapshot.save(net)
+            buffers = {name: tensor.data_ptr() for name, tensor in snapshot.buffers.items()}
+            best = {name: tensor.clone() for name, tensor in net.state_dict().items()}
+
+            with torch.no_grad():
+                for param in net.parameters():
+                    param.add_(1)
+            snapshot.save(net)  # buffers are reused
+            self.assertEqual(buffers, {name: tensor.data_ptr() for name, tensor in snapshot.buffers.items()})
+            snapshot.wait()
+            checkpoint = torch.load(path)
+            for name, tensor in net.state_dict().items():
+                self.assertTrue(torch.equal(checkpoint[name], tensor))
+
+            # restoring loads the snapshot back into the model, in place
+            snapshot.buffers = {name: tensor.clone() for name, tensor in best.items()}
+            restored = snapshot.restore(net)
+            self.assertIs(restored, net)
+            for name, tensor in net.state_dict().items():
+                self.assertTrue(torch.equal(tensor, best[name]))
+
+            # closing shuts down the checkpoint writer, weights can still be restored
+            snapshot.close()
+            self.assertIsNone(snapshot._executor)
+            self.assertIs(snapshot.restore(net), net)
+
+    def test_lr_search(self):
+        np.random.seed(0)
+        torch.manual_seed(0)
+        n_rows = 20000
+        df = pd.DataFrame({'a': np.random.normal(size=n_rows)})
+        df['cat'] = np.where(df['a'] > 1, 'rare', 'common')
+        encoders = {'a': NumericEncoder(), 'cat': OneHotEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        dtype_dict = {'a': dtype.float, 'cat': dtype.binary}
+        train_ds = EncodedDs(encoders, df.iloc[:15000], 'cat')
+        dev_ds = EncodedDs(encoders, df.iloc[15000:], 'cat')
+
+        mixer = Neural(5, 'cat', dtype_dict, encoders['cat'], 'DefaultNet', False, False,
+                       lr_search_rows=1000, lr_search_steps=20)
+
+        # the sweep runs on a stratified subsample, within the step budget
+        mixer.num_hidden = 1
+        mixer._init_net(train_ds)
+        dl = TensorDataLoader(train_ds, 100, shuffle=True)
+        search_dl = mixer._lr_search_loader(dl)
+        self.assertAlmostEqual(len(search_dl.X), 1000, delta=2)
+        self.assertAlmostEqual(search_dl.Y.argmax(dim=1).float().mean().item(),
+                               dl.Y.argmax(dim=1).float().mean().item(), places=2)
+
+        steps = []
+        mixer._net_call = lambda X: steps.append(len(X)) or mixer.model(X)
+        mixer.lr = 1e-5
+        lr, _ = mixer._find_lr(search_dl, max_steps=20)
+        self.assertLessEqual(len(steps), 20)
+        self.assertGreaterEqual(lr, 1e-5)
+        del mixer._net_call
+
+        # nothing to search on, the current learning rate is kept
+        empty_dl = TensorDataLoader(EncodedDs(encoders, df.iloc[:0], 'cat'), 100)
+        lr, _ = mixer._find_lr(empty_dl, max_steps=20)
+        self.assertEqual(lr, 1e-5)
+
+        # once found, the learning rate is kept, e.g. for partial_fit
+        mixer.lr = None
+        mixer.fit(train_ds, dev_ds)
+        found_lr = mixer.lr
+        self.assertIsNotNone(found_lr)
+        mixer.partial_fit(dev_ds, train_ds)
+        self.assertEqual(mixer.lr, found_lr)
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.helpers.parallelism import parallel_fit_mixers
+from lightwood.mixer import Regression, Neural
+
+
+class TestParallelFit(unittest.TestCase):
+    def test_parallel_fit_mixers(self):
+        np.random.seed(0)
+        df = pd.DataFrame({'a': np.random.normal(size=600), 'b': np.random.choice(list('xyz'), 600)})
+        df['y'] = df['a'] * 3 + (df['b'] == 'x') * 2
+        encoders = {'a': NumericEncoder(), 'b': OneHotEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        dtype_dict = {'a': dtype.float, 'b': dtype.categorical, 'y': dtype.float}
+        train = EncodedDs(encoders, df.iloc[:400], 'y')
+        dev = EncodedDs(encoders, df.iloc[400:500], 'y')
+        test = EncodedDs(encoders, df.iloc[500:], 'y')
+
+        regression = Regression(10, encoders['y'], dtype_dict, 'y')
+        neural = Neural(2, 'y', dtype_dict, encoders['y'], 'DefaultNet', False, False)
+        failing = Regression(0, encoders['y'], dtype_dict, 'y')  # no time budget, fit raises
+
+        runtime_log = {}
+        results = parallel_fit_mixers([(regression, train, dev),
+                                       (neural, ConcatedEncodedDs([train, dev]), test),
+                                       (failing, train, dev)], nr_procs=2, runtime_log=runtime_log)
+
+        # encoded data was shared with the workers, not copied
+        self.assertTrue(train.X_cache.is_shared())
+        self.assertTrue(test.Y_cache.is_shared())
+
+        (fitted_regression, error), (fitted_neural, neural_error), (failed, failing_error) = results
+        self.assertIsNone(error)
+        self.assertIsNone(neural_error)
+        self.assertIsNone(failed)
+        self.assertIn('Insufficient time', failing_error)
+        self.assertEqual(len(runtime_log), 3)
+        self.assertTrue(all(k[0] == 'fit_mixer' for k in runtime_log))
+
+        # same model as when fitting in this process
+        regression.fit(train, dev)
+        np.testing.assert_allclose(fitted_regression(test)['prediction'].values, regression(test)['prediction'].values)
+        self.assertEqual(len(fitted_neural(test)), len(test))
+
+    def test_shared_target_encoder(self):
+        np.random.seed(0)
+        df = pd.DataFrame({'a': np.random.normal(size=300)})
+        df['y'] = np.exp(df['a'])
+        dtype_dict = {'a': dtype.float, 'y': dtype.float}
+
+        def fit(parallel):
+            encoders = {'a': NumericEncoder(), 'y': NumericEncoder(is_target=True)}
+            for col, encoder in encoders.items():
+                encoder.prepare(df[col])
+            encoders['y'].decode_log = None
+            train = EncodedDs(encoders, df.iloc[:200], 'y')
+            dev = EncodedDs(encoders, df.iloc[200:], 'y')
+            mixers = [Neural(2, 'y', dtype_dict, encoders['y'], 'DefaultNet', False, False),
+                      Regression(10, encoders['y'], dtype_dict, 'y')]
+            if parallel:
+                mixers = [fitted for fitted, _ in parallel_fit_mixers([(m, train, dev) for m in mixers], nr_procs=2)]
+            else:
+                for mixer in mixers:
+                    mixer.fit(train, dev)
+            return encoders['y'], mixers
+
+        sequential_encoder, _ = fit(parallel=False)
+        encoder, (neural, regression) = fit(parallel=True)
+
+        # fitted mixers use the encoder they were given, which holds the changes `Neural` made to it
+        self.assertIs(neural.target_encoder, encoder)
+        self.assertIs(regression.target_encoder, encoder)
+        self.assertIn(encoder.decode_log, (True, False))
+        self.assertEqual(set(vars(encoder)), set(vars(sequential_encoder)))
+        self.assertEqual(type(encoder.decode_log), type(sequential_encoder.decode_log))
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from type_infer.dtype import dtype
+
+from lightwood.data.encoded_ds import EncodedDs, ConcatedEncodedDs
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.mixer import Regression
+
+
+class TestRegression(unittest.TestCase):
+    def test_matches_row_by_row(self):
+        np.random.seed(0)
+        n_rows = 2000
+        df = pd.DataFrame({'a': np.random.normal(size=n_rows), 'b': np.random.choice(list('xyz'), n_rows)})
+        df['y'] = df['a'] * 3 + (df['b'] == 'x') * 2 + np.random.normal(size=n_rows) * 0.1
+        encoders = {'a': NumericEncoder(), 'b': OneHotEncoder(), 'y': NumericEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        dtype_dict = {'a': dtype.float, 'b': dtype.categorical, 'y': dtype.float}
+        train = EncodedDs(encoders, df.iloc[:1500], 'y')
+        dev = EncodedDs(encoders, df.iloc[1500:1800], 'y')
+        test = EncodedDs(encoders, df.iloc[1800:].drop(columns=['y']), 'y')
+
+        mixer = Regression(10, encoders['y'], dtype_dict, 'y')
+        mixer.fit(train, dev)
+        predictions = mixer(test)['prediction'].values
+
+        # reference: design matrices built one row at a time
+        rows = list(ConcatedEncodedDs([train, dev]))
+        reference = Ridge().fit([x.tolist() for x, _ in rows], [y.tolist() for _, y in rows])
+        expected = encoders['y'].decode(reference.predict([x.tolist() for x, _ in test]))
+        np.testing.assert_allclose(predictions, expected, rtol=1e-5)
+        self.assertEqual(len(predictions), len(test))
@@ -0,0 +1,68 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from type_infer.dtype import dtype
+
+from lightwood.api.types import TimeseriesSettings
+from lightwood.mixer.sktime import SkTime
+
+
+def _per_row_call_groupmodel(mixer: SkTime, ydf: pd.DataFrame, model, series: pd.Series, offset: int = 0):
+    """
+    Reference implementation: one write per row of the series.
+    """
+    submodel = model.steps_[-1][-1]
+    start = max(offset, -len(submodel._y) + 1)
+    end = start + series.shape[0] + mixer.horizon
+    all_preds = model.predict(np.arange(start, end)).tolist()
+    for true_idx, (idx, _) in enumerate(series.items()):
+        ydf['prediction'].loc[idx] = all_preds[true_idx:true_idx + mixer.horizon]
+    return ydf
+
+
+class TestSkTime(unittest.TestCase):
+    def test_grouped_predictions(self):
+        np.random.seed(0)
+        n_rows, horizon = 60, 3
+        groups = ['a', 'b', 'c']
+        df = pd.concat([pd.DataFrame({'t': np.arange(n_rows),
+                                      'g': group,
+                                      'y': np.arange(n_rows) * (i + 1) + np.random.normal(size=n_rows)})
+                        for i, group in enumerate(groups)])
+        df['__mdb_original_t'] = df['t']
+        df.index = pd.to_datetime(df['t'], unit='s')
+        train, test = df[df['t'] < 50], df[df['t'] >= 50]
+        test = pd.concat([test, pd.DataFrame({'t': [50, 51], 'g': 'novel', 'y': [1.0, 2.0]},
+                                             index=pd.to_datetime([50, 51], unit='s'))])
+
+        tss = TimeseriesSettings.from_dict({'order_by': 't', 'window': 5, 'horizon': horizon, 'group_by': ['g']})
+        combinations = ['__default'] + [(group,) for group in groups]
+        ts_analysis = {'tss': tss, 'deltas': {group: 1.0 for group in combinations},
+                       'periods': {group: [1] for group in combinations}, 'group_combinations': combinations,
+                       'stl_transforms': {}}
+        dtype_dict = {'t': dtype.integer, 'g': dtype.categorical, 'y': dtype.float}
+
+        predictions = []
+        for nr_procs in (1, 2):
+            mixer = SkTime(10, 'y', dtype_dict, horizon, ts_analysis, model_path='trend.PolynomialTrendForecaster',
+                           hyperparam_search=False, nr_procs=nr_procs)
+            mixer._fit(SimpleNamespace(data_frame=train))
+            self.assertTrue(all(mixer.models[group].is_fitted for group in combinations))
+            predictions.append(mixer(SimpleNamespace(data_frame=test))['prediction'])
+
+        # the same forecasters are fit in a process pool
+        self.assertEqual(predictions[0].tolist(), predictions[1].tolist())
+
+        # one write per group gives the same forecasts as one write per row
+        reference = SkTime._call_groupmodel
+        try:
+            SkTime._call_groupmodel = _per_row_call_groupmodel
+            expected = mixer(SimpleNamespace(data_frame=test))['prediction']
+        finally:
+            SkTime._call_groupmodel = reference
+        self.assertEqual(len(predictions[0]), len(test))
+        for prediction, expected_prediction in zip(predictions[0], expected):
+            np.testing.assert_allclose(prediction, expected_prediction)
+        self.assertTrue(all(len(prediction) == horizon for prediction in predictions[0]))
@@ -0,0 +1,51 @@
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from type_infer.dtype import dtype
+
+from lightwood.data.encoded_ds import EncodedDs
+from lightwood.encoder import NumericEncoder, OneHotEncoder
+from lightwood.mixer import XGBoostMixer
+
+
+class TestXGBoost(unittest.TestCase):
+    def test_partial_fit(self):
+        np.random.seed(0)
+        n_rows = 3000
+        df = pd.DataFrame({'a': np.random.normal(size=n_rows), 'b': np.random.normal(size=n_rows)})
+        df['y'] = pd.cut(df['a'] * 2 + df['b'], [-100, -2, 0, 2, 100], labels=list('wxyz')).astype(str)
+        encoders = {'a': NumericEncoder(), 'b': NumericEncoder(), 'y': OneHotEncoder(is_target=True)}
+        for col, encoder in encoders.items():
+            encoder.prepare(df[col])
+        dtype_dict = {'a': dtype.float, 'b': dtype.float, 'y': dtype.categorical}
+        train = EncodedDs(encoders, df.iloc[:2000], 'y')
+        dev = EncodedDs(encoders, df.iloc[2000:2400], 'y')
+        test = EncodedDs(encoders, df.iloc[2800:], 'y')
+
+        # the new rows lack one of the classes and have one that was never seen
+        delta = df.iloc[2400:2800].copy()
+        delta = delta[delta['y'] != 'w']
+        delta.iloc[:5, delta.columns.get_loc('y')] = 'unseen'
+        delta = EncodedDs(encoders, delta, 'y')
+
+        mixer = XGBoostMixer(10, 'y', dtype_dict, ['a', 'b'], False, False, encoders['y'], partial_fit_rounds=3)
+        mixer.fit(train, dev)
+        mixer = pickle.loads(pickle.dumps(mixer))
+        original = mixer.model.get_booster().copy()
+        n_rounds = mixer.num_iterations
+
+        mixer.partial_fit(delta, dev)
+
+        # boosting continued on top of the trees in use, instead of retraining
+        self.assertGreater(mixer.num_iterations, n_rounds)
+        self.assertLessEqual(mixer.num_iterations, n_rounds + 3)
+        X = xgb.DMatrix(df[['a', 'b']].iloc[2800:].values)
+        np.testing.assert_allclose(mixer.model.get_booster()[:n_rounds].predict(X),
+                                   original[:n_rounds].predict(X), rtol=1e-6)
+
+        predictions = mixer(test)['prediction']
+        self.assertEqual(len(predictions), len(test))
+        self.assertGreater((predictions.values == df['y'].iloc[2800:].values).mean(), 0.9)